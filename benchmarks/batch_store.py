@@ -0,0 +1,157 @@
+"""Ingestion throughput of `PersistenceService.batch_store` against the previous
+per-article upsert + ORM `add_all` implementation.
+
+Writes synthetic documents under a `bench://` URL prefix into the configured
+database and removes them afterwards:
+
+    python -m benchmarks.batch_store --chunks 10000,100000
+
+Chunks land in the current month's partition, so every insert also updates
+its HNSW index. Cleaned-up rows leave that graph larger, which slows down
+every later run. For a fair comparison on a scratch database, run one
+implementation per invocation (`--impls legacy`, then `--impls bulk`) and
+REINDEX the partition in between.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import date
+
+import numpy as np
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+
+from benchmarks.common import print_table
+from src.config.database import async_session, bulk_engine
+from src.modules.persistence.models import Chunk, Document
+from src.modules.persistence.partitions import ensure_partitions
+from src.modules.persistence.service import persistence_service
+from src.modules.preprocessor.schemas import ChunkBatch
+from src.modules.scraper.schemas import ScrapedArticle
+
+URL_PREFIX = "bench://batch-store/"
+EMBEDDING_DIM = 384
+
+
+def make_corpus(n_chunks: int, chunks_per_doc: int, seed: int):
+    n_docs = max(1, n_chunks // chunks_per_doc)
+    articles = [
+        ScrapedArticle(
+            title=f"Benchmark article {i}",
+            url=f"{URL_PREFIX}{i}",
+            summary="",
+            content="lorem ipsum " * 400,
+        )
+        for i in range(n_docs)
+    ]
+    n_chunks = min(n_chunks, n_docs * chunks_per_doc)
+    rows = np.arange(n_chunks)
+    chunks = ChunkBatch(
+        texts=[f"Benchmark article {i // chunks_per_doc}: " + "lorem ipsum " * 80 for i in rows],
+        article=rows // chunks_per_doc,
+        chunk_index=rows % chunks_per_doc,
+        start_char=np.zeros(n_chunks),
+        end_char=np.full(n_chunks, 960),
+        embeddings=np.random.default_rng(seed).random((n_chunks, EMBEDDING_DIM), dtype=np.float32),
+    )
+    return articles, chunks
+
+
+async def legacy_batch_store(articles, chunks) -> int:
+    """The pre-COPY implementation, kept here as the baseline."""
+    today = date.today()
+    async with bulk_engine.begin() as conn:
+        await ensure_partitions(conn, [today])
+    async with async_session() as session:
+        doc_map: dict[str, uuid.UUID] = {}
+        for article in articles:
+            stmt = (
+                insert(Document)
+                .values(
+                    url=article.url,
+                    title=article.title,
+                    category=article.category,
+                    publication_date=article.publication_date,
+                    content=article.content,
+                )
+                .on_conflict_do_update(
+                    index_elements=["url"],
+                    set_={
+                        "title": article.title,
+                        "category": article.category,
+                        "publication_date": article.publication_date,
+                        "content": article.content,
+                    },
+                )
+                .returning(Document.id)
+            )
+            doc_map[article.url] = (await session.execute(stmt)).scalar_one()
+
+        await session.execute(delete(Chunk).where(Chunk.document_id.in_(list(doc_map.values()))))
+        session.add_all([
+            Chunk(
+                published_on=today,
+                document_id=doc_map[articles[article].url],
+                chunk_index=chunk_index,
+                content=content,
+                embedding=embedding.tolist(),
+            )
+            for article, chunk_index, content, embedding in zip(
+                chunks.article.tolist(), chunks.chunk_index.tolist(), chunks.texts, chunks.embeddings
+            )
+        ])
+        await session.commit()
+    return len(doc_map)
+
+
+async def cleanup() -> None:
+    async with async_session() as session:
+        await session.execute(delete(Document).where(Document.url.startswith(URL_PREFIX)))
+        await session.commit()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    import src.modules.persistence.models  # noqa: F401 — register ORM models
+
+    implementations = {"legacy": legacy_batch_store, "bulk": persistence_service.batch_store}
+    rows = []
+    try:
+        for n_chunks in args.chunks:
+            articles, chunks = make_corpus(n_chunks, args.chunks_per_doc, args.seed)
+            for name in args.impls:
+                store = implementations[name]
+                if name == "legacy" and n_chunks > args.legacy_max:
+                    rows.append([n_chunks, name, float("nan"), float("nan")])
+                    continue
+                await cleanup()
+                start = time.perf_counter()
+                await store(articles, chunks)
+                elapsed = time.perf_counter() - start
+                rows.append([n_chunks, name, elapsed, len(chunks) / elapsed])
+                print(f"{name:>6} {n_chunks:>8,} chunks: {elapsed:.2f}s")
+    finally:
+        await cleanup()
+
+    print()
+    print_table(["chunks", "impl", "seconds", "rows/s"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=lambda s: [int(x) for x in s.split(",")], default=[10_000, 100_000])
+    parser.add_argument("--chunks-per-doc", type=int, default=10)
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="skip the baseline above this size")
+    parser.add_argument(
+        "--impls",
+        type=lambda s: s.split(","),
+        default=["legacy", "bulk"],
+        help="comma-separated, run in this order; run one per invocation to keep the runs apart",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
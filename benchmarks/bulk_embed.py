@@ -0,0 +1,89 @@
+"""Bulk embedding throughput as worker count and batch size vary.
+
+The baseline is the previous in-process loop: 64-text slices in input order,
+one after another, with torch's default thread settings. Every other row runs
+`BulkEmbedder` with the given workers and batch size ("auto" tunes it while
+running, and its row shows the size it settled on). Chunks are synthetic, with
+lengths spread like real chunks. Model loading is excluded:
+
+    python -m benchmarks.bulk_embed --chunks 4000 --workers 1,2,4 --batch-sizes 16,64,auto
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from benchmarks.common import print_table
+from src.modules.embedder.bulk import BulkEmbedder
+from src.modules.embedder.service import embedder_service
+
+LEGACY_BATCH_SIZE = 64
+WORDS = (
+    "the Commission adopted a proposal on energy security and climate targets for Member States "
+    "under the 2030 framework with funding for cohesion policy digital markets agricultural support "
+    "research and innovation programmes State aid rules competition enforcement and the single market"
+).split()
+
+
+def make_texts(n: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    # Mostly full chunks, with the short tails every article ends with
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(150, 200) if rng.random() < 0.7 else rng.randint(5, 120)))
+        for _ in range(n)
+    ]
+
+
+def legacy_embed(texts: list[str]) -> np.ndarray:
+    vectors = []
+    for i in range(0, len(texts), LEGACY_BATCH_SIZE):
+        vectors.extend(embedder_service.embeddings.embed_documents(texts[i : i + LEGACY_BATCH_SIZE]))
+    return np.asarray(vectors, dtype=np.float32)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    texts = make_texts(args.chunks, args.seed)
+    legacy_embed(texts[:8])  # load the model
+    start = time.perf_counter()
+    reference = legacy_embed(texts)
+    elapsed = time.perf_counter() - start
+    rows = [["legacy", 1, "-", LEGACY_BATCH_SIZE, len(texts) / elapsed, 1.0, 0.0]]
+    baseline = len(texts) / elapsed
+    print(f"legacy: {elapsed:.1f}s")
+
+    for workers in args.workers:
+        for batch_size in args.batch_sizes:
+            embedder = BulkEmbedder(workers, args.threads, None if batch_size == "auto" else int(batch_size))
+            try:
+                await embedder.embed(texts[: workers * 4])  # start the workers and load the model
+                start = time.perf_counter()
+                vectors = np.concatenate([window async for window in embedder.stream(texts)])
+                elapsed = time.perf_counter() - start
+            finally:
+                embedder.shutdown()
+            label = f"{embedder.batch_size} ({batch_size})" if batch_size == "auto" else batch_size
+            rows.append([
+                "bulk", workers, args.threads, label, len(texts) / elapsed,
+                len(texts) / elapsed / baseline, float(np.abs(vectors - reference).max()),
+            ])
+            print(f"{workers} workers, batch {batch_size}: {elapsed:.1f}s")
+
+    print()
+    print_table(["impl", "workers", "threads", "batch size", "chunks/s", "speedup", "max |Δ|"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=4000)
+    parser.add_argument("--workers", type=lambda s: [int(x) for x in s.split(",")], default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=2, help="torch threads per worker")
+    parser.add_argument("--batch-sizes", type=lambda s: s.split(","), default=["16", "64", "auto"])
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
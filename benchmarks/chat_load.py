@@ -0,0 +1,159 @@
+"""Closed-loop load generator for `POST /api/inference/chat`.
+
+Each virtual user owns one conversation and sends questions back to back.
+For every concurrency level it reports throughput, time-to-first-token and
+end-to-end latency percentiles, admission rejections (429/503) and errors:
+
+    python -m benchmarks.chat_load --concurrency 1,8,32,64 --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from benchmarks.common import percentile, print_table
+
+QUESTIONS = [
+    "What is the EU's new plan to counter drone threats?",
+    "What are the key terms of the EU-India Free Trade Agreement?",
+    "What is the EU-Singapore Digital Trade Agreement about?",
+    "How much funding has the EU allocated to the crisis in Myanmar?",
+    "What is the EU's five-year strategy on migration?",
+    "What factors affect electricity bills in the EU?",
+]
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    duration: float = 0.0
+    ttft: list[float] = field(default_factory=list)
+    latency: list[float] = field(default_factory=list)
+    tokens: int = 0
+    rejected: int = 0
+    errors: int = 0
+
+
+async def _chat_once(
+    client: httpx.AsyncClient, conversation_id: str, args: argparse.Namespace, result: LevelResult
+) -> None:
+    body = {
+        "conversation_id": conversation_id,
+        "content": random.choice(QUESTIONS),
+        "model_id": args.model,
+        "top_k": args.top_k,
+        "max_tokens": args.max_tokens,
+    }
+    start = time.perf_counter()
+    first_token_at: float | None = None
+    tokens = 0
+    try:
+        async with client.stream("POST", "/api/inference/chat", json=body) as response:
+            if response.status_code in (429, 503):
+                result.rejected += 1
+                return
+            if response.status_code != 200:
+                result.errors += 1
+                return
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if "error" in event:
+                    result.errors += 1
+                    return
+                if "token" in event:
+                    tokens += 1
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+    except httpx.HTTPError:
+        result.errors += 1
+        return
+
+    end = time.perf_counter()
+    if first_token_at is not None:
+        result.ttft.append(first_token_at - start)
+    result.latency.append(end - start)
+    result.tokens += tokens
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, args: argparse.Namespace) -> LevelResult:
+    result = LevelResult(concurrency=concurrency)
+    remaining = args.requests
+
+    async def user(index: int) -> None:
+        nonlocal remaining
+        response = await client.post("/api/conversation", json={"title": f"load-test c{concurrency} u{index}"})
+        response.raise_for_status()
+        conversation_id = response.json()["id"]
+        try:
+            while remaining > 0:
+                remaining -= 1
+                await _chat_once(client, conversation_id, args, result)
+        finally:
+            if not args.keep_conversations:
+                await client.delete(f"/api/conversation/{conversation_id}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    result.duration = time.perf_counter() - start
+    return result
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    timeout = httpx.Timeout(args.timeout, connect=5.0)
+    results: list[LevelResult] = []
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        for concurrency in args.concurrency:
+            print(f"Running concurrency={concurrency} ({args.requests} requests)...")
+            results.append(await run_level(client, concurrency, args))
+
+    rows = []
+    for r in results:
+        ok = len(r.latency)
+        rows.append([
+            r.concurrency, ok, r.rejected, r.errors,
+            ok / r.duration if r.duration else 0.0,
+            r.tokens / r.duration if r.duration else 0.0,
+            percentile(r.ttft, 50), percentile(r.ttft, 95), percentile(r.ttft, 99),
+            percentile(r.latency, 50), percentile(r.latency, 95), percentile(r.latency, 99),
+        ])
+    print()
+    print_table(
+        ["conc", "ok", "rejected", "errors", "req/s", "tok/s",
+         "ttft_p50", "ttft_p95", "ttft_p99", "e2e_p50", "e2e_p95", "e2e_p99"],
+        rows,
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([r.__dict__ for r in results], f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=lambda s: [int(x) for x in s.split(",")], default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=100, help="requests per concurrency level")
+    parser.add_argument("--model", default="meta-llama/Llama-4-Scout-17B-16E-Instruct")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-conversations", action="store_true")
+    parser.add_argument("--json", help="also write raw samples to this file")
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
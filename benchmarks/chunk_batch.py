@@ -0,0 +1,167 @@
+"""Memory and CPU cost of carrying chunks through ingestion: one pydantic
+`ProcessedChunk` per chunk with `list[list[float]]` embeddings (the previous
+models) against the columnar `ChunkBatch` with a float32 embedding array.
+
+For each representation it measures, in memory and without a database:
+
+- build: creating the chunk objects from preprocessed articles, plus the
+  embedder's output in the form the representation carries it
+- encode: producing the binary pgvector payloads `batch_store` COPYs
+- retained: memory held by the chunks and embeddings between the steps
+  (tracemalloc, measured in a separate pass)
+
+The baseline holds about 13.5 kB per chunk (about 1.4 GB at 100k chunks), and
+tracemalloc adds its own overhead on top of that:
+
+    python -m benchmarks.chunk_batch --chunks 50000
+"""
+
+import argparse
+import gc
+import random
+import struct
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+from pydantic import BaseModel
+
+from benchmarks.common import print_table
+from src.modules.embedder.service import EMBEDDING_DIM
+from src.modules.persistence.vectors import encode_vector
+from src.modules.preprocessor.schemas import ChunkBatch
+from src.modules.scraper.schemas import ScrapedArticle
+
+CHUNKS_PER_ARTICLE = 10
+
+
+class ProcessedChunk(BaseModel):
+    """The previous per-chunk model, kept here as the baseline."""
+
+    content: str
+    title: str
+    url: str
+    category: str | None = None
+    publication_date: datetime | None = None
+    chunk_index: int
+    start_char: int | None = None
+    end_char: int | None = None
+
+
+def legacy_encode_vector(embedding: list[float]) -> bytes:
+    dim = len(embedding)
+    return struct.pack(f">HH{dim}f", dim, 0, *embedding)
+
+
+def make_input(n_chunks: int, seed: int):
+    rng = random.Random(seed)
+    n_articles = max(1, n_chunks // CHUNKS_PER_ARTICLE)
+    articles = [
+        ScrapedArticle(
+            title=f"Commission approves measure {i}",
+            url=f"https://commission.europa.eu/news/{i}",
+            summary="",
+            content="",
+            category="Press release",
+            publication_date=datetime(2026, 1, 1 + i % 28),
+        )
+        for i in range(n_articles)
+    ]
+    rows = [(i // CHUNKS_PER_ARTICLE, i % CHUNKS_PER_ARTICLE) for i in range(n_chunks)]
+    texts = [f"{articles[a].title}: chunk {j} " + "x" * rng.randint(200, 1200) for a, j in rows]
+    vectors = np.random.default_rng(seed).random((n_chunks, EMBEDDING_DIM), dtype=np.float32)
+    return articles, rows, texts, vectors
+
+
+def build_legacy(articles, rows, texts, vectors):
+    chunks = [
+        ProcessedChunk(
+            content=text,
+            title=articles[a].title,
+            url=articles[a].url,
+            category=articles[a].category,
+            publication_date=articles[a].publication_date,
+            chunk_index=j,
+            start_char=0,
+            end_char=len(text),
+        )
+        for (a, j), text in zip(rows, texts)
+    ]
+    return chunks, vectors.tolist()  # the embedder used to return Python floats
+
+
+def encode_legacy(built) -> int:
+    _, embeddings = built
+    return sum(len(legacy_encode_vector(embedding)) for embedding in embeddings)
+
+
+def build_columnar(articles, rows, texts, vectors):
+    return ChunkBatch(
+        texts=texts,
+        article=[a for a, _ in rows],
+        chunk_index=[j for _, j in rows],
+        start_char=np.zeros(len(texts)),
+        end_char=[len(text) for text in texts],
+        embeddings=vectors.copy(),  # the embedder's output array
+    )
+
+
+def encode_columnar(batch: ChunkBatch) -> int:
+    big_endian = batch.embeddings.astype(">f4")
+    return sum(len(encode_vector(row)) for row in big_endian)
+
+
+def retained_bytes(build, inputs) -> int:
+    gc.collect()
+    tracemalloc.start()
+    built = build(*inputs)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    inputs = make_input(args.chunks, args.seed)
+    n = args.chunks
+    implementations = {
+        "ProcessedChunk + list[list[float]]": (build_legacy, encode_legacy),
+        "ChunkBatch + float32 array": (build_columnar, encode_columnar),
+    }
+
+    rows = []
+    payload = None
+    for name, (build, encode) in implementations.items():
+        gc.collect()
+        start = time.perf_counter()
+        built = build(*inputs)
+        built_at = time.perf_counter()
+        size = encode(built)
+        encoded_at = time.perf_counter()
+        payload = payload or size
+        assert size == payload, "encoders disagree on the COPY payload size"
+        del built
+
+        retained = retained_bytes(build, inputs)
+        rows.append([
+            name,
+            built_at - start,
+            encoded_at - built_at,
+            n / (encoded_at - start),
+            retained / 1e6,
+            retained // n,
+        ])
+        print(f"{name}: done")
+
+    print(f"\n{n:,} chunks, {len(inputs[0]):,} articles; chunk texts are shared input and not counted\n")
+    print_table(["representation", "build s", "encode s", "chunks/s", "retained MB", "bytes/chunk"], rows)
+
+
+if __name__ == "__main__":
+    main()
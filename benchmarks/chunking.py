@@ -0,0 +1,112 @@
+"""Tokenizer-aware chunking against the previous 1000/150-character splitter.
+
+Both chunkers see the same cleaned article text with the title prefix used at
+embedding time. Lengths are measured with the embedding model's tokenizer,
+and for each chunker the benchmark reports:
+
+- chunks/s and articles/s of the chunking step alone
+- embeddings per article (chunks the embedder has to run)
+- truncation rate (chunks longer than the model's window) and the share of
+  tokens the model never sees
+
+Uses a synthetic corpus by default, or real articles saved by the pipeline's
+scrape stage:
+
+    python -m benchmarks.chunking --articles 500
+    python -m benchmarks.chunking --input articles.json
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pydantic import TypeAdapter
+
+from benchmarks.common import print_table
+from src.modules.preprocessor.chunker import TokenChunker
+from src.modules.preprocessor.service import _clean_text
+from src.modules.scraper.schemas import ScrapedArticle
+
+LEGACY_CHUNK_SIZE = 1000
+LEGACY_CHUNK_OVERLAP = 150
+WORDS = (
+    "the Commission adopted a proposal on energy security and climate targets for Member States "
+    "under the 2030 framework with €4.2 billion in funding, cohesion policy, digital markets, "
+    "agricultural support, research and innovation programmes, Horizon Europe, NextGenerationEU, "
+    "State aid rules, competition, enforcement, infringement procedures and the single market"
+).split()
+
+
+def make_corpus(n_articles: int, seed: int) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n_articles):
+        sentences = []
+        for _ in range(rng.randint(10, 80)):
+            # Mostly ordinary sentences, now and then a long enumeration
+            length = rng.randint(8, 35) if rng.random() > 0.05 else rng.randint(150, 400)
+            words = [rng.choice(WORDS) for _ in range(length)]
+            sentences.append(" ".join(words).capitalize() + ".")
+        corpus.append((f"Benchmark article {i} on EU policy", " ".join(sentences)))
+    return corpus
+
+
+def load_corpus(path: Path) -> list[tuple[str, str]]:
+    articles = TypeAdapter(list[ScrapedArticle]).validate_json(path.read_bytes())
+    return [(a.title, _clean_text(a.content)) for a in articles]
+
+
+def legacy_split(splitter: RecursiveCharacterTextSplitter, title: str, content: str) -> list[str]:
+    return [f"{title}: {text}" for text in splitter.split_text(content)]
+
+
+def token_split(chunker: TokenChunker, title: str, content: str) -> list[str]:
+    prefix = f"{title}: "
+    return [prefix + chunk.text for chunk in chunker.split(content, prefix=prefix)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=500, help="synthetic articles to generate")
+    parser.add_argument("--input", type=Path, help="JSON list of scraped articles instead")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.input) if args.input else make_corpus(args.articles, args.seed)
+    chunker = TokenChunker.from_pretrained()
+    splitter = RecursiveCharacterTextSplitter(chunk_size=LEGACY_CHUNK_SIZE, chunk_overlap=LEGACY_CHUNK_OVERLAP)
+    implementations = {
+        f"chars {LEGACY_CHUNK_SIZE}/{LEGACY_CHUNK_OVERLAP}": lambda t, c: legacy_split(splitter, t, c),
+        f"tokens {chunker.max_tokens}": lambda t, c: token_split(chunker, t, c),
+    }
+
+    rows = []
+    for name, split in implementations.items():
+        start = time.perf_counter()
+        chunks = [text for title, content in corpus for text in split(title, content)]
+        elapsed = time.perf_counter() - start
+
+        lengths = [chunker.count(text) for text in chunks]
+        truncated = sum(n > chunker.max_tokens for n in lengths)
+        lost = sum(max(n - chunker.max_tokens, 0) for n in lengths)
+        rows.append([
+            name,
+            len(chunks) / elapsed,
+            len(corpus) / elapsed,
+            len(chunks) / len(corpus),
+            sum(lengths) / len(lengths),
+            100 * truncated / len(chunks),
+            100 * lost / sum(lengths),
+        ])
+
+    print(f"{len(corpus)} articles, model window {chunker.max_tokens} tokens\n")
+    print_table(
+        ["chunker", "chunks/s", "articles/s", "embeddings/article", "tokens/chunk", "truncated %", "tokens lost %"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
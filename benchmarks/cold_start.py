@@ -0,0 +1,91 @@
+"""Cold-start cost of the API process.
+
+Each run starts a fresh interpreter and records:
+
+- import: seconds to `import src.main`
+- health: seconds from spawn until `/health` answers (the server accepts requests)
+- ready:  seconds from spawn until `/ready` answers 200 (schema present, embedder warm)
+
+    python -m benchmarks.cold_start --runs 5
+"""
+
+import argparse
+import math
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import percentile, print_table
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import src.main; "
+    "print(time.perf_counter() - start)"
+)
+POLL_INTERVAL = 0.02
+
+
+def measure_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _wait_for(client: httpx.Client, path: str, start: float, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(POLL_INTERVAL)
+    return math.nan
+
+
+def measure_server(port: int, timeout: float) -> tuple[float, float]:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            deadline = start + timeout
+            health = _wait_for(client, "/health", start, deadline)
+            ready = _wait_for(client, "/ready", start, deadline)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return health, ready
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0, help="give up on a probe after this long")
+    args = parser.parse_args()
+
+    samples: dict[str, list[float]] = {"import": [], "health": [], "ready": []}
+    for run in range(1, args.runs + 1):
+        samples["import"].append(measure_import())
+        health, ready = measure_server(args.port, args.timeout)
+        samples["health"].append(health)
+        samples["ready"].append(ready)
+        print(f"run {run}: import {samples['import'][-1]:.3f}s  health {health:.3f}s  ready {ready:.3f}s")
+
+    rows = []
+    for name, values in samples.items():
+        ok = [v for v in values if not math.isnan(v)]
+        rows.append([name, len(ok), percentile(ok, 50), percentile(ok, 95), max(ok, default=math.nan)])
+    print()
+    print_table(["phase", "ok", "p50", "p95", "max"], rows)
+
+
+if __name__ == "__main__":
+    main()
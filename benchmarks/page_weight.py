@@ -0,0 +1,97 @@
+"""Bytes on the wire for loading the chat page, before and after asset
+fingerprinting and compression.
+
+Runs the app in process (no server needed) and loads `/` plus every local
+asset it references, the way a browser would:
+
+- uncompressed: what every page load used to cost (no compression, no
+  long-lived caching)
+- first visit with gzip, and with brotli when the `brotli` package is installed
+- repeat visit: the page is revalidated (304) and fingerprinted assets come
+  from the browser cache without a request
+
+With `--conversation` it also fetches that conversation with hydrated sources
+(`?include_content=true`), uncompressed and gzipped; that needs the database:
+
+    python -m benchmarks.page_weight
+    python -m benchmarks.page_weight --conversation 5b0c...
+"""
+
+import argparse
+import asyncio
+import re
+import uuid
+
+import httpx
+
+from benchmarks.common import print_table
+from src.main import app
+from src.modules.assets.service import IMMUTABLE, asset_service, brotli
+
+LOCAL_ASSET = re.compile(r'(?:src|href)="(/static/[^"]+)"')
+
+
+async def fetch(client: httpx.AsyncClient, url: str, headers: dict[str, str]) -> tuple[httpx.Response, int]:
+    """GET, returning the response and its body size as transferred (still encoded)."""
+    async with client.stream("GET", url, headers=headers) as response:
+        if response.is_error:
+            response.raise_for_status()
+        size = sum([len(chunk) async for chunk in response.aiter_raw()])
+    return response, size
+
+
+async def page_load(client: httpx.AsyncClient, encoding: str, cache: dict[str, str] | None) -> tuple[int, int]:
+    """(requests, body bytes) for loading `/` and its assets; `cache` maps URL → ETag."""
+    headers = {"Accept-Encoding": encoding}
+    if cache is not None and "/" in cache:
+        headers["If-None-Match"] = cache["/"]
+    page, transferred = await fetch(client, "/", headers)
+    requests = 1
+    html = (await client.get("/", headers={"Accept-Encoding": "identity"})).text  # links only, not counted
+
+    for url in LOCAL_ASSET.findall(html):
+        if cache is not None and url in cache:
+            continue  # immutable: served from the browser cache
+        response, size = await fetch(client, url, {"Accept-Encoding": encoding})
+        requests += 1
+        transferred += size
+        if cache is not None and response.headers.get("cache-control") == IMMUTABLE:
+            cache[url] = response.headers["etag"]
+    if cache is not None:
+        cache["/"] = page.headers["etag"]
+    return requests, transferred
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    asset_service.build()
+    transport = httpx.ASGITransport(app=app)
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        requests, baseline = await page_load(client, "identity", None)
+        rows.append(["page, uncompressed", requests, baseline, 100.0])
+        for label, encoding in [("gzip", "gzip"), ("brotli", "br, gzip")][: 2 if brotli else 1]:
+            requests, transferred = await page_load(client, encoding, None)
+            rows.append([f"page, first visit ({label})", requests, transferred, 100 * transferred / baseline])
+        cache: dict[str, str] = {}
+        await page_load(client, "br, gzip", cache)
+        requests, transferred = await page_load(client, "br, gzip", cache)
+        rows.append(["page, repeat visit", requests, transferred, 100 * transferred / baseline])
+
+        if args.conversation:
+            url = f"/api/conversation/{args.conversation}?include_content=true"
+            _, plain = await fetch(client, url, {"Accept-Encoding": "identity"})
+            _, gzipped = await fetch(client, url, {"Accept-Encoding": "gzip"})
+            rows.append(["conversation JSON, uncompressed", 1, plain, 100.0])
+            rows.append(["conversation JSON, gzip", 1, gzipped, 100 * gzipped / plain])
+
+    print_table(["load", "requests", "body bytes", "% of uncompressed"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversation", type=uuid.UUID, help="also measure this conversation's JSON")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
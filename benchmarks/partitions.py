@@ -0,0 +1,158 @@
+"""Flat vs month-partitioned chunk storage as the corpus grows.
+
+Builds two scratch tables shaped like `chunks` — one flat, one partitioned by
+`published_on` with the helpers from `persistence/partitions.py` — and loads
+one month of random vectors at a time into both. After each month it records:
+
+- ingest: seconds to insert the month, including HNSW index maintenance
+- search: p50 latency of an unfiltered top-k query over everything
+- recent: p50 latency of a top-k query filtered to the last 30 days
+
+It then archives the oldest month, ingests into that month again and archives
+it a second time, which must not collide with the first archive.
+
+    python -m benchmarks.partitions --months 12 --rows-per-month 20000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from benchmarks.common import percentile, print_table
+from src.config.database import bulk_engine
+from src.modules.persistence.partitions import (
+    ARCHIVE_PREFIX,
+    add_months,
+    ensure_partitions,
+    retire_partitions,
+)
+
+FLAT_TABLE = "bench_chunks_flat"
+PARTITIONED_TABLE = "bench_chunks_part"
+EMBEDDING_DIM = 384
+TOP_K = 5
+
+COLUMNS = f"id bigint, published_on date NOT NULL, embedding vector({EMBEDDING_DIM})"
+# Correlated on `g` so every row gets its own vector
+INSERT_MONTH = f"""
+INSERT INTO {{table}} (id, published_on, embedding)
+SELECT g, CAST(:start AS date) + CAST(g % :days AS integer),
+       ARRAY(SELECT random() FROM generate_series(1, {EMBEDDING_DIM}) WHERE g > 0)::vector
+FROM generate_series(CAST(:first_id AS bigint), CAST(:last_id AS bigint)) AS g
+"""
+SEARCH = "SELECT id FROM {table} {where} ORDER BY embedding <=> CAST(:query AS vector) LIMIT :k"
+
+
+async def create_tables(conn: AsyncConnection) -> None:
+    await drop_tables(conn)
+    await conn.execute(text(f"CREATE TABLE {FLAT_TABLE} ({COLUMNS})"))
+    await conn.execute(
+        text(f"CREATE TABLE {PARTITIONED_TABLE} ({COLUMNS}) PARTITION BY RANGE (published_on)")
+    )
+    for table in (FLAT_TABLE, PARTITIONED_TABLE):
+        await conn.execute(
+            text(f"CREATE INDEX ON {table} USING hnsw (embedding vector_cosine_ops)")
+        )
+
+
+async def drop_tables(conn: AsyncConnection) -> None:
+    archives = await conn.scalars(
+        text("SELECT tablename FROM pg_tables WHERE tablename LIKE :pattern"),
+        {"pattern": f"{ARCHIVE_PREFIX}{PARTITIONED_TABLE}_%"},
+    )
+    for table in (FLAT_TABLE, PARTITIONED_TABLE, *archives):
+        await conn.execute(text(f'DROP TABLE IF EXISTS "{table}" CASCADE'))
+
+
+async def check_rearchive(months: int, rows_per_month: int, first_month: date) -> None:
+    """Archive the oldest month, load into it again (a late backfill), archive again."""
+    for attempt in range(2):
+        if attempt:
+            async with bulk_engine.begin() as conn:
+                await ensure_partitions(conn, [first_month], table=PARTITIONED_TABLE)
+            await load_month(PARTITIONED_TABLE, first_month, months * rows_per_month + 1, 10)
+        async with bulk_engine.begin() as conn:
+            retired = await retire_partitions(conn, months - 1, "archive", table=PARTITIONED_TABLE)
+        if len(retired) != 1:
+            raise SystemExit(f"expected to archive {first_month:%Y-%m}, archived {retired}")
+    print(f"{first_month:%Y-%m} archived twice without a name collision")
+
+
+async def load_month(table: str, month: date, first_id: int, rows: int) -> float:
+    days = (add_months(month, 1) - month).days
+    start = time.perf_counter()
+    async with bulk_engine.begin() as conn:
+        await conn.execute(
+            text(INSERT_MONTH.format(table=table)),
+            {"start": month, "days": days, "first_id": first_id, "last_id": first_id + rows - 1},
+        )
+    return time.perf_counter() - start
+
+
+async def search_p50(table: str, queries: list[str], since: date | None) -> float:
+    where = "WHERE published_on >= :since" if since else ""
+    statement = text(SEARCH.format(table=table, where=where))
+    samples = []
+    async with bulk_engine.connect() as conn:
+        for query in queries:
+            params = {"query": query, "k": TOP_K}
+            if since:
+                params["since"] = since
+            start = time.perf_counter()
+            await conn.execute(statement, params)
+            samples.append(time.perf_counter() - start)
+    return percentile(samples, 50) * 1000
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    queries = [
+        str([rng.random() for _ in range(EMBEDDING_DIM)]) for _ in range(args.queries)
+    ]
+    first_month = add_months(date.today().replace(day=1), -(args.months - 1))
+
+    rows = []
+    try:
+        async with bulk_engine.begin() as conn:
+            await create_tables(conn)
+        for i in range(args.months):
+            month = add_months(first_month, i)
+            async with bulk_engine.begin() as conn:
+                await ensure_partitions(conn, [month], table=PARTITIONED_TABLE)
+            first_id = i * args.rows_per_month + 1
+            since = add_months(month, 1) - timedelta(days=30)
+            for name, table in (("flat", FLAT_TABLE), ("partitioned", PARTITIONED_TABLE)):
+                ingest = await load_month(table, month, first_id, args.rows_per_month)
+                async with bulk_engine.begin() as conn:
+                    await conn.execute(text(f"ANALYZE {table}"))
+                search = await search_p50(table, queries, None)
+                recent = await search_p50(table, queries, since)
+                rows.append([f"{month:%Y-%m}", name, (i + 1) * args.rows_per_month, ingest, search, recent])
+                print(f"{month:%Y-%m} {name:>11}: ingest {ingest:.2f}s  search {search:.2f}ms  recent {recent:.2f}ms")
+        if args.months > 1:
+            await check_rearchive(args.months, args.rows_per_month, first_month)
+    finally:
+        async with bulk_engine.begin() as conn:
+            await drop_tables(conn)
+        await bulk_engine.dispose()
+
+    print()
+    print_table(["month", "layout", "rows", "ingest s", "search ms", "recent ms"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--rows-per-month", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
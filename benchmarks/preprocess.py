@@ -0,0 +1,171 @@
+"""Preprocessing throughput of `PreprocessorService.preprocess` against the
+previous three-pass composer (clean → normalize → filter_language, full-text
+langdetect, character splitter).
+
+Runs on a synthetic corpus of English articles with a share of non-English and
+too-short ones, entirely in memory:
+
+    python -m benchmarks.preprocess --articles 2000 --workers 1,4
+"""
+
+import argparse
+import asyncio
+import html
+import os
+import random
+import re
+import time
+import unicodedata
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langdetect import detect
+from langdetect.lang_detect_exception import LangDetectException
+
+from benchmarks.common import print_table
+from src.modules.preprocessor.composer import PreprocessorComposer
+from src.modules.preprocessor.schemas import ChunkBatch, PreprocessResult
+from src.modules.preprocessor.service import BATCH_SIZE, MIN_CONTENT_LENGTH, PreprocessorService
+from src.modules.scraper.schemas import ScrapedArticle
+
+LEGACY_CHUNK_SIZE = 1000
+LEGACY_CHUNK_OVERLAP = 150
+
+ENGLISH = (
+    "The European Commission has today approved, under EU State aid rules, a &euro;1.2 billion "
+    "scheme to support companies in the renewable energy sector. The scheme will contribute to "
+    "the achievement of the EU’s climate objectives and will be open to companies of all sizes. "
+    "Executive Vice-President said that this measure is in line with the Green Deal — and that "
+    "Member States have been consulted on its design.  "
+)
+FRENCH = (
+    "La Commission européenne a approuvé aujourd'hui, en vertu des règles de l'UE en "
+    "matière d'aides d'État, un régime de 1,2 milliard d'euros visant à soutenir les "
+    "entreprises du secteur des énergies renouvelables.  "
+)
+
+
+def make_corpus(n_articles: int, seed: int) -> list[ScrapedArticle]:
+    rng = random.Random(seed)
+    articles = []
+    for i in range(n_articles):
+        roll = rng.random()
+        if roll < 0.05:
+            content = "Read more."
+        elif roll < 0.15:
+            content = FRENCH * rng.randint(5, 30)
+        else:
+            content = ENGLISH * rng.randint(5, 30)
+        articles.append(
+            ScrapedArticle(
+                title=f"Article &amp; {i}",
+                url=f"https://example.com/{i}",
+                summary="",
+                content=content,
+            )
+        )
+    return articles
+
+
+class LegacyPreprocessor:
+    """The composer-based implementation, kept here as the baseline."""
+
+    def __init__(self) -> None:
+        self._composer = PreprocessorComposer()
+        self._composer.add_step("clean", self._clean)
+        self._composer.add_step("normalize", self._normalize)
+        self._composer.add_step("filter_language", self._filter_language)
+        self._splitter = RecursiveCharacterTextSplitter(
+            chunk_size=LEGACY_CHUNK_SIZE, chunk_overlap=LEGACY_CHUNK_OVERLAP
+        )
+
+    async def _clean(self, articles):
+        cleaned = []
+        for article in articles:
+            content = html.unescape(article.content)
+            content = re.sub(r"\s+", " ", content).strip()
+            title = html.unescape(article.title).strip()
+            cleaned.append(article.model_copy(update={"content": content, "title": title}))
+        return cleaned
+
+    async def _normalize(self, articles):
+        normalized = []
+        for article in articles:
+            content = unicodedata.normalize("NFKD", article.content)
+            content = content.replace("\u2018", "'").replace("\u2019", "'")
+            content = content.replace("\u201c", '"').replace("\u201d", '"')
+            content = content.replace("\u2013", "-").replace("\u2014", "-")
+            title = unicodedata.normalize("NFKD", article.title)
+            normalized.append(article.model_copy(update={"content": content, "title": title}))
+        return normalized
+
+    async def _filter_language(self, articles):
+        filtered = []
+        for article in articles:
+            if len(article.content) < MIN_CONTENT_LENGTH:
+                continue
+            try:
+                lang = detect(article.content)
+            except LangDetectException:
+                continue
+            if lang == "en":
+                filtered.append(article)
+        return filtered
+
+    async def preprocess(self, articles):
+        cleaned = await self._composer.run(articles)
+        splits = [
+            (a, i, f"{article.title}: {text}")
+            for a, article in enumerate(cleaned)
+            for i, text in enumerate(self._splitter.split_text(article.content))
+        ]
+        chunks = ChunkBatch(
+            texts=[text for _, _, text in splits],
+            article=[a for a, _, _ in splits],
+            chunk_index=[i for _, i, _ in splits],
+        )
+        return PreprocessResult(articles=cleaned, chunks=chunks)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    articles = make_corpus(args.articles, args.seed)
+    implementations: dict[str, tuple[object, int]] = {"legacy": (LegacyPreprocessor(), 1)}
+    for workers in dict.fromkeys(args.workers):
+        implementations[f"fused x{workers}"] = (PreprocessorService(workers=workers, dedup=False), workers)
+
+    rows = []
+    reference: list[str] | None = None  # URLs of the articles the baseline keeps
+    for name, (service, workers) in implementations.items():
+        if workers > 1:
+            await service.preprocess(articles[: 2 * BATCH_SIZE * workers])  # start the pool
+        start = time.perf_counter()
+        result = await service.preprocess(articles)
+        elapsed = time.perf_counter() - start
+        kept = [article.url for article in result.articles]
+        reference = reference or kept
+        rows.append([
+            name, len(kept), len(result.chunks), elapsed, len(articles) / elapsed,
+            "yes" if kept == reference else "no",
+        ])
+        print(f"{name:>10}: {elapsed:.2f}s")
+        if isinstance(service, PreprocessorService):
+            service.shutdown()
+
+    print()
+    print_table(["impl", "kept", "chunks", "seconds", "articles/s", "same articles"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument(
+        "--workers",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[1, os.cpu_count() or 1],
+        help="process-pool sizes to compare",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
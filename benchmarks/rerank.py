@@ -0,0 +1,135 @@
+"""Cross-encoder reranking: added latency vs. prompt size and TTFT saved.
+
+For each question (lines of --input, or titles sampled from the corpus) it
+builds the chat prompt two ways:
+
+- baseline: the top --baseline-k chunks of the vector search
+- rerank:   the top --candidates chunks, reranked down to --top-k
+
+and records the search and rerank time (first call, then with the score
+cache warm), the chunks and documents in the prompt, and its token count.
+With --model, each prompt is also sent to the configured inference endpoint
+with max_tokens=1 to time the first token (e.g. against benchmarks.stub_llm
+with --prefill-tokens-per-sec, or a real provider).
+
+    python -m benchmarks.rerank --questions 50 --baseline-k 10 --candidates 30 --top-k 3
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+from benchmarks.common import percentile, print_table
+from src.config.database import dispose_engines, read_session
+from src.config.settings import settings
+from src.modules.embedder.service import embedder_service
+from src.modules.inference.router import _build_messages
+from src.modules.inference.service import inference_service
+from src.modules.persistence.models import Document
+from src.modules.persistence.service import persistence_service
+from src.modules.reranker.service import reranker_service
+
+
+async def load_questions(args: argparse.Namespace) -> list[str]:
+    if args.input:
+        return [line.strip() for line in Path(args.input).read_text().splitlines() if line.strip()]
+    async with read_session() as session:
+        titles = await session.scalars(
+            select(Document.title).order_by(func.random()).limit(args.questions)
+        )
+        return list(titles)
+
+
+async def time_first_token(messages: list[dict], model: str) -> float:
+    start = time.perf_counter()
+    async for _ in inference_service.stream_chat(messages, model, temperature=0.0, max_tokens=1):
+        break
+    return time.perf_counter() - start
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    questions = await load_questions(args)
+    if not questions:
+        raise SystemExit("No questions: the corpus is empty and no --input was given")
+    await embedder_service.warm_up()
+    await reranker_service.warm_up()
+
+    samples: dict[str, dict[str, list[float]]] = {
+        name: {key: [] for key in ("search", "rerank", "cached", "chunks", "documents", "tokens", "ttft")}
+        for name in ("baseline", "rerank")
+    }
+    for question in questions:
+        embedding = await embedder_service.embed_query(question)
+        plans = {"baseline": args.baseline_k, "rerank": args.candidates}
+        for name, limit in plans.items():
+            start = time.perf_counter()
+            sources = await persistence_service.search_similar(embedding, limit=limit)
+            samples[name]["search"].append(time.perf_counter() - start)
+            if name == "rerank":
+                for key in ("rerank", "cached"):  # the second call hits the score cache
+                    start = time.perf_counter()
+                    reranked = await reranker_service.rerank(question, sources, args.top_k)
+                    samples[name][key].append(time.perf_counter() - start)
+                sources = reranked
+
+            messages = _build_messages(question, sources, [])
+            tokens = sum(len(tokenizer(m["content"], verbose=False)["input_ids"]) for m in messages)
+            samples[name]["chunks"].append(len(sources))
+            samples[name]["documents"].append(len({s.document_url for s in sources}))
+            samples[name]["tokens"].append(tokens)
+            if args.model:
+                samples[name]["ttft"].append(await time_first_token(messages, args.model))
+
+    rows = []
+    for name, s in samples.items():
+        rows.append([
+            name,
+            percentile(s["chunks"], 50),
+            percentile(s["documents"], 50),
+            percentile(s["tokens"], 50),
+            percentile(s["tokens"], 95),
+            percentile(s["search"], 50) * 1000,
+            percentile(s["rerank"], 50) * 1000,
+            percentile(s["rerank"], 95) * 1000,
+            percentile(s["cached"], 50) * 1000,
+            percentile(s["ttft"], 50) * 1000,
+            percentile(s["ttft"], 95) * 1000,
+        ])
+    print(f"{len(questions)} questions; rerank model {settings.rerank_model}")
+    print_table(
+        ["prompt", "chunks", "docs", "tokens p50", "tokens p95", "search ms", "rerank ms p50",
+         "rerank ms p95", "cached ms", "ttft ms p50", "ttft ms p95"],
+        rows,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="file with one question per line")
+    parser.add_argument("--questions", type=int, default=50, help="titles sampled when there is no --input")
+    parser.add_argument("--baseline-k", type=int, default=10, help="chunks in the prompt without reranking")
+    parser.add_argument("--candidates", type=int, default=30, help="chunks fetched for the reranker")
+    parser.add_argument("--top-k", type=int, default=3, help="chunks kept after reranking")
+    parser.add_argument("--model", help="also time the first token from this model")
+    parser.add_argument(
+        "--tokenizer", default="sentence-transformers/all-MiniLM-L6-v2", help="counts the prompt tokens"
+    )
+    args = parser.parse_args()
+
+    async def run() -> None:
+        try:
+            await main_async(args)
+        finally:
+            await dispose_engines()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Local stand-in for an OpenAI/HF-compatible chat-completions server.
+
+Streams synthetic tokens with a configurable time-to-first-token, decode rate
+and error rate, so the chat path can be load-tested without network or GPU.
+With --prefill-tokens-per-sec, the TTFT also grows with the prompt (about four
+characters per token):
+
+    python -m benchmarks.stub_llm --ttft 0.4 --tokens-per-sec 40 --error-rate 0.01
+    INFERENCE_BASE_URL=http://localhost:8081/v1 uvicorn src.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CHARS_PER_TOKEN = 4
+WORDS = (
+    "the commission proposed new rules on energy markets trade digital services "
+    "member states agreed funding for research climate migration security policy"
+).split()
+
+
+@dataclass
+class StubConfig:
+    ttft: float = 0.5
+    ttft_jitter: float = 0.1
+    tokens_per_sec: float = 50.0
+    prefill_tokens_per_sec: float = 0.0  # 0: TTFT does not depend on the prompt
+    max_tokens: int = 200
+    error_rate: float = 0.0
+    seed: int | None = None
+
+
+config = StubConfig()
+app = FastAPI(title="Stub LLM")
+_rng = random.Random()
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason: str | None = None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "stub")
+    n_tokens = min(int(body.get("max_tokens") or config.max_tokens), config.max_tokens)
+
+    if _rng.random() < config.error_rate:
+        return JSONResponse(status_code=503, content={"error": "stub: injected failure"})
+
+    ttft = max(0.0, _rng.gauss(config.ttft, config.ttft_jitter))
+    if config.prefill_tokens_per_sec > 0:
+        prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+        ttft += prompt_chars / CHARS_PER_TOKEN / config.prefill_tokens_per_sec
+    interval = 1.0 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0.0
+    words = [_rng.choice(WORDS) for _ in range(n_tokens)]
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    if not body.get("stream"):
+        await asyncio.sleep(ttft + interval * n_tokens)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": " ".join(words)},
+                "finish_reason": "length",
+            }],
+        }
+
+    async def stream():
+        await asyncio.sleep(ttft)
+        yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+        for i, word in enumerate(words):
+            yield _chunk(completion_id, model, {"content": word if i == 0 else f" {word}"})
+            if interval:
+                await asyncio.sleep(interval)
+        yield _chunk(completion_id, model, {}, finish_reason="length")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--ttft", type=float, default=config.ttft, help="mean seconds to first token")
+    parser.add_argument("--ttft-jitter", type=float, default=config.ttft_jitter, help="stddev of TTFT")
+    parser.add_argument("--tokens-per-sec", type=float, default=config.tokens_per_sec)
+    parser.add_argument(
+        "--prefill-tokens-per-sec", type=float, default=config.prefill_tokens_per_sec,
+        help="prompt processing rate added to the TTFT (0: off)",
+    )
+    parser.add_argument("--max-tokens", type=int, default=config.max_tokens)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config.ttft = args.ttft
+    config.ttft_jitter = args.ttft_jitter
+    config.tokens_per_sec = args.tokens_per_sec
+    config.prefill_tokens_per_sec = args.prefill_tokens_per_sec
+    config.max_tokens = args.max_tokens
+    config.error_rate = args.error_rate
+    config.seed = args.seed
+    _rng.seed(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,107 @@
+import time
 from collections.abc import AsyncIterator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config.settings import settings
+from src.modules.metrics.service import metrics_service
+
+_pool_wait = metrics_service.histogram(
+    "db_pool_wait_seconds", "Time to obtain a pooled database connection"
+)
+_pool_checkouts = metrics_service.counter(
+    "db_pool_checkouts_total", "Database connections checked out of the pool"
+)
+_pool_timeouts = metrics_service.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after db_pool_timeout"
+)
+_pool_in_use = metrics_service.gauge(
+    "db_pool_checked_out", "Database connections currently checked out"
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that reports checkout wait time and usage per pool name."""
+
+    # Log under SQLAlchemy's own namespace so pool chatter stays quiet by default
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+    @property
+    def label(self) -> str:
+        return self._orig_logging_name or "default"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            _pool_timeouts.inc(pool=self.label)
+            raise
+        _pool_wait.observe(time.perf_counter() - start, pool=self.label)
+        _pool_checkouts.inc(pool=self.label)
+        _pool_in_use.set(self.checkedout(), pool=self.label)
+        return connection
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        _pool_in_use.set(self.checkedout(), pool=self.label)
+
+
+def _create_engine(url: str, name: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            # asyncpg's own cache and SQLAlchemy's prepared-statement cache;
+            # set to 0 behind pgbouncer in transaction mode
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        },
+    )
+
+
+engine = _create_engine(
+    settings.database_url, "primary", settings.db_pool_size, settings.db_max_overflow
+)
+# Read-only traffic (vector search, conversation reads) goes to the replica when configured
+replica_engine = (
+    _create_engine(
+        settings.database_replica_url, "replica", settings.db_pool_size, settings.db_max_overflow
+    )
+    if settings.database_replica_url
+    else engine
+)
+# Bulk ingestion gets its own small pool so it cannot starve request traffic
+bulk_engine = _create_engine(settings.database_url, "bulk", settings.db_bulk_pool_size, 0)
+
+# Vector search shards (settings.vector_shard_urls); empty when search uses the primary
+shard_engines = [
+    _create_engine(url, f"shard{i}", settings.db_pool_size, settings.db_max_overflow)
+    for i, url in enumerate(settings.vector_shard_urls)
+]
 
-engine = create_async_engine(settings.database_url)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
+read_session = async_sessionmaker(replica_engine, expire_on_commit=False)
+bulk_session = async_sessionmaker(bulk_engine, expire_on_commit=False)
+
+
+async def dispose_engines() -> None:
+    for pool_engine in {engine, replica_engine, bulk_engine, *shard_engines}:
+        await pool_engine.dispose()
 
 
 class Base(DeclarativeBase):
@@ -1,3 +1,6 @@
+from datetime import date
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,8 +11,111 @@ class Settings(BaseSettings):
 
     hf_api_token: str
     database_url: str
+    database_replica_url: str | None = None  # read-only traffic; primary when unset
     app_host: str = "0.0.0.0"
     app_port: int = 8000
 
+    # Response compression for API responses of at least this many bytes
+    # (static assets are precompressed; the chat stream is never compressed)
+    gzip_minimum_size: int = 1024
+    gzip_level: int = 6
+
+    # Database connection pools (primary and replica share sizing)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_bulk_pool_size: int = 2
+
+    # Run the data collector scheduler inside the web process. Disable it when
+    # the pipeline runs as its own worker (python -m src.modules.data_collector_pipeline)
+    pipeline_scheduler_enabled: bool = True
+
+    # Article discovery — sources tried in order until one covers the window:
+    # RSS/Atom feeds, the XML sitemap (article URLs matching the pattern and
+    # changed since the window start), then the paginated news listing
+    scraper_discovery_sources: list[Literal["feed", "sitemap", "listing"]] = ["feed", "sitemap", "listing"]
+    scraper_feed_urls: list[str] = []
+    scraper_sitemap_url: str | None = "https://commission.europa.eu/sitemap.xml"
+    scraper_sitemap_pattern: str = r"/news-and-media/news/[^/?#]+$"
+
+    # Article fetch routing — the source that yields full content is learned
+    # per URL pattern and saved to scraper_routes_path; every Nth fetch on a
+    # route tries the full fallback chain again
+    scraper_routes_path: str = "scraper_routes.json"
+    scraper_route_verify_every: int = 20
+
+    # Processes for CPU-bound preprocessing (None: one per core)
+    preprocess_workers: int | None = None
+    # Link near-duplicate articles to a canonical copy and drop boilerplate chunks
+    preprocess_dedup: bool = True
+
+    # Bulk embedding of chunks — worker processes with embed_threads torch
+    # threads each (None: one worker per embed_threads cores); the batch size
+    # is tuned on throughput unless set
+    embed_workers: int | None = None
+    embed_threads: int = 4
+    embed_batch_size: int | None = None
+
+    # Chunk partitions — monthly by publication date; retention keeps the
+    # newest N months and archives (detaches) or drops the rest
+    chunk_partitions_ahead: int = 2
+    chunk_retention_months: int | None = None
+    chunk_retention_mode: Literal["archive", "drop"] = "archive"
+
+    # Write-behind message persistence
+    message_writer_batch_size: int = 100
+    message_writer_flush_interval: float = 0.02
+    message_writer_queue_size: int = 10_000
+    message_writer_stop_timeout: float = 30.0
+
+    # Startup — the app migrates the schema itself unless a separate deploy
+    # step (python -m src.modules.persistence.migrations) does it
+    db_migrate_on_startup: bool = True
+    embedder_warm_up: bool = True
+
+    # Inference — OpenAI-compatible chat-completions endpoint (e.g. a local
+    # stub server); requests go through HuggingFace providers when unset
+    inference_base_url: str | None = None
+
+    # Sharded vector search — documents and their embedded chunks are spread
+    # over these databases by a hash of the URL, or by publication date with
+    # "time" (shard i holds dates from boundary i-1 up to boundary i). The
+    # primary then keeps chunk text without embeddings. Empty: search the primary
+    vector_shard_urls: list[str] = []
+    vector_shard_strategy: Literal["hash", "time"] = "hash"
+    vector_shard_boundaries: list[date] = []
+    vector_shard_timeout: float = 2.0  # seconds; slower shards are left out of the results
+
+    # Search result cache — keyed by query embedding, limit and date filters,
+    # invalidated whenever ingest commits; "postgres" shares it between workers
+    retrieval_cache_backend: Literal["memory", "postgres", "none"] = "memory"
+    retrieval_cache_size: int = 1024
+
+    # Reranking — when enabled, search over-fetches rerank_candidates chunks
+    # and a CPU cross-encoder keeps the request's top_k best for the prompt
+    rerank_enabled: bool = False
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L6-v2"
+    rerank_candidates: int = 30
+    rerank_cache_size: int = 20_000  # cached (query, chunk) scores
+
+    # Chat admission control
+    chat_max_concurrency: int = 32
+    chat_model_max_concurrency: int = 8
+    chat_queue_size: int = 64
+    chat_queue_timeout: float = 15.0
+
+    # Sampling profiler — chat requests are profiled when they carry
+    # X-Profile-Token (which also guards /api/profiles) or at the sample
+    # rate; pipeline runs when pipeline_profiling is set or with --profile
+    profiling_token: str | None = None
+    profiling_sample_rate: float = 0.0
+    profiling_interval: float = 0.005
+    profiling_dir: str = "profiles"
+    profiling_keep: int = 200
+    pipeline_profiling: bool = False
+
 
 settings = Settings()
@@ -1,16 +1,25 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from pathlib import Path
 
 from fastapi import FastAPI
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy import text
+from fastapi.middleware.gzip import GZipMiddleware
 
-from src.config.database import Base, engine
+from src.config.database import dispose_engines
+from src.config.settings import settings
+from src.modules.assets.router import router as assets_router
+from src.modules.assets.service import asset_service
 from src.modules.conversation.router import router as conversation_router
 from src.modules.data_collector_pipeline.service import data_collector_pipeline_service
+from src.modules.embedder.service import embedder_service
+from src.modules.health.router import router as health_router
 from src.modules.inference.router import router as inference_router
+from src.modules.metrics.router import router as metrics_router
+from src.modules.persistence.migrations import setup_databases
+from src.modules.persistence.writer import message_writer
+from src.modules.profiling.middleware import ProfilingMiddleware
+from src.modules.profiling.router import router as profiling_router
+from src.modules.reranker.service import reranker_service
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,43 +27,44 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    import src.modules.persistence.models  # noqa: F401 — register ORM models
-
-    async with engine.begin() as conn:
-        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-        await conn.run_sync(Base.metadata.create_all)
-        await conn.execute(text("""
-            DO $$ BEGIN
-                ALTER TABLE messages ADD COLUMN sources JSONB;
-            EXCEPTION
-                WHEN duplicate_column THEN NULL;
-            END $$;
-        """))
-    logger.info("Database tables synced")
-
-    await data_collector_pipeline_service.start()
+    asset_service.build()
+
+    # Off where migrations run as a separate deploy step (see docker-compose.yml)
+    if settings.db_migrate_on_startup:
+        await setup_databases()
+
+    # Serve immediately; /ready reports the embedder once the warm-up batch is through
+    warm_up = asyncio.create_task(embedder_service.warm_up()) if settings.embedder_warm_up else None
+    rerank_warm_up = (
+        asyncio.create_task(reranker_service.warm_up())
+        if settings.rerank_enabled and settings.embedder_warm_up
+        else None
+    )
+
+    message_writer.start()
+    if settings.pipeline_scheduler_enabled:
+        await data_collector_pipeline_service.start()
 
     yield
+    for task in (warm_up, rerank_warm_up):
+        if task is not None:
+            task.cancel()
     await data_collector_pipeline_service.stop()
-    await engine.dispose()
+    # Flush queued messages before the pools close
+    await message_writer.stop()
+    await dispose_engines()
 
 
 app = FastAPI(title="Text Analysis", lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size, compresslevel=settings.gzip_level)
+app.add_middleware(ProfilingMiddleware)
 
 # API routes
 app.include_router(inference_router, prefix="/api/inference", tags=["inference"])
 app.include_router(conversation_router, prefix="/api/conversation", tags=["conversation"])
+app.include_router(metrics_router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(profiling_router, prefix="/api/profiles", tags=["profiling"])
+app.include_router(health_router, tags=["health"])
 
-# Static files
-static_dir = Path(__file__).parent / "static"
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
-
-
-@app.get("/")
-async def root():
-    return FileResponse(static_dir / "index.html")
-
-
-@app.get("/health")
-async def health():
-    return {"status": "ok"}
+# Frontend: index page and fingerprinted static assets
+app.include_router(assets_router, tags=["assets"])
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from src.modules.assets.service import asset_service
+
+router = APIRouter()
+
+
+@router.get("/")
+async def index(request: Request) -> Response:
+    return asset_service.response("index.html", request.headers)
+
+
+@router.get("/static/{name:path}")
+async def static_asset(name: str, request: Request) -> Response:
+    response = asset_service.response(name, request.headers)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return response
@@ -0,0 +1,130 @@
+"""Frontend assets, fingerprinted and precompressed once at startup.
+
+Every file under `src/static` is held in memory together with its gzip and
+(when the `brotli` package is installed) brotli encodings. Each file is also
+published under a content-hashed name, `app.js` → `app.<hash>.js`, which is
+cached as immutable. HTML pages reference the hashed names and are
+revalidated on every load through their ETag.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+from dataclasses import dataclass
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional; gzip alone still covers every browser
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parents[2] / "static"
+STATIC_URL = "/static/"
+FINGERPRINT_LENGTH = 12
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+ENCODINGS = ("br", "gzip")  # in order of preference
+
+
+@dataclass
+class Asset:
+    media_type: str
+    etag: str
+    cache_control: str
+    bodies: dict[str, bytes]  # content coding ("identity", "gzip", "br") → body
+
+
+def _encode(body: bytes) -> dict[str, bytes]:
+    bodies = {"identity": body}
+    compressed = {"gzip": gzip.compress(body, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    # Tiny files can grow when compressed
+    bodies.update((coding, data) for coding, data in compressed.items() if len(data) < len(body))
+    return bodies
+
+
+def _accepted(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        params = params.strip().replace(" ", "")
+        try:
+            if params.startswith("q=") and float(params[2:]) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+class AssetService:
+    def __init__(self, directory: Path = STATIC_DIR) -> None:
+        self._directory = directory
+        self._assets: dict[str, Asset] = {}
+
+    def build(self) -> None:
+        """Fingerprint and compress every static file, then rewrite the pages' links."""
+        assets: dict[str, Asset] = {}
+        urls: dict[str, str] = {}
+        files = sorted(p for p in self._directory.rglob("*") if p.is_file())
+
+        for path in files:
+            if path.suffix == ".html":
+                continue
+            name = path.relative_to(self._directory).as_posix()
+            body = path.read_bytes()
+            digest = hashlib.sha256(body).hexdigest()[:FINGERPRINT_LENGTH]
+            hashed = path.with_name(f"{path.stem}.{digest}{path.suffix}")
+            hashed_name = hashed.relative_to(self._directory).as_posix()
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            bodies = _encode(body)
+            # The plain name stays reachable for pages cached before a deploy
+            assets[name] = Asset(media_type, f'W/"{digest}"', REVALIDATE, bodies)
+            assets[hashed_name] = Asset(media_type, f'W/"{digest}"', IMMUTABLE, bodies)
+            urls[f'"{STATIC_URL}{name}"'] = f'"{STATIC_URL}{hashed_name}"'
+
+        for path in files:
+            if path.suffix != ".html":
+                continue
+            page = path.read_text()
+            for url, hashed_url in urls.items():
+                page = page.replace(url, hashed_url)
+            body = page.encode()
+            digest = hashlib.sha256(body).hexdigest()[:FINGERPRINT_LENGTH]
+            name = path.relative_to(self._directory).as_posix()
+            assets[name] = Asset("text/html; charset=utf-8", f'W/"{digest}"', REVALIDATE, _encode(body))
+
+        self._assets = assets
+        logger.info("Built %d static assets (%s)", len(files), "brotli, gzip" if brotli else "gzip")
+
+    def response(self, name: str, headers: Headers) -> Response | None:
+        """The asset as the client accepts it, 304 when its copy is current; None if unknown."""
+        asset = self._assets.get(name)
+        if asset is None:
+            return None
+        response_headers = {"ETag": asset.etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+        if _etag_matches(headers.get("if-none-match", ""), asset.etag):
+            return Response(status_code=304, headers=response_headers)
+
+        accepted = _accepted(headers.get("accept-encoding", ""))
+        coding = next((c for c in ENCODINGS if c in accepted and c in asset.bodies), "identity")
+        if coding != "identity":
+            response_headers["Content-Encoding"] = coding
+        return Response(asset.bodies[coding], media_type=asset.media_type, headers=response_headers)
+
+
+asset_service = AssetService()
@@ -1,33 +1,96 @@
 import uuid
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 
 from src.modules.conversation.schemas import (
     ConversationDetailResponse,
+    ConversationPage,
     ConversationResponse,
     CreateConversation,
+    MessageResponse,
 )
+from src.modules.persistence.pagination import InvalidCursor
+from src.modules.persistence.schemas import SourceDocument
 from src.modules.persistence.service import persistence_service
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 
 @router.post("", response_model=ConversationResponse, status_code=201)
 async def create_conversation(body: CreateConversation):
     return await persistence_service.create_conversation(title=body.title)
 
 
-@router.get("", response_model=list[ConversationResponse])
-async def list_conversations():
-    return await persistence_service.list_conversations()
+@router.get("", response_model=ConversationPage)
+async def list_conversations(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+):
+    try:
+        items, next_cursor = await persistence_service.list_conversations(limit=limit, cursor=cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    return ConversationPage(
+        items=[ConversationResponse.model_validate(item) for item in items],
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/{conversation_id}", response_model=ConversationDetailResponse)
-async def get_conversation(conversation_id: uuid.UUID):
+async def get_conversation(
+    conversation_id: uuid.UUID,
+    include_content: bool = False,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+):
     conversation = await persistence_service.get_conversation(conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    return conversation
+
+    try:
+        messages, next_cursor = await persistence_service.list_messages(
+            conversation_id, limit=limit, cursor=cursor
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+
+    # Sources are stored as references; bodies are hydrated only on request
+    sources = await persistence_service.get_message_sources(
+        [m.id for m in messages], include_content=include_content
+    )
+    return ConversationDetailResponse(
+        id=conversation.id,
+        title=conversation.title,
+        created_at=conversation.created_at,
+        updated_at=conversation.updated_at,
+        messages=[
+            MessageResponse(
+                id=m.id,
+                conversation_id=m.conversation_id,
+                role=m.role,
+                model_id=m.model_id,
+                content=m.content,
+                sources=sources.get(m.id),
+                created_at=m.created_at,
+            )
+            for m in messages
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/{conversation_id}/messages/{message_id}/sources",
+    response_model=list[SourceDocument],
+)
+async def get_message_sources(conversation_id: uuid.UUID, message_id: uuid.UUID):
+    sources = await persistence_service.get_message_sources(
+        [message_id], include_content=True, conversation_id=conversation_id
+    )
+    return sources.get(message_id, [])
 
 
 @router.delete("/{conversation_id}", status_code=204)
@@ -3,6 +3,8 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
+from src.modules.persistence.schemas import SourceDocument
+
 
 class CreateConversation(BaseModel):
     title: str = Field(..., max_length=255)
@@ -14,7 +16,7 @@ class MessageResponse(BaseModel):
     role: str
     model_id: str | None = None
     content: str
-    sources: list | None = None
+    sources: list[SourceDocument] | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -29,5 +31,11 @@ class ConversationResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ConversationPage(BaseModel):
+    items: list[ConversationResponse]
+    next_cursor: str | None = None
+
+
 class ConversationDetailResponse(ConversationResponse):
     messages: list[MessageResponse] = []
+    next_cursor: str | None = None  # continues towards older messages
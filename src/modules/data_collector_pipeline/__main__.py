@@ -0,0 +1,120 @@
+"""Pipeline worker, run outside the web process:
+
+    python -m src.modules.data_collector_pipeline run [--from 2026-01-21]
+    python -m src.modules.data_collector_pipeline stage scrape --from 2026-03-01 --output articles.json
+    python -m src.modules.data_collector_pipeline stage preprocess --input articles.json --output chunks.json
+    python -m src.modules.data_collector_pipeline stage embed --input chunks.json
+    python -m src.modules.data_collector_pipeline backfill --from 2025-01-01 --to 2025-12-31
+    python -m src.modules.data_collector_pipeline schedule
+
+`stage` runs a single stage and hands its result to the next one through a
+JSON file, which makes it easy to rerun or inspect one step. Without
+`--from`, `run` and `stage scrape` continue from the newest stored article. `--profile`
+writes a sampling profile of each pipeline run (see PROFILING_DIR).
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from src.config.database import dispose_engines
+from src.modules.data_collector_pipeline.service import data_collector_pipeline_service as pipeline
+from src.modules.preprocessor.schemas import PreprocessResult
+from src.modules.scraper.schemas import ScrapedArticle
+
+logger = logging.getLogger(__name__)
+
+_articles = TypeAdapter(list[ScrapedArticle])
+
+
+def _write(path: Path | None, data: bytes) -> None:
+    if path is None:
+        sys.stdout.buffer.write(data)
+    else:
+        path.write_bytes(data)
+
+
+def _read(path: Path | None) -> bytes:
+    return sys.stdin.buffer.read() if path is None else path.read_bytes()
+
+
+async def _stage(args: argparse.Namespace) -> None:
+    if args.name == "scrape":
+        articles = await pipeline.scrape(args.date_from or await pipeline.next_date_from(), args.date_to)
+        _write(args.output, _articles.dump_json(articles))
+    elif args.name == "preprocess":
+        result = await pipeline.preprocess(_articles.validate_json(_read(args.input)))
+        _write(args.output, result.model_dump_json().encode())
+    else:
+        await pipeline.embed(PreprocessResult.model_validate_json(_read(args.input)))
+
+
+async def _schedule(args: argparse.Namespace) -> None:
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+    await pipeline.start(run_now=args.run_now)
+    await stopped.wait()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    if getattr(args, "profile", False):
+        pipeline.profile = True
+    try:
+        if args.command == "run":
+            await pipeline.run(args.date_from, args.date_to)
+        elif args.command == "stage":
+            await _stage(args)
+        elif args.command == "backfill":
+            await pipeline.backfill(args.date_from, args.date_to, args.window_days)
+        else:
+            await _schedule(args)
+    finally:
+        await pipeline.stop()
+        await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.modules.data_collector_pipeline",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    profiled = argparse.ArgumentParser(add_help=False)
+    profiled.add_argument("--profile", action="store_true", help="write a sampling profile of each run")
+
+    run = commands.add_parser("run", parents=[profiled], help="run the whole pipeline once")
+    run.add_argument("--from", dest="date_from", type=datetime.fromisoformat)
+    run.add_argument("--to", dest="date_to", type=datetime.fromisoformat)
+
+    stage = commands.add_parser("stage", help="run a single stage")
+    stage.add_argument("name", choices=["scrape", "preprocess", "embed"])
+    stage.add_argument("--from", dest="date_from", type=datetime.fromisoformat)
+    stage.add_argument("--to", dest="date_to", type=datetime.fromisoformat)
+    stage.add_argument("--input", type=Path, help="previous stage's output (default: stdin)")
+    stage.add_argument("--output", type=Path, help="where to write this stage's result (default: stdout)")
+
+    backfill = commands.add_parser("backfill", parents=[profiled], help="run the pipeline over a past date range")
+    backfill.add_argument("--from", dest="date_from", type=datetime.fromisoformat, required=True)
+    backfill.add_argument("--to", dest="date_to", type=datetime.fromisoformat, default=datetime.now())
+    backfill.add_argument("--window-days", type=int, default=30, help="days scraped and stored per pass")
+
+    schedule = commands.add_parser("schedule", parents=[profiled], help="run the daily scheduler until stopped")
+    schedule.add_argument(
+        "--no-run-now", dest="run_now", action="store_false", help="wait for the first scheduled run"
+    )
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
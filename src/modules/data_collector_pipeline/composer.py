@@ -1,5 +1,8 @@
 import logging
 from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from src.modules.profiling.service import profile_id, profiler_service
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +18,15 @@ class PipelineComposer:
     def add_step(self, name: str, step: PipelineStep) -> None:
         self._steps.append((name, step))
 
-    async def run(self) -> None:
+    async def run(self, profile: bool = False) -> None:
+        if not profile:
+            await self._run_steps()
+            return
+        run_id = profile_id("pipeline", datetime.now().strftime("%Y%m%dT%H%M%S%f"))
+        async with profiler_service.profile("pipeline", run_id):
+            await self._run_steps()
+
+    async def _run_steps(self) -> None:
         logger.info("Pipeline started (%d steps)", len(self._steps))
         for name, step in self._steps:
             logger.info("Running step: %s", name)
@@ -1,12 +1,14 @@
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
+from src.config.settings import settings
 from src.modules.data_collector_pipeline.composer import PipelineComposer
-from src.modules.embedder.service import embedder_service
+from src.modules.embedder.bulk import bulk_embedder
+from src.modules.persistence.partitions import partition_service
 from src.modules.persistence.service import persistence_service
 from src.modules.preprocessor.schemas import PreprocessResult
 from src.modules.scraper.schemas import ScrapedArticle
@@ -15,7 +17,8 @@ from src.modules.preprocessor.service import preprocessor_service
 
 logger = logging.getLogger(__name__)
 
-SCRAPE_DATE_FROM = datetime(2026, 1, 21, 18, 45, 59)
+SCRAPE_DATE_FROM = datetime(2026, 1, 21, 18, 45, 59)  # first run, on an empty database
+RESCRAPE_OVERLAP = timedelta(days=1)  # listing dates are whole days; already stored URLs are skipped
 
 
 class DataCollectorPipelineService:
@@ -25,42 +28,97 @@ class DataCollectorPipelineService:
         self._composer.add_step("preprocess", self._preprocess)
         self._composer.add_step("embed", self._embed)
         self._scheduler = AsyncIOScheduler()
+        self._window: tuple[datetime, datetime | None] = (SCRAPE_DATE_FROM, None)
         self._scraped_articles: list[ScrapedArticle] = []
         self._preprocess_result: PreprocessResult | None = None
+        self.profile = settings.pipeline_profiling  # sample each run into a profile
 
-    async def _scrape(self) -> None:
-        result = await scraper_service.scrape(SCRAPE_DATE_FROM)
-        self._scraped_articles = result.articles
+    # ── Stages ──────────────────────────────────────────────────
+
+    async def scrape(self, date_from: datetime, date_to: datetime | None = None) -> list[ScrapedArticle]:
+        items = await scraper_service.discover(date_from, date_to)
+        known = await persistence_service.get_document_urls([item.url for item in items])
+        new_items = [item for item in items if item.url not in known]
+        logger.info("Scrape step: %d discovered, %d already stored", len(items), len(known))
+        result = await scraper_service.fetch_articles(new_items)
         logger.info("Scrape step collected %d articles", result.total)
+        return result.articles
 
-    async def _preprocess(self) -> None:
-        self._preprocess_result = await preprocessor_service.preprocess(self._scraped_articles)
+    async def preprocess(self, articles: list[ScrapedArticle]) -> PreprocessResult:
+        known = await persistence_service.get_document_signatures()
+        result = await preprocessor_service.preprocess(articles, known)
         logger.info(
             "Preprocess step produced %d chunks from %d articles",
-            len(self._preprocess_result.chunks),
-            len(self._preprocess_result.articles),
+            len(result.chunks),
+            len(result.articles),
         )
+        return result
 
-    async def _embed(self) -> None:
-        result = self._preprocess_result
-        embeddings = await embedder_service.embed(result.chunks)
-        await persistence_service.batch_store(result.articles, result.chunks, embeddings)
+    async def embed(self, result: PreprocessResult) -> None:
+        result.chunks.embeddings = await bulk_embedder.embed(result.chunks.texts)
+        await persistence_service.batch_store(
+            result.articles, result.chunks, result.signatures, result.duplicates
+        )
         logger.info("Embed step completed")
 
-    async def start(self) -> None:
-        asyncio.create_task(self._composer.run())
+    async def _scrape(self) -> None:
+        self._scraped_articles = await self.scrape(*self._window)
+
+    async def _preprocess(self) -> None:
+        self._preprocess_result = await self.preprocess(self._scraped_articles)
+
+    async def _embed(self) -> None:
+        await self.embed(self._preprocess_result)
+
+    # ── Runs ────────────────────────────────────────────────────
+
+    async def next_date_from(self) -> datetime:
+        """Where an incremental run starts: just before the newest stored article."""
+        latest = await persistence_service.get_latest_publication_date()
+        return latest - RESCRAPE_OVERLAP if latest else SCRAPE_DATE_FROM
+
+    async def run(self, date_from: datetime | None = None, date_to: datetime | None = None) -> None:
+        self._window = (date_from or await self.next_date_from(), date_to)
+        try:
+            await self._composer.run(profile=self.profile)
+        finally:
+            self._scraped_articles, self._preprocess_result = [], None
+
+    async def backfill(self, date_from: datetime, date_to: datetime, window_days: int = 30) -> None:
+        """Run the pipeline over [date_from, date_to] one window at a time, bounding memory."""
+        start = date_from
+        while start < date_to:
+            end = min(start + timedelta(days=window_days), date_to)
+            logger.info("Backfilling %s → %s", start.date(), end.date())
+            await self.run(start, end)
+            start = end
+
+    # ── Scheduling ──────────────────────────────────────────────
+
+    async def start(self, run_now: bool = True) -> None:
+        if run_now:
+            asyncio.create_task(self.run())
         self._scheduler.add_job(
-            self._composer.run,
+            self.run,
             CronTrigger(hour=3, minute=0),
             id="data_collector_pipeline",
             replace_existing=True,
         )
+        self._scheduler.add_job(
+            partition_service.maintain,
+            CronTrigger(hour=2, minute=30),
+            id="chunk_partition_maintenance",
+            replace_existing=True,
+        )
         self._scheduler.start()
         logger.info("Scheduler started — pipeline runs daily at 03:00")
 
     async def stop(self) -> None:
-        self._scheduler.shutdown(wait=False)
-        logger.info("Scheduler stopped")
+        if self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+            logger.info("Scheduler stopped")
+        preprocessor_service.shutdown()
+        bulk_embedder.shutdown()
 
 
 data_collector_pipeline_service = DataCollectorPipelineService()
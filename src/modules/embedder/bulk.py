@@ -0,0 +1,196 @@
+"""Bulk embedding for ingestion, sharded across worker processes.
+
+Texts are embedded in windows of consecutive chunks. Within a window they are
+sorted by length, so every batch pads to about the same length. The batches
+are spread over `EMBED_WORKERS` processes, each pinned to its own
+`EMBED_THREADS` cores with as many torch intra-op threads. Vectors come back
+as float32 arrays in the original order, one window at a time. Unless
+`EMBED_BATCH_SIZE` is set, the batch size is tuned between windows by
+hill-climbing on throughput, and held once more steps stop paying off.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.config.settings import settings
+from src.modules.embedder.service import EMBEDDING_DIM, EMBEDDING_MODEL
+from src.modules.metrics.service import metrics_service
+from src.modules.profiling.service import profiler_service, start_worker_sampler
+
+logger = logging.getLogger(__name__)
+
+INITIAL_BATCH_SIZE = 32
+MIN_BATCH_SIZE = 8
+MAX_BATCH_SIZE = 256
+BATCHES_PER_WORKER = 8  # per window; bounds memory and how often the batch size is tuned
+TOLERANCE = 0.03  # throughput changes smaller than this count as noise
+PROBE_EVERY = 16  # windows at a settled batch size before trying a step either way
+
+_batch_size = metrics_service.gauge("embed_batch_size", "Current bulk embedding batch size")
+_throughput = metrics_service.gauge("embed_chunks_per_second", "Bulk embedding throughput of the last window")
+_embedded = metrics_service.counter("embed_chunks_total", "Chunks embedded by the bulk embedder")
+
+# ── Worker process ──────────────────────────────────────────────
+
+_model = None
+
+
+def _init_worker(threads: int, counter, profiling: tuple) -> None:
+    global _model
+    start_worker_sampler(*profiling)
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    # Before torch is imported, so OpenMP/MKL size their pools to match
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    if hasattr(os, "sched_setaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+        first = index * threads % len(cores)
+        os.sched_setaffinity(0, cores[first : first + threads] or cores)
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    _model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+
+
+def _encode(texts: list[str], batch_size: int) -> np.ndarray:
+    return _model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+# ── Batch size tuning ───────────────────────────────────────────
+
+
+class AdaptiveBatchSize:
+    """Doubles or halves the batch size while throughput improves.
+
+    A step that changes throughput by less than TOLERANCE settles the size, and
+    one that loses throughput is undone. A settled size is kept for
+    PROBE_EVERY windows, then one step is tried, alternating directions.
+    """
+
+    def __init__(self, initial: int = INITIAL_BATCH_SIZE) -> None:
+        self.size = initial
+        self._previous = initial
+        self._direction = 1
+        self._last = 0.0
+        self._settled = False
+        self._held = 0
+
+    def _step(self) -> None:
+        size = self.size * 2 if self._direction > 0 else self.size // 2
+        if not MIN_BATCH_SIZE <= size <= MAX_BATCH_SIZE:
+            self._direction = -self._direction
+            size = self.size * 2 if self._direction > 0 else self.size // 2
+        self._previous, self.size = self.size, size
+
+    def update(self, throughput: float) -> None:
+        if self._settled:
+            self._held += 1
+            self._last = throughput
+            if self._held >= PROBE_EVERY:
+                self._settled, self._held = False, 0
+                self._direction = -self._direction
+                self._step()
+        elif throughput > self._last * (1 + TOLERANCE):
+            self._last = throughput
+            self._step()
+        elif throughput < self._last * (1 - TOLERANCE):
+            self.size = self._previous
+            self._settled = True
+        else:
+            self._last = throughput
+            self._settled = True
+
+
+class BulkEmbedder:
+    def __init__(
+        self,
+        workers: int | None = settings.embed_workers,
+        threads: int = settings.embed_threads,
+        batch_size: int | None = settings.embed_batch_size,
+    ) -> None:
+        cores = os.cpu_count() or 1
+        self._threads = max(1, min(threads, cores))
+        self._workers = workers or max(1, cores // self._threads)
+        self._fixed = batch_size is not None
+        self._tuner = AdaptiveBatchSize(batch_size or INITIAL_BATCH_SIZE)
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def batch_size(self) -> int:
+        return self._tuner.size
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")  # no forked torch state
+            self._pool = ProcessPoolExecutor(
+                self._workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._threads, context.Value("i", 0), profiler_service.worker_initargs()),
+            )
+            logger.info("Started %d embedding workers x %d threads", self._workers, self._threads)
+        return self._pool
+
+    async def stream(self, texts: list[str]) -> AsyncIterator[np.ndarray]:
+        """Yield the vectors of consecutive windows of `texts`, in input order."""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        start = 0
+        while start < len(texts):
+            batch_size = self._tuner.size
+            window_size = batch_size * self._workers * BATCHES_PER_WORKER
+            window = texts[start : start + window_size]
+            order = sorted(range(len(window)), key=lambda i: len(window[i]), reverse=True)
+
+            began = time.perf_counter()
+            batches = await asyncio.gather(*(
+                loop.run_in_executor(pool, _encode, [window[i] for i in order[b : b + batch_size]], batch_size)
+                for b in range(0, len(order), batch_size)
+            ))
+            elapsed = time.perf_counter() - began
+            sorted_vectors = np.concatenate(batches)
+            vectors = np.empty_like(sorted_vectors)
+            vectors[order] = sorted_vectors
+
+            _embedded.inc(len(window))
+            _throughput.set(len(window) / elapsed)
+            _batch_size.set(batch_size)
+            # A short final window says little about the batch size
+            if not self._fixed and len(window) == window_size:
+                self._tuner.update(sum(map(len, window)) / elapsed)
+            start += len(window)
+            logger.info(
+                "Embedded %d/%d texts (batch size %d, %.0f texts/s)",
+                start, len(texts), batch_size, len(window) / elapsed,
+            )
+            yield vectors
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        """All vectors as one contiguous (len(texts) × EMBEDDING_DIM) float32 array."""
+        vectors = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        start = 0
+        async for window in self.stream(texts):
+            vectors[start : start + len(window)] = window
+            start += len(window)
+        logger.info("Embedding complete: %d vectors", len(vectors))
+        return vectors
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+bulk_embedder = BulkEmbedder()
@@ -1,39 +1,79 @@
+import asyncio
 import logging
+import threading
+import time
+from typing import TYPE_CHECKING
 
-from langchain_huggingface import HuggingFaceEmbeddings
-
-from src.modules.preprocessor.schemas import ProcessedChunk
+if TYPE_CHECKING:
+    from langchain_huggingface import HuggingFaceEmbeddings
 
 logger = logging.getLogger(__name__)
 
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
-BATCH_SIZE = 64
+EMBEDDING_DIM = 384
+WARM_UP_TEXTS = ["warm-up"] * 8
 
 
 class EmbedderService:
     def __init__(self) -> None:
-        self._embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+        self._embeddings: "HuggingFaceEmbeddings | None" = None
+        self._load_lock = threading.Lock()
+        self._status = "not_loaded"
+        self._error: str | None = None
+
+    @property
+    def embeddings(self) -> "HuggingFaceEmbeddings":
+        # Imported and loaded on first use so importing the app stays cheap (no torch)
+        if self._embeddings is None:
+            with self._load_lock:
+                if self._embeddings is None:
+                    self._status = "loading"
+                    start = time.perf_counter()
+                    try:
+                        from langchain_huggingface import HuggingFaceEmbeddings
+
+                        self._embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+                    except Exception as exc:
+                        self._status, self._error = "failed", str(exc)
+                        raise
+                    self._status, self._error = "ready", None
+                    logger.info(
+                        "Loaded embedding model %s in %.1fs",
+                        EMBEDDING_MODEL,
+                        time.perf_counter() - start,
+                    )
+        return self._embeddings
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @property
+    def error(self) -> str | None:
+        return self._error
+
+    async def warm_up(self) -> None:
+        """Load the model and run a dummy batch off the event loop."""
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._embed_documents, WARM_UP_TEXTS)
+        except Exception:
+            logger.exception("Embedder warm-up failed")
+            return
+        logger.info("Embedder warm-up finished in %.1fs", time.perf_counter() - start)
+
+    def _embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    def _embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
 
     async def embed_query(self, text: str) -> list[float]:
-        return self._embeddings.embed_query(text)
-
-    async def embed(self, chunks: list[ProcessedChunk]) -> list[list[float]]:
-        texts = [chunk.content for chunk in chunks]
-
-        all_vectors: list[list[float]] = []
-        for i in range(0, len(texts), BATCH_SIZE):
-            batch = texts[i : i + BATCH_SIZE]
-            vectors = self._embeddings.embed_documents(batch)
-            all_vectors.extend(vectors)
-            logger.info(
-                "Embedded batch %d/%d (%d texts)",
-                i // BATCH_SIZE + 1,
-                (len(texts) + BATCH_SIZE - 1) // BATCH_SIZE,
-                len(batch),
-            )
-
-        logger.info("Embedding complete: %d vectors", len(all_vectors))
-        return all_vectors
+        return await asyncio.to_thread(self._embed_query, text)
+
+    async def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        # One batched forward pass instead of a call per query
+        return await asyncio.to_thread(self._embed_documents, texts)
 
 
 embedder_service = EmbedderService()
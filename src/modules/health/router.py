@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Response
+
+from src.modules.health.schemas import ReadinessResponse
+from src.modules.health.service import health_service
+
+router = APIRouter()
+
+
+@router.get("/health")
+async def health():
+    # Liveness only — the process is up and serving
+    return {"status": "ok"}
+
+
+@router.get("/ready", response_model=ReadinessResponse)
+async def ready(response: Response):
+    report = await health_service.readiness()
+    if not report.ready:
+        response.status_code = 503
+    return report
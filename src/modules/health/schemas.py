@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class ComponentStatus(BaseModel):
+    status: str  # "ready", or why the component cannot serve yet
+    detail: str | None = None
+
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    components: dict[str, ComponentStatus]
@@ -0,0 +1,72 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config.database import Base, engine, replica_engine
+from src.config.settings import settings
+from src.modules.embedder.service import embedder_service
+from src.modules.health.schemas import ComponentStatus, ReadinessResponse
+
+CHECK_TIMEOUT = 2.0  # seconds per component probe
+READY = "ready"
+LAZY = "lazy"  # loads on first use; does not hold back readiness
+
+
+class HealthService:
+    def __init__(self) -> None:
+        self._schema_ready = False
+
+    async def _check_database(self, db_engine: AsyncEngine) -> ComponentStatus:
+        try:
+            async with asyncio.timeout(CHECK_TIMEOUT):
+                async with db_engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception as exc:
+            return ComponentStatus(status="unavailable", detail=str(exc) or type(exc).__name__)
+        return ComponentStatus(status=READY)
+
+    async def _check_schema(self) -> ComponentStatus:
+        # Once present the schema does not go away, so stop probing
+        if self._schema_ready:
+            return ComponentStatus(status=READY)
+        import src.modules.persistence.models  # noqa: F401 — register ORM models
+
+        stmt = text(
+            "SELECT name FROM unnest(CAST(:names AS text[])) AS name"
+            " WHERE to_regclass(name) IS NULL"
+        )
+        try:
+            async with asyncio.timeout(CHECK_TIMEOUT):
+                async with engine.connect() as conn:
+                    result = await conn.execute(stmt, {"names": list(Base.metadata.tables)})
+                    missing = list(result.scalars())
+        except Exception as exc:
+            return ComponentStatus(status="unavailable", detail=str(exc) or type(exc).__name__)
+        if missing:
+            return ComponentStatus(
+                status="pending_migration", detail=f"missing tables: {', '.join(sorted(missing))}"
+            )
+        self._schema_ready = True
+        return ComponentStatus(status=READY)
+
+    def _check_embedder(self) -> ComponentStatus:
+        # Without a warm-up nothing loads the model until the first query
+        if not settings.embedder_warm_up and embedder_service.status == "not_loaded":
+            return ComponentStatus(status=LAZY, detail="loads on the first query")
+        return ComponentStatus(status=embedder_service.status, detail=embedder_service.error)
+
+    async def readiness(self) -> ReadinessResponse:
+        checks = {"database": self._check_database(engine), "schema": self._check_schema()}
+        if replica_engine is not engine:
+            checks["replica"] = self._check_database(replica_engine)
+        results = await asyncio.gather(*checks.values())
+        components = dict(zip(checks, results))
+        components["embedder"] = self._check_embedder()
+        return ReadinessResponse(
+            ready=all(c.status in (READY, LAZY) for c in components.values()),
+            components=components,
+        )
+
+
+health_service = HealthService()
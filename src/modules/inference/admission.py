@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+
+from src.config.settings import settings
+from src.modules.inference.models import ALLOWED_MODELS
+from src.modules.metrics.service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+SERVICE_TIME_ALPHA = 0.2  # EWMA weight of the newest generation duration
+INITIAL_SERVICE_TIME = 5.0
+
+_queue_depth = metrics_service.gauge(
+    "chat_admission_queue_depth", "Chat requests waiting for a generation slot"
+)
+_queue_wait = metrics_service.histogram(
+    "chat_admission_wait_seconds", "Time chat requests spent waiting for a generation slot"
+)
+_in_flight = metrics_service.gauge(
+    "chat_admission_in_flight", "Chat generations currently running"
+)
+_admitted = metrics_service.counter(
+    "chat_admission_admitted_total", "Chat requests granted a generation slot"
+)
+_rejected = metrics_service.counter(
+    "chat_admission_rejected_total", "Chat requests rejected by admission control"
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP response hints."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Waiter:
+    model: str
+    key: str
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class Lease:
+    """A granted generation slot. Releasing is idempotent."""
+
+    def __init__(self, controller: "AdmissionController", model: str) -> None:
+        self._controller = controller
+        self._model = model
+        self._started_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(self._model, time.monotonic() - self._started_at)
+
+
+class AdmissionController:
+    """Bounds in-flight chat generations globally and per model.
+
+    Requests that cannot start immediately wait in a bounded queue. Waiters are
+    grouped by conversation and served round-robin, so one busy conversation
+    cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        model_max_concurrency: int,
+        model_limits: dict[str, int],
+        queue_size: int,
+        queue_timeout: float,
+    ) -> None:
+        self._max_concurrency = max_concurrency
+        self._model_max_concurrency = model_max_concurrency
+        self._model_limits = model_limits
+        self._queue_size = queue_size
+        self._queue_timeout = queue_timeout
+        self._running = 0
+        self._running_by_model: dict[str, int] = defaultdict(int)
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._waiting = 0
+        self._service_time = INITIAL_SERVICE_TIME
+
+    # ── Capacity ─────────────────────────────────────────────────
+
+    def _model_limit(self, model: str) -> int:
+        return self._model_limits.get(model, self._model_max_concurrency)
+
+    def _has_capacity(self, model: str) -> bool:
+        return (
+            self._running < self._max_concurrency
+            and self._running_by_model[model] < self._model_limit(model)
+        )
+
+    def _grant(self, model: str) -> Lease:
+        self._running += 1
+        self._running_by_model[model] += 1
+        _in_flight.inc(model=model)
+        _admitted.inc(model=model)
+        return Lease(self, model)
+
+    def _release(self, model: str, duration: float) -> None:
+        self._running -= 1
+        self._running_by_model[model] -= 1
+        _in_flight.dec(model=model)
+        self._service_time += SERVICE_TIME_ALPHA * (duration - self._service_time)
+        self._dispatch()
+
+    def retry_after(self) -> int:
+        """Rough seconds until a new request could be served, for `Retry-After`."""
+        backlog = (self._waiting + 1) * self._service_time / self._max_concurrency
+        return max(1, math.ceil(backlog))
+
+    # ── Queue ────────────────────────────────────────────────────
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        self._queues.setdefault(waiter.key, deque()).append(waiter)
+        self._waiting += 1
+        _queue_depth.set(self._waiting)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.key)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        if not queue:
+            del self._queues[waiter.key]
+        self._waiting -= 1
+        _queue_depth.set(self._waiting)
+
+    def _dispatch(self) -> None:
+        while self._queues and self._running < self._max_concurrency:
+            for key, queue in self._queues.items():
+                if self._has_capacity(queue[0].model):
+                    break
+            else:
+                return  # every head is blocked by its model limit
+
+            waiter = queue.popleft()
+            self._waiting -= 1
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            _queue_depth.set(self._waiting)
+            waiter.future.set_result(self._grant(waiter.model))
+
+    # ── Public API ───────────────────────────────────────────────
+
+    def try_acquire(self, model: str) -> Lease | None:
+        """A slot if one is free right now and nobody is waiting, else None."""
+        if not self._queues and self._has_capacity(model):
+            return self._grant(model)
+        return None
+
+    async def acquire(self, model: str, key: str) -> Lease:
+        if not self._queues and self._has_capacity(model):
+            _queue_wait.observe(0.0)
+            return self._grant(model)
+
+        if self._waiting >= self._queue_size:
+            _rejected.inc(reason="queue_full")
+            raise AdmissionRejected(
+                429, "Server is at capacity, please retry later.", self.retry_after()
+            )
+
+        waiter = _Waiter(model=model, key=key, future=asyncio.get_running_loop().create_future())
+        self._enqueue(waiter)
+        self._dispatch()
+        try:
+            lease = await asyncio.wait_for(asyncio.shield(waiter.future), self._queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.future.done():
+                lease = waiter.future.result()
+            else:
+                self._remove(waiter)
+                waiter.future.cancel()
+                _rejected.inc(reason="timeout")
+                logger.warning("Admission timed out for model %s after %.1fs", model, self._queue_timeout)
+                raise AdmissionRejected(
+                    503, "Timed out waiting for a free generation slot.", self.retry_after()
+                ) from None
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                waiter.future.result().release()
+            else:
+                self._remove(waiter)
+                waiter.future.cancel()
+            raise
+
+        _queue_wait.observe(time.monotonic() - waiter.enqueued_at)
+        return lease
+
+
+admission_controller = AdmissionController(
+    max_concurrency=settings.chat_max_concurrency,
+    model_max_concurrency=settings.chat_model_max_concurrency,
+    model_limits={
+        m.id: m.max_concurrency for m in ALLOWED_MODELS.values() if m.max_concurrency is not None
+    },
+    queue_size=settings.chat_queue_size,
+    queue_timeout=settings.chat_queue_timeout,
+)
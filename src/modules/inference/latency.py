@@ -0,0 +1,41 @@
+from collections import defaultdict, deque
+
+from src.modules.inference.models import HedgePolicy
+from src.modules.metrics.service import metrics_service
+
+TTFT_WINDOW = 200  # most recent samples kept per upstream
+MIN_SAMPLES = 20  # below this the configured deadline is used as-is
+HEDGE_QUANTILE = 0.95
+MIN_HEDGE_DEADLINE = 0.5
+
+_ttft = metrics_service.histogram(
+    "inference_ttft_seconds", "Time to first token per upstream model"
+)
+
+
+class TTFTTracker:
+    """Rolling time-to-first-token statistics per upstream (model + provider)."""
+
+    def __init__(self, window: int = TTFT_WINDOW) -> None:
+        self._samples: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, upstream: str, seconds: float) -> None:
+        self._samples[upstream].append(seconds)
+        _ttft.observe(seconds, model=upstream)
+
+    def quantile(self, upstream: str, q: float) -> float | None:
+        samples = self._samples.get(upstream)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_deadline(self, upstream: str, policy: HedgePolicy) -> float:
+        """Seconds to wait for the first token before starting the backup request."""
+        if not policy.adaptive or len(self._samples.get(upstream, ())) < MIN_SAMPLES:
+            return policy.deadline
+        p95 = self.quantile(upstream, HEDGE_QUANTILE)
+        return min(policy.deadline, max(MIN_HEDGE_DEADLINE, p95))
+
+
+ttft_tracker = TTFTTracker()
@@ -1,21 +1,45 @@
 from dataclasses import dataclass
 
 
+@dataclass(frozen=True)
+class HedgePolicy:
+    """Start a backup request when the first token is late.
+
+    The backup targets `fallback_model` (defaults to the same model) through
+    `fallback_provider` (defaults to "auto"). `deadline` is the longest wait for
+    a first token; with `adaptive` the wait shrinks to the model's observed p95
+    TTFT once enough samples exist.
+    """
+
+    fallback_model: str | None = None
+    fallback_provider: str | None = None
+    deadline: float = 4.0
+    adaptive: bool = True
+
+
 @dataclass(frozen=True)
 class ModelInfo:
     id: str
     name: str
     provider: str
     max_tokens: int = 16384  # default; override per model as needed
+    max_concurrency: int | None = None  # falls back to settings.chat_model_max_concurrency
+    hedge: HedgePolicy | None = None
 
 
 ALLOWED_MODELS: dict[str, ModelInfo] = {m.id: m for m in [
     # Meta — Llama 4
-    ModelInfo("meta-llama/Llama-4-Scout-17B-16E-Instruct", "Llama 4 Scout", "Meta", max_tokens=8192),
+    ModelInfo(
+        "meta-llama/Llama-4-Scout-17B-16E-Instruct", "Llama 4 Scout", "Meta", max_tokens=8192,
+        hedge=HedgePolicy(fallback_model="meta-llama/Llama-4-Maverick-17B-128E-Instruct"),
+    ),
     ModelInfo("meta-llama/Llama-4-Maverick-17B-128E-Instruct", "Llama 4 Maverick", "Meta", max_tokens=8192),
 
     # Qwen — Qwen 3
-    ModelInfo("Qwen/Qwen3-235B-A22B-Instruct-2507", "Qwen 3 235B", "Alibaba"),
+    ModelInfo(
+        "Qwen/Qwen3-235B-A22B-Instruct-2507", "Qwen 3 235B", "Alibaba",
+        hedge=HedgePolicy(fallback_model="Qwen/Qwen3-32B"),
+    ),
     ModelInfo("Qwen/Qwen3-32B", "Qwen 3 32B", "Alibaba"),
 
     # DeepSeek — V3
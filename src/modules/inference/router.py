@@ -1,14 +1,28 @@
+import asyncio
 import json
 import logging
+import uuid
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
+from src.config.settings import settings
 from src.modules.embedder.service import embedder_service
+from src.modules.inference.admission import AdmissionRejected, admission_controller
 from src.modules.inference.models import ALLOWED_MODELS, DEFAULT_MODEL, is_model_allowed
-from src.modules.inference.schemas import ChatRequest, ModelResponse
+from src.modules.inference.schemas import (
+    BatchAnswer,
+    BatchChatRequest,
+    BatchChatResponse,
+    ChatRequest,
+    ModelResponse,
+)
 from src.modules.inference.service import inference_service
+from src.modules.persistence.search_cache import vector_search
 from src.modules.persistence.service import persistence_service
+from src.modules.persistence.writer import message_writer
+from src.modules.reranker.service import reranker_service
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +35,14 @@ Use the following context to answer the user's question. If the context doesn't
 Context:
 {context}"""
 
+BATCH_ADMISSION_RETRIES = 3
+HISTORY_MESSAGES = 10  # most recent turns sent back to the model
+
+
+def _search_limit(top_k: int) -> int:
+    # Reranking picks top_k from a wider, cheaper vector search
+    return max(top_k, settings.rerank_candidates) if settings.rerank_enabled else top_k
+
 
 def _build_context(sources) -> str:
     # Deduplicate by document URL — use full document content, not just the chunk
@@ -40,64 +62,33 @@ def _build_context(sources) -> str:
     return "\n\n".join(blocks)
 
 
-@router.get("/models")
-async def list_models() -> dict:
-    models = [
-        ModelResponse(id=m.id, name=m.name, provider=m.provider)
-        for m in ALLOWED_MODELS.values()
-    ]
-    return {"models": models, "default": DEFAULT_MODEL}
-
-
-@router.post("/chat")
-async def chat(request: ChatRequest) -> StreamingResponse:
-    if not is_model_allowed(request.model_id):
-        raise HTTPException(
-            status_code=422,
-            detail=f"Model '{request.model_id}' is not supported.",
-        )
-
-    conversation = await persistence_service.get_conversation(request.conversation_id)
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-
-    # Cap max_tokens to the model's limit
-    model_info = ALLOWED_MODELS[request.model_id]
-    max_tokens = min(request.max_tokens, model_info.max_tokens)
-
-    # RAG retrieval
-    query_embedding = await embedder_service.embed_query(request.content)
-    sources = await persistence_service.search_similar(query_embedding, limit=request.top_k)
-    logger.info("Retrieved %d chunks for query", len(sources))
-
+def _build_messages(content: str, sources, previous_messages) -> list[dict]:
     # Build messages with context + conversation history
     context = _build_context(sources)
     system_prompt = SYSTEM_PROMPT_TEMPLATE.format(context=context)
     history = [
         {"role": msg.role, "content": msg.content}
-        for msg in (conversation.messages or [])
+        for msg in previous_messages
         if msg.role in ("user", "assistant")
-    ][-10:]
-    messages = [
+    ][-HISTORY_MESSAGES:]
+    return [
         {"role": "system", "content": system_prompt},
         *history,
-        {"role": "user", "content": request.content},
+        {"role": "user", "content": content},
     ]
 
-    # Persist user message
-    await persistence_service.add_message(
-        request.conversation_id, role="user", content=request.content
-    )
 
+def _group_sources(sources, include_document_content: bool = True) -> list[dict]:
     # Group sources by document (deduplicate, keep all chunks per doc)
     doc_map: dict[str, dict] = {}
     for s in sources:
         url = s.document_url
         if url not in doc_map:
             doc_map[url] = {
+                "document_id": str(s.document_id) if s.document_id else None,
                 "document_title": s.document_title,
                 "document_url": url,
-                "document_content": s.document_content,
+                "document_content": s.document_content if include_document_content else None,
                 "document_category": s.document_category,
                 "document_publication_date": (
                     s.document_publication_date.isoformat()
@@ -111,17 +102,85 @@ async def chat(request: ChatRequest) -> StreamingResponse:
             "chunk_index": s.chunk_index,
             "similarity": round(s.similarity, 4),
         })
-    sources_payload = list(doc_map.values())
+    return list(doc_map.values())
+
+
+@router.get("/models")
+async def list_models() -> dict:
+    models = [
+        ModelResponse(id=m.id, name=m.name, provider=m.provider)
+        for m in ALLOWED_MODELS.values()
+    ]
+    return {"models": models, "default": DEFAULT_MODEL}
+
+
+@router.post("/chat")
+async def chat(request: ChatRequest) -> StreamingResponse:
+    if not is_model_allowed(request.model_id):
+        raise HTTPException(
+            status_code=422,
+            detail=f"Model '{request.model_id}' is not supported.",
+        )
+
+    # Primary reads: the conversation is often created moments before the first message
+    conversation = await persistence_service.get_conversation(
+        request.conversation_id, primary=True
+    )
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    # Admission control — bounds in-flight generations before any embedding work
+    try:
+        lease = await admission_controller.acquire(
+            request.model_id, str(request.conversation_id)
+        )
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail=exc.detail,
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from None
+
+    try:
+        # Cap max_tokens to the model's limit
+        model_info = ALLOWED_MODELS[request.model_id]
+        max_tokens = min(request.max_tokens, model_info.max_tokens)
+
+        # RAG retrieval
+        query_embedding = await embedder_service.embed_query(request.content)
+        sources = await vector_search.search_similar(
+            query_embedding,
+            limit=_search_limit(request.top_k),
+            published_after=request.published_after,
+            published_before=request.published_before,
+        )
+        if settings.rerank_enabled:
+            sources = await reranker_service.rerank(request.content, sources, request.top_k)
+        logger.info("Retrieved %d chunks for query", len(sources))
+
+        history, _ = await persistence_service.list_messages(
+            request.conversation_id, limit=HISTORY_MESSAGES, primary=True
+        )
+        messages = _build_messages(request.content, sources, history)
+
+        # Persist user message (write-behind; batched with other chats)
+        await message_writer.enqueue(request.conversation_id, role="user", content=request.content)
+    except BaseException:
+        lease.release()
+        raise
+
+    sources_payload = _group_sources(sources)
 
     async def event_stream():
         full_response: list[str] = []
+        stream = inference_service.stream_chat(
+            messages=messages,
+            model=request.model_id,
+            temperature=request.temperature,
+            max_tokens=max_tokens,
+        )
         try:
-            async for token in inference_service.stream_chat(
-                messages=messages,
-                model=request.model_id,
-                temperature=request.temperature,
-                max_tokens=max_tokens,
-            ):
+            async for token in stream:
                 full_response.append(token)
                 yield f"data: {json.dumps({'token': token})}\n\n"
         except Exception as exc:
@@ -130,12 +189,14 @@ async def chat(request: ChatRequest) -> StreamingResponse:
         else:
             assistant_content = "".join(full_response)
             if assistant_content:
-                await persistence_service.add_message(
+                await message_writer.enqueue(
                     request.conversation_id, role="assistant",
-                    content=assistant_content, model_id=request.model_id,
-                    sources=sources_payload,
+                    content=assistant_content, model_id=stream.model_id,
+                    sources=sources,
                 )
-        yield f"data: {json.dumps({'sources': sources_payload})}\n\n"
+        finally:
+            lease.release()
+        yield f"data: {json.dumps({'sources': sources_payload, 'model_id': stream.model_id})}\n\n"
         yield "data: [DONE]\n\n"
 
     return StreamingResponse(
@@ -147,4 +208,91 @@ async def chat(request: ChatRequest) -> StreamingResponse:
             "X-Accel-Buffering": "no",
             "Content-Encoding": "none",
         },
+        # Safety net: releases the slot if the client disconnects before streaming starts
+        background=BackgroundTask(lease.release),
     )
+
+
+async def _generate(
+    messages: list[dict], model: str, temperature: float, max_tokens: int, key: str
+) -> tuple[str, str]:
+    """Run one non-streaming generation through admission control."""
+    for attempt in range(1, BATCH_ADMISSION_RETRIES + 1):
+        try:
+            lease = await admission_controller.acquire(model, key)
+            break
+        except AdmissionRejected as exc:
+            if attempt == BATCH_ADMISSION_RETRIES:
+                raise
+            await asyncio.sleep(exc.retry_after)
+    try:
+        stream = inference_service.stream_chat(
+            messages=messages, model=model, temperature=temperature, max_tokens=max_tokens
+        )
+        answer = "".join([token async for token in stream])
+        return answer, stream.model_id
+    finally:
+        lease.release()
+
+
+@router.post("/batch", response_model=BatchChatResponse)
+async def batch_chat(request: BatchChatRequest) -> BatchChatResponse:
+    if not is_model_allowed(request.model_id):
+        raise HTTPException(
+            status_code=422,
+            detail=f"Model '{request.model_id}' is not supported.",
+        )
+
+    model_info = ALLOWED_MODELS[request.model_id]
+    max_tokens = min(request.max_tokens, model_info.max_tokens)
+
+    # One batched forward pass and a few retrieval round trips for every question
+    query_embeddings = await embedder_service.embed_queries(request.questions)
+    all_sources = await vector_search.search_similar_batch(
+        query_embeddings,
+        limit=_search_limit(request.top_k),
+        published_after=request.published_after,
+        published_before=request.published_before,
+    )
+    if settings.rerank_enabled:
+        all_sources = await reranker_service.rerank_batch(request.questions, all_sources, request.top_k)
+    logger.info("Batch retrieval done for %d questions", len(request.questions))
+
+    # The whole batch shares one admission key, so it is scheduled fairly
+    # against interactive conversations instead of crowding them out
+    admission_key = f"batch:{uuid.uuid4()}"
+    semaphore = asyncio.Semaphore(request.concurrency)
+
+    async def answer(index: int, question: str, sources) -> BatchAnswer:
+        result = BatchAnswer(
+            index=index,
+            question=question,
+            sources=_group_sources(sources, include_document_content=False),
+        )
+        messages = _build_messages(question, sources, [])
+        async with semaphore:
+            try:
+                result.answer, result.model_id = await _generate(
+                    messages, request.model_id, request.temperature, max_tokens, admission_key
+                )
+            except AdmissionRejected as exc:
+                result.error = exc.detail
+            except Exception as exc:
+                logger.exception("Batch generation failed for question %d", index)
+                result.error = str(exc)
+
+        if request.create_conversations and result.answer:
+            conversation = await persistence_service.create_conversation(title=question[:255])
+            await message_writer.enqueue(conversation.id, role="user", content=question)
+            await message_writer.enqueue(
+                conversation.id, role="assistant", content=result.answer,
+                model_id=result.model_id, sources=sources,
+            )
+            result.conversation_id = conversation.id
+        return result
+
+    answers = await asyncio.gather(*(
+        answer(i, question, sources)
+        for i, (question, sources) in enumerate(zip(request.questions, all_sources))
+    ))
+    return BatchChatResponse(answers=list(answers))
@@ -1,7 +1,10 @@
 import uuid
+from datetime import date
 
 from pydantic import BaseModel, Field
 
+from src.modules.persistence.schemas import SourceDocument
+
 
 class ChatRequest(BaseModel):
     conversation_id: uuid.UUID
@@ -10,9 +13,38 @@ class ChatRequest(BaseModel):
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
     max_tokens: int = Field(default=16384, ge=1, le=131072)
     top_k: int = Field(default=5, ge=1, le=20)
+    # Restrict retrieval to articles published in this range (inclusive)
+    published_after: date | None = None
+    published_before: date | None = None
 
 
 class ModelResponse(BaseModel):
     id: str
     name: str
     provider: str
+
+
+class BatchChatRequest(BaseModel):
+    questions: list[str] = Field(..., min_length=1, max_length=1000)
+    model_id: str
+    temperature: float = Field(default=0.7, ge=0.0, le=2.0)
+    max_tokens: int = Field(default=16384, ge=1, le=131072)
+    top_k: int = Field(default=5, ge=1, le=20)
+    concurrency: int = Field(default=8, ge=1, le=32)
+    create_conversations: bool = False
+    published_after: date | None = None
+    published_before: date | None = None
+
+
+class BatchAnswer(BaseModel):
+    index: int
+    question: str
+    answer: str | None = None
+    model_id: str | None = None
+    error: str | None = None
+    conversation_id: uuid.UUID | None = None
+    sources: list[SourceDocument] = []
+
+
+class BatchChatResponse(BaseModel):
+    answers: list[BatchAnswer]
@@ -1,49 +1,298 @@
+import asyncio
+import json
+import logging
+import time
 from collections.abc import AsyncIterator
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+import httpx
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
 from src.config.settings import settings
+from src.modules.inference.admission import Lease, admission_controller
+from src.modules.inference.latency import ttft_tracker
+from src.modules.inference.models import ALLOWED_MODELS
+from src.modules.metrics.service import metrics_service
+
+if TYPE_CHECKING:
+    from langchain_huggingface import ChatHuggingFace
+
+logger = logging.getLogger(__name__)
 
 ROLE_TO_MESSAGE = {
     "user": HumanMessage,
     "assistant": AIMessage,
     "system": SystemMessage,
 }
+MESSAGE_TO_ROLE = {cls: role for role, cls in ROLE_TO_MESSAGE.items()}
+
+DEFAULT_PROVIDER = "auto"
+
+_hedges = metrics_service.counter(
+    "inference_hedged_total", "Chat requests that started a backup upstream, by winner"
+)
+_hedges_skipped = metrics_service.counter(
+    "inference_hedges_skipped_total", "Hedges not started because the fallback model had no free slot"
+)
+
+
+@dataclass(frozen=True)
+class Upstream:
+    model: str
+    provider: str = DEFAULT_PROVIDER
+
+    @property
+    def key(self) -> str:
+        if self.provider == DEFAULT_PROVIDER:
+            return self.model
+        return f"{self.model}@{self.provider}"
+
+
+async def _first_token(tokens: AsyncIterator[str]) -> str | None:
+    try:
+        return await anext(tokens)
+    except StopAsyncIteration:
+        return None
+
+
+@dataclass
+class _Contender:
+    upstream: Upstream
+    tokens: AsyncIterator[str]
+    first: asyncio.Task
+    started: float
+    lease: Lease | None = None  # the backup's own admission slot
+
+    async def discard(self) -> None:
+        self.first.cancel()
+        with suppress(BaseException):
+            await self.first
+        with suppress(Exception):
+            await self.tokens.aclose()
+        if self.lease is not None:
+            self.lease.release()
+
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _background(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+class ChatStream:
+    """Token stream for one chat completion, possibly hedged across two upstreams.
+
+    `upstream` names the model that actually produced the tokens; it is final
+    once the first token has been yielded.
+    """
+
+    def __init__(
+        self,
+        service: "InferenceService",
+        messages: list[BaseMessage],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> None:
+        self._service = service
+        self._messages = messages
+        self._temperature = temperature
+        self._max_tokens = max_tokens
+        self.upstream = Upstream(model)
+        self.hedged = False
+
+    @property
+    def model_id(self) -> str:
+        return self.upstream.model
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._iterate()
+
+    def _start(self, upstream: Upstream) -> _Contender:
+        max_tokens = self._max_tokens
+        info = ALLOWED_MODELS.get(upstream.model)
+        if info is not None:
+            max_tokens = min(max_tokens, info.max_tokens)
+        tokens = self._service._stream_tokens(
+            self._messages, upstream, self._temperature, max_tokens
+        )
+        return _Contender(
+            upstream=upstream,
+            tokens=tokens,
+            first=asyncio.create_task(_first_token(tokens)),
+            started=time.monotonic(),
+        )
+
+    async def _iterate(self) -> AsyncIterator[str]:
+        info = ALLOWED_MODELS.get(self.upstream.model)
+        policy = info.hedge if info else None
+        current = self._start(self.upstream)
+
+        try:
+            if policy is not None:
+                deadline = ttft_tracker.hedge_deadline(current.upstream.key, policy)
+                done, _ = await asyncio.wait({current.first}, timeout=deadline)
+                if not done or current.first.exception() is not None:
+                    fallback = Upstream(
+                        policy.fallback_model or current.upstream.model,
+                        policy.fallback_provider or DEFAULT_PROVIDER,
+                    )
+                    # The request's lease covers the primary only; the backup
+                    # needs a slot of its own and is not worth waiting for
+                    lease = admission_controller.try_acquire(fallback.model)
+                    if lease is None:
+                        _hedges_skipped.inc(model=current.upstream.key)
+                    else:
+                        backup = self._start(fallback)
+                        backup.lease = lease
+                        current = await self._race(current, backup)
+
+            first = await current.first
+            ttft_tracker.record(current.upstream.key, time.monotonic() - current.started)
+            if first is None:
+                return
+            yield first
+            async for token in current.tokens:
+                yield token
+        finally:
+            await current.discard()
+
+    async def _race(self, primary: _Contender, fallback: _Contender) -> _Contender:
+        """Run the primary and the fallback side by side; keep whichever answers first."""
+        self.hedged = True
+        logger.info("Hedging %s with %s", primary.upstream.key, fallback.upstream.key)
+        contenders = {primary.first: primary, fallback.first: fallback}
+
+        pending = set(contenders)
+        winner: _Contender | None = None
+        error: BaseException | None = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = contenders[task]
+                        break
+                    error = task.exception()
+        except BaseException:
+            for contender in contenders.values():
+                await contender.discard()
+            raise
+
+        for contender in contenders.values():
+            if contender is winner:
+                continue
+            if not contender.first.done():
+                # Censored sample: the loser was at least this slow
+                ttft_tracker.record(
+                    contender.upstream.key, time.monotonic() - contender.started
+                )
+            _background(contender.discard())
+
+        if winner is None:
+            raise error  # type: ignore[misc]
+
+        self.upstream = winner.upstream
+        _hedges.inc(model=primary.upstream.key, winner=winner.upstream.key)
+        return winner
 
 
 class InferenceService:
     def __init__(self) -> None:
         self._token = settings.hf_api_token
+        self._base_url = settings.inference_base_url
+        self._client: httpx.AsyncClient | None = None
 
     def _build_chat_model(
-        self, model: str, temperature: float, max_tokens: int
-    ) -> ChatHuggingFace:
+        self, model: str, temperature: float, max_tokens: int, provider: str = DEFAULT_PROVIDER
+    ) -> "ChatHuggingFace":
+        # Deferred: the HuggingFace client stack is only needed once a chat is served
+        from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+
         llm = HuggingFaceEndpoint(
             repo_id=model,
             huggingfacehub_api_token=self._token,
-            provider="auto",
+            provider=provider,
             task="text-generation",
             temperature=temperature,
             max_new_tokens=max_tokens,
         )
         return ChatHuggingFace(llm=llm)
 
-    async def stream_chat(
+    async def _stream_tokens(
+        self,
+        messages: list[BaseMessage],
+        upstream: Upstream,
+        temperature: float,
+        max_tokens: int,
+    ) -> AsyncIterator[str]:
+        if self._base_url:
+            async for token in self._stream_completions(messages, upstream, temperature, max_tokens):
+                yield token
+            return
+
+        chat_model = self._build_chat_model(
+            upstream.model, temperature, max_tokens, upstream.provider
+        )
+        async for chunk in chat_model.astream(messages):
+            if chunk.content:
+                yield chunk.content
+
+    async def _stream_completions(
+        self,
+        messages: list[BaseMessage],
+        upstream: Upstream,
+        temperature: float,
+        max_tokens: int,
+    ) -> AsyncIterator[str]:
+        """Stream from an OpenAI-compatible `/chat/completions` endpoint."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers={"Authorization": f"Bearer {self._token}"},
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            )
+        model = upstream.model
+        if upstream.provider != DEFAULT_PROVIDER:
+            model = f"{model}:{upstream.provider}"
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": MESSAGE_TO_ROLE[type(m)], "content": m.content} for m in messages
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        async with self._client.stream("POST", "/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                if choices and (content := choices[0].get("delta", {}).get("content")):
+                    yield content
+
+    def stream_chat(
         self,
         messages: list[dict],
         model: str,
         temperature: float = 0.7,
         max_tokens: int = 16384,
-    ) -> AsyncIterator[str]:
-        chat_model = self._build_chat_model(model, temperature, max_tokens)
+    ) -> ChatStream:
         lc_messages = [
             ROLE_TO_MESSAGE[msg["role"]](content=msg["content"])
             for msg in messages
         ]
-        async for chunk in chat_model.astream(lc_messages):
-            if chunk.content:
-                yield chunk.content
+        return ChatStream(self, lc_messages, model, temperature, max_tokens)
 
 
 inference_service = InferenceService()
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.modules.metrics.service import metrics_service
+
+router = APIRouter()
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    return metrics_service.render()
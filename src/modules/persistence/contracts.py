@@ -1,9 +1,9 @@
 import uuid
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import date, datetime
 
-from src.modules.persistence.schemas import SearchResult
-from src.modules.preprocessor.schemas import ProcessedChunk
+from src.modules.persistence.schemas import SearchResult, SourceDocument
+from src.modules.preprocessor.schemas import ChunkBatch
 from src.modules.scraper.schemas import ScrapedArticle
 
 
@@ -12,10 +12,23 @@ class ConversationContract(ABC):
     async def create_conversation(self, title: str) -> object: ...
 
     @abstractmethod
-    async def list_conversations(self) -> list: ...
+    async def list_conversations(
+        self, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list, str | None]: ...
 
     @abstractmethod
-    async def get_conversation(self, conversation_id: uuid.UUID) -> object | None: ...
+    async def get_conversation(
+        self, conversation_id: uuid.UUID, primary: bool = False
+    ) -> object | None: ...
+
+    @abstractmethod
+    async def list_messages(
+        self,
+        conversation_id: uuid.UUID,
+        limit: int = 50,
+        cursor: str | None = None,
+        primary: bool = False,
+    ) -> tuple[list, str | None]: ...
 
     @abstractmethod
     async def delete_conversation(self, conversation_id: uuid.UUID) -> bool: ...
@@ -27,19 +40,40 @@ class ConversationContract(ABC):
         role: str,
         content: str,
         model_id: str | None = None,
-        sources: list | None = None,
+        sources: list[SearchResult] | None = None,
     ) -> object | None: ...
 
+    @abstractmethod
+    async def get_message_sources(
+        self,
+        message_ids: list[uuid.UUID],
+        include_content: bool = False,
+        conversation_id: uuid.UUID | None = None,
+    ) -> dict[uuid.UUID, list[SourceDocument]]: ...
+
 
 class DocumentContract(ABC):
     @abstractmethod
     async def batch_store(
         self,
         articles: list[ScrapedArticle],
-        chunks: list[ProcessedChunk],
-        embeddings: list[list[float]],
+        chunks: ChunkBatch,
+        signatures: dict[str, list[int]] | None = None,
+        duplicates: dict[str, str] | None = None,
     ) -> int: ...
 
+    @abstractmethod
+    async def get_document_signatures(self) -> dict[str, list[int]]: ...
+
+    @abstractmethod
+    async def get_document_urls(self, urls: list[str]) -> set[str]: ...
+
+    @abstractmethod
+    async def get_latest_publication_date(self) -> datetime | None: ...
+
+    @abstractmethod
+    async def get_corpus_generation(self) -> int | None: ...
+
 
 class VectorSearchContract(ABC):
     @abstractmethod
@@ -47,4 +81,15 @@ class VectorSearchContract(ABC):
         self,
         query_embedding: list[float],
         limit: int = 5,
+        published_after: date | None = None,
+        published_before: date | None = None,
     ) -> list[SearchResult]: ...
+
+    @abstractmethod
+    async def search_similar_batch(
+        self,
+        query_embeddings: list[list[float]],
+        limit: int = 5,
+        published_after: date | None = None,
+        published_before: date | None = None,
+    ) -> list[list[SearchResult]]: ...
@@ -0,0 +1,159 @@
+"""Schema setup, run as a deploy step before the app starts serving:
+
+    python -m src.modules.persistence.migrations
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.config.database import Base, dispose_engines, engine, shard_engines
+from src.modules.persistence.partitions import ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+# Serializes concurrent runs (several replicas or a job racing the app)
+MIGRATION_LOCK_ID = 0x6575726F  # "euro"
+
+Step = str | Callable[[AsyncConnection], Awaitable[None]]
+
+# Run before `create_all`, for tables whose definition changed in place
+PRE_CREATE_MIGRATIONS: list[tuple[str, Step]] = [
+    (
+        "chunks_set_aside_unpartitioned",
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'chunks' AND relkind = 'r') THEN
+                ALTER TABLE chunks RENAME TO chunks_unpartitioned;
+                ALTER TABLE chunks_unpartitioned RENAME CONSTRAINT chunks_pkey TO chunks_unpartitioned_pkey;
+                ALTER INDEX IF EXISTS ix_chunks_document_id_chunk_index
+                    RENAME TO ix_chunks_unpartitioned_document_id_chunk_index;
+            END IF;
+        END $$;
+        """,
+    ),
+]
+
+
+async def _chunks_into_partitions(conn: AsyncConnection) -> None:
+    if not await conn.scalar(text("SELECT to_regclass('chunks_unpartitioned')")):
+        return
+    published_on = "coalesce(d.publication_date, c.created_at)::date"
+    days = await conn.execute(
+        text(
+            f"SELECT DISTINCT date_trunc('month', {published_on})::date"
+            " FROM chunks_unpartitioned c JOIN documents d ON d.id = c.document_id"
+        )
+    )
+    await ensure_partitions(conn, days.scalars().all())
+    await conn.execute(
+        text(
+            "INSERT INTO chunks (id, published_on, document_id, chunk_index, content, embedding, created_at)"
+            f" SELECT c.id, {published_on}, c.document_id, c.chunk_index, c.content, c.embedding, c.created_at"
+            " FROM chunks_unpartitioned c JOIN documents d ON d.id = c.document_id"
+        )
+    )
+    await conn.execute(text("DROP TABLE chunks_unpartitioned"))
+
+
+# Idempotent schema changes applied after `create_all`, in order. Each entry
+# must be safe to run on both fresh and already-migrated databases.
+MIGRATIONS: list[tuple[str, Step]] = [
+    (
+        "message_sources_from_json",
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'messages' AND column_name = 'sources'
+            ) THEN
+                -- Turn the duplicated JSON payloads into (document, chunk) references
+                INSERT INTO message_sources (message_id, rank, document_id, chunk_index, similarity)
+                SELECT m.id,
+                       row_number() OVER (PARTITION BY m.id ORDER BY doc.ord, chunk.ord) - 1,
+                       d.id,
+                       (chunk.value ->> 'chunk_index')::int,
+                       (chunk.value ->> 'similarity')::float
+                FROM (
+                    SELECT id, sources::jsonb AS sources FROM messages
+                    WHERE sources IS NOT NULL AND jsonb_typeof(sources::jsonb) = 'array'
+                ) AS m
+                CROSS JOIN LATERAL jsonb_array_elements(m.sources) WITH ORDINALITY AS doc(value, ord)
+                CROSS JOIN LATERAL jsonb_array_elements(doc.value -> 'chunks') WITH ORDINALITY AS chunk(value, ord)
+                JOIN documents d ON d.url = doc.value ->> 'document_url'
+                ON CONFLICT DO NOTHING;
+
+                ALTER TABLE messages DROP COLUMN sources;
+            END IF;
+        END $$;
+        """,
+    ),
+    (
+        "conversations_updated_at_index",
+        "CREATE INDEX IF NOT EXISTS ix_conversations_updated_at_id ON conversations (updated_at, id)",
+    ),
+    (
+        "messages_conversation_created_at_index",
+        "CREATE INDEX IF NOT EXISTS ix_messages_conversation_id_created_at_id"
+        " ON messages (conversation_id, created_at, id)",
+    ),
+    ("chunks_into_partitions", _chunks_into_partitions),
+    ("documents_minhash", "ALTER TABLE documents ADD COLUMN IF NOT EXISTS minhash integer[]"),
+    (
+        "documents_canonical_id",
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS canonical_id uuid"
+        " REFERENCES documents (id) ON DELETE SET NULL",
+    ),
+    (
+        "documents_canonical_id_index",
+        "CREATE INDEX IF NOT EXISTS ix_documents_canonical_id ON documents (canonical_id)",
+    ),
+    ("chunks_start_char", "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS start_char integer"),
+    ("chunks_end_char", "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS end_char integer"),
+    ("message_sources_chunk_md5", "ALTER TABLE message_sources ADD COLUMN IF NOT EXISTS chunk_md5 varchar(32)"),
+    ("corpus_state_row", "INSERT INTO corpus_state (id, generation) VALUES (1, 0) ON CONFLICT DO NOTHING"),
+]
+
+
+async def run_migrations(conn: AsyncConnection, steps: list[tuple[str, Step]] = MIGRATIONS) -> None:
+    for name, step in steps:
+        if callable(step):
+            await step(conn)
+        else:
+            await conn.execute(text(step))
+        logger.info("Migration applied: %s", name)
+
+
+async def setup_database(db_engine: AsyncEngine) -> None:
+    import src.modules.persistence.models  # noqa: F401 — register ORM models
+
+    async with db_engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await run_migrations(conn, PRE_CREATE_MIGRATIONS)
+        await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
+    logger.info("Database schema up to date")
+
+
+async def setup_databases() -> None:
+    """The primary, then every vector search shard."""
+    for db_engine in [engine, *shard_engines]:
+        await setup_database(db_engine)
+
+
+async def _main() -> None:
+    try:
+        await setup_databases()
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
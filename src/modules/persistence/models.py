@@ -1,8 +1,22 @@
+import hashlib
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import DateTime, ForeignKey, JSON, String, Text, UniqueConstraint, func
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.config.database import Base
@@ -17,6 +31,12 @@ class Document(Base):
     category: Mapped[str | None] = mapped_column(String(255), nullable=True)
     publication_date: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     content: Mapped[str] = mapped_column(Text)
+    # MinHash of the content, for near-duplicate detection at ingest
+    minhash: Mapped[list[int] | None] = mapped_column(ARRAY(Integer), nullable=True)
+    # Set on near-duplicates, which are stored without chunks
+    canonical_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("documents.id", ondelete="SET NULL"), nullable=True, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), onupdate=func.now()
@@ -28,19 +48,41 @@ class Document(Base):
 
 
 class Chunk(Base):
+    """Range-partitioned by month of `published_on` (see persistence/partitions.py).
+
+    Each partition carries its own HNSW index, so index size and build time
+    are bounded by one month of articles.
+    """
+
     __tablename__ = "chunks"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    # Publication date of the document (ingest date when unknown); partition key
+    published_on: Mapped[date] = mapped_column(Date, primary_key=True)
     document_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("documents.id", ondelete="CASCADE")
     )
     chunk_index: Mapped[int]
     content: Mapped[str] = mapped_column(Text)
+    # Span of the chunk text (title prefix excluded) in Document.content
+    start_char: Mapped[int | None] = mapped_column(nullable=True)
+    end_char: Mapped[int | None] = mapped_column(nullable=True)
     embedding = mapped_column(Vector(384))
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     document: Mapped["Document"] = relationship(back_populates="chunks")
 
+    __table_args__ = (
+        Index("ix_chunks_document_id_chunk_index", "document_id", "chunk_index"),
+        Index(
+            "ix_chunks_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (published_on)"},
+    )
+
 
 class Conversation(Base):
     __tablename__ = "conversations"
@@ -56,6 +98,8 @@ class Conversation(Base):
         back_populates="conversation", cascade="all, delete-orphan", order_by="Message.created_at"
     )
 
+    __table_args__ = (Index("ix_conversations_updated_at_id", "updated_at", "id"),)
+
 
 class Message(Base):
     __tablename__ = "messages"
@@ -67,7 +111,76 @@ class Message(Base):
     role: Mapped[str] = mapped_column(String(20))
     model_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
     content: Mapped[str] = mapped_column(Text)
-    sources: Mapped[list | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     conversation: Mapped["Conversation"] = relationship(back_populates="messages")
+    source_refs: Mapped[list["MessageSource"]] = relationship(
+        cascade="all, delete-orphan", passive_deletes=True, order_by="MessageSource.rank"
+    )
+
+    __table_args__ = (
+        Index("ix_messages_conversation_id_created_at_id", "conversation_id", "created_at", "id"),
+    )
+
+
+def chunk_md5(content: str) -> str:
+    """Same digest as Postgres `md5(content)`."""
+    return hashlib.md5(content.encode()).hexdigest()
+
+
+class MessageSource(Base):
+    """A retrieved chunk cited by an assistant message.
+
+    Chunks are re-created whenever their document is re-ingested, so the
+    reference is the (document, chunk_index) pair rather than a chunk id, plus
+    the MD5 of the cited text. Re-chunking can shift indexes, so the hash is
+    what identifies the chunk when the citation is resolved.
+    """
+
+    __tablename__ = "message_sources"
+
+    message_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("messages.id", ondelete="CASCADE"), primary_key=True
+    )
+    rank: Mapped[int] = mapped_column(primary_key=True)
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("documents.id", ondelete="CASCADE"), index=True
+    )
+    chunk_index: Mapped[int]
+    # md5 of the cited chunk's content; NULL for citations recorded before it
+    chunk_md5: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    similarity: Mapped[float]
+
+
+class CorpusState(Base):
+    """A single row. `generation` is bumped by every commit that changes what
+    search can return, which invalidates cached search results."""
+
+    __tablename__ = "corpus_state"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    generation: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
+BUMP_CORPUS_GENERATION = (
+    update(CorpusState)
+    .where(CorpusState.id == 1)
+    .values(generation=CorpusState.generation + 1, updated_at=func.now())
+)
+
+
+class SearchCacheEntry(Base):
+    """Search results shared by all workers (RETRIEVAL_CACHE_BACKEND=postgres).
+
+    Unlogged: a crash empties the table, which only costs cache misses.
+    """
+
+    __tablename__ = "search_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    generation: Mapped[int] = mapped_column(BigInteger)
+    results: Mapped[str] = mapped_column(Text)  # JSON list of SearchResult
+    used_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
+
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
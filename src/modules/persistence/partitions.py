@@ -0,0 +1,170 @@
+"""Monthly range partitions of `chunks`, keyed on `published_on`.
+
+Maintenance creates upcoming partitions and applies the retention policy. It
+runs daily from the pipeline scheduler and can be run by hand:
+
+    python -m src.modules.persistence.partitions
+"""
+
+import asyncio
+import logging
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.config.database import bulk_engine, dispose_engines, shard_engines
+from src.config.settings import settings
+from src.modules.persistence.models import BUMP_CORPUS_GENERATION
+
+logger = logging.getLogger(__name__)
+
+CHUNKS_TABLE = "chunks"
+ARCHIVE_PREFIX = "archived_"
+
+
+def month_floor(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date, table: str = CHUNKS_TABLE) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def archive_name(partition: str) -> str:
+    # Suffixed with the detach time: an ingest into an archived month creates
+    # the partition again, and it must not collide with the earlier archive
+    return f"{ARCHIVE_PREFIX}{partition}_{datetime.now(UTC):%Y%m%d%H%M%S%f}"
+
+
+async def list_partitions(conn: AsyncConnection, table: str = CHUNKS_TABLE) -> dict[date, str]:
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits"
+            " JOIN pg_class parent ON parent.oid = pg_inherits.inhparent"
+            " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+            " WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    pattern = re.compile(rf"^{re.escape(table)}_(\d{{4}})_(\d{{2}})$")
+    partitions: dict[date, str] = {}
+    for name in result.scalars():
+        if match := pattern.match(name):
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+async def ensure_partitions(
+    conn: AsyncConnection, days: Iterable[date], table: str = CHUNKS_TABLE
+) -> list[str]:
+    """Create the monthly partitions covering `days` that do not exist yet.
+
+    Creating a partition locks the parent table; callers run this in its own
+    short transaction, not inside a data load.
+    """
+    existing = await list_partitions(conn, table)
+    created: list[str] = []
+    for month in sorted({month_floor(day) for day in days} - existing.keys()):
+        name = partition_name(month, table)
+        await conn.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}"'
+                f" FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+        )
+        created.append(name)
+    if created:
+        logger.info("Created partitions: %s", ", ".join(created))
+    return created
+
+
+async def retire_partitions(
+    conn: AsyncConnection,
+    keep_months: int,
+    mode: str,
+    today: date | None = None,
+    table: str = CHUNKS_TABLE,
+) -> list[str]:
+    """Archive (detach) or drop partitions older than `keep_months` months.
+
+    Archived partitions stay in the database as standalone tables but no
+    longer take part in search. Dropping also deletes the documents published
+    before the cutoff, together with the message sources that cite them.
+    """
+    cutoff = add_months(month_floor(today or date.today()), -(keep_months - 1))
+    retired: list[str] = []
+    for month, name in sorted((await list_partitions(conn, table)).items()):
+        if month >= cutoff:
+            break
+        if mode == "drop":
+            await conn.execute(text(f'DROP TABLE "{name}"'))
+        else:
+            await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            await conn.execute(text(f'ALTER TABLE "{name}" RENAME TO "{archive_name(name)}"'))
+        retired.append(name)
+    if mode == "drop" and retired and table == CHUNKS_TABLE:
+        await conn.execute(
+            text("DELETE FROM documents WHERE coalesce(publication_date, created_at) < :cutoff"),
+            {"cutoff": cutoff},
+        )
+    if retired:
+        await conn.execute(BUMP_CORPUS_GENERATION)  # retired chunks must leave cached results too
+        logger.info("Retired partitions (%s): %s", mode, ", ".join(retired))
+    return retired
+
+
+@dataclass
+class MaintenanceReport:
+    created: list[str] = field(default_factory=list)
+    retired: list[str] = field(default_factory=list)
+
+
+class PartitionService:
+    async def maintain(self, today: date | None = None) -> MaintenanceReport:
+        month = month_floor(today or date.today())
+        report = MaintenanceReport()
+        # Vector search shards partition their chunks the same way. They go
+        # first: the primary's generation bump invalidates cached search
+        # results, so it must not land before the shards have retired theirs.
+        retired: list[str] = []
+        for db_engine in [*shard_engines, bulk_engine]:
+            async with db_engine.begin() as conn:
+                report.created += await ensure_partitions(
+                    conn, [add_months(month, i) for i in range(settings.chunk_partitions_ahead + 1)]
+                )
+            if settings.chunk_retention_months:
+                async with db_engine.begin() as conn:
+                    retired = await retire_partitions(
+                        conn, settings.chunk_retention_months, settings.chunk_retention_mode, today
+                    )
+                report.retired += retired
+        if report.retired and not retired:
+            # Only shards retired anything; the primary's bump did not happen
+            async with bulk_engine.begin() as conn:
+                await conn.execute(BUMP_CORPUS_GENERATION)
+        return report
+
+
+partition_service = PartitionService()
+
+
+async def _main() -> None:
+    try:
+        report = await partition_service.maintain()
+        print(f"created: {report.created or '-'}\nretired: {report.retired or '-'}")
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -1,9 +1,11 @@
+import uuid
 from datetime import datetime
 
 from pydantic import BaseModel
 
 
 class SearchResult(BaseModel):
+    document_id: uuid.UUID | None = None
     chunk_content: str
     chunk_index: int
     similarity: float
@@ -12,3 +14,26 @@ class SearchResult(BaseModel):
     document_content: str
     document_category: str | None = None
     document_publication_date: datetime | None = None
+
+
+class SourceChunk(BaseModel):
+    chunk_index: int
+    similarity: float
+    content: str | None = None  # omitted unless hydrated
+    # Span in the document content, when hydrated and recorded at ingest
+    start_char: int | None = None
+    end_char: int | None = None
+    # Set when hydrated and the cited text is no longer in the document
+    stale: bool = False
+
+
+class SourceDocument(BaseModel):
+    """Sources grouped by document, as shown under an assistant message."""
+
+    document_id: uuid.UUID | None = None
+    document_title: str
+    document_url: str
+    document_category: str | None = None
+    document_publication_date: datetime | None = None
+    document_content: str | None = None  # omitted unless hydrated
+    chunks: list[SourceChunk]
@@ -0,0 +1,264 @@
+"""Cache of vector search results, invalidated by corpus generation.
+
+Entries are keyed by the query embedding (rounded, so float noise between
+otherwise identical queries does not matter), the result limit and the date
+filters. Each entry carries the corpus generation it was computed at. Every
+commit that changes the corpus bumps the generation (see CorpusState), so a
+lookup never returns results from before the latest ingest. The generation
+lives in the database, so this also holds when the pipeline runs in its own
+process. Sharded results that miss a shard (`PartialResults`) are never
+stored, so one slow shard does not hide its chunks for a whole generation.
+
+Backends are pluggable: `memory` is a per-process LRU; `postgres` keeps
+entries in an unlogged table that every worker shares.
+"""
+
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import date, timedelta
+
+import numpy as np
+from pydantic import TypeAdapter
+from sqlalchemy import String, any_, bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
+from src.config.database import async_session
+from src.config.settings import settings
+from src.modules.metrics.service import metrics_service
+from src.modules.persistence.contracts import VectorSearchContract
+from src.modules.persistence.models import SearchCacheEntry
+from src.modules.persistence.schemas import SearchResult
+from src.modules.persistence.service import persistence_service
+from src.modules.persistence.sharding import PartialResults, vector_shards
+
+logger = logging.getLogger(__name__)
+
+KEY_DECIMALS = 4  # embedding components are rounded to this before hashing
+TRIM_EVERY = 64  # postgres backend: stores between trims of stale and excess rows
+# postgres backend: a hit refreshes used_at (the LRU order for trims) at most this often
+TOUCH_INTERVAL = timedelta(seconds=60)
+
+_results = TypeAdapter(list[SearchResult])
+
+_lookups = metrics_service.counter(
+    "retrieval_cache_lookups_total", "Search cache lookups by result (hit, miss)"
+)
+_entries = metrics_service.gauge("retrieval_cache_entries", "Entries in the in-process search cache")
+
+
+def cache_key(
+    embedding: list[float], limit: int, published_after: date | None, published_before: date | None
+) -> str:
+    # + 0.0 turns -0.0 into 0.0, which hashes differently
+    vector = np.round(np.asarray(embedding, dtype=np.float32), KEY_DECIMALS) + np.float32(0.0)
+    digest = hashlib.sha256(vector.tobytes())
+    digest.update(f"|{limit}|{published_after}|{published_before}".encode())
+    return digest.hexdigest()
+
+
+# ── Backends ────────────────────────────────────────────────────
+
+
+class SearchCacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str, generation: int) -> list[SearchResult] | None:
+        """The results stored under `key` at `generation`, if any."""
+
+    async def get_many(self, keys: list[str], generation: int) -> list[list[SearchResult] | None]:
+        """`get` for each of `keys`, in order."""
+        return [await self.get(key, generation) for key in keys]
+
+    @abstractmethod
+    async def set(self, key: str, generation: int, results: list[SearchResult]) -> None: ...
+
+
+class MemoryBackend(SearchCacheBackend):
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._entries: OrderedDict[str, list[SearchResult]] = OrderedDict()
+        self._generation = -1
+
+    def _advance(self, generation: int) -> None:
+        # Every entry predates a newer generation
+        if generation > self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    async def get(self, key, generation):
+        self._advance(generation)
+        if generation != self._generation:
+            return None
+        results = self._entries.get(key)
+        if results is not None:
+            self._entries.move_to_end(key)
+        return results
+
+    async def set(self, key, generation, results):
+        self._advance(generation)
+        if generation != self._generation:
+            return  # computed before the latest ingest
+        self._entries[key] = results
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._size:
+            self._entries.popitem(last=False)
+        _entries.set(len(self._entries))
+
+
+class PostgresBackend(SearchCacheBackend):
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._stores = 0
+
+    async def get(self, key, generation):
+        return (await self.get_many([key], generation))[0]
+
+    async def get_many(self, keys, generation):
+        """All `keys` in one read; used_at is refreshed only for hits whose
+        last touch is older than TOUCH_INTERVAL, so hot keys cost no writes."""
+        async with async_session() as session:
+            rows = await session.execute(
+                select(
+                    SearchCacheEntry.key,
+                    SearchCacheEntry.results,
+                    (SearchCacheEntry.used_at < func.now() - TOUCH_INTERVAL).label("touch"),
+                ).where(
+                    # One array parameter, whatever the batch size
+                    SearchCacheEntry.key == any_(bindparam("keys", keys, type_=ARRAY(String))),
+                    SearchCacheEntry.generation == generation,
+                )
+            )
+            found = {key: (results, touch) for key, results, touch in rows}
+            touch = [key for key, (_, stale) in found.items() if stale]
+            if touch:
+                try:
+                    await session.execute(
+                        update(SearchCacheEntry)
+                        .where(SearchCacheEntry.key == any_(bindparam("touch", touch, type_=ARRAY(String))))
+                        .values(used_at=func.now())
+                        .execution_options(synchronize_session=False)
+                    )
+                    await session.commit()
+                except Exception:
+                    # Only the trim order depends on it
+                    logger.warning("Search cache used_at refresh failed", exc_info=True)
+        return [_results.validate_json(found[key][0]) if key in found else None for key in keys]
+
+    async def set(self, key, generation, results):
+        statement = insert(SearchCacheEntry).values(
+            key=key, generation=generation, results=_results.dump_json(results).decode()
+        )
+        async with async_session() as session:
+            await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[SearchCacheEntry.key],
+                    set_={
+                        "generation": statement.excluded.generation,
+                        "results": statement.excluded.results,
+                        "used_at": func.now(),
+                    },
+                    where=SearchCacheEntry.generation <= statement.excluded.generation,
+                )
+            )
+            self._stores += 1
+            if self._stores % TRIM_EVERY == 0:
+                await self._trim(session, generation)
+            await session.commit()
+
+    async def _trim(self, session, generation: int) -> None:
+        keep = (
+            select(SearchCacheEntry.key)
+            .where(SearchCacheEntry.generation == generation)
+            .order_by(SearchCacheEntry.used_at.desc())
+            .limit(self._size)
+        )
+        await session.execute(delete(SearchCacheEntry).where(SearchCacheEntry.key.not_in(keep)))
+
+
+BACKENDS: dict[str, Callable[[int], SearchCacheBackend]] = {
+    "memory": MemoryBackend,
+    "postgres": PostgresBackend,
+}
+
+
+# ── Cached search ───────────────────────────────────────────────
+
+
+class CachedVectorSearch(VectorSearchContract):
+    """Serves searches from the cache and passes misses to `search`."""
+
+    def __init__(self, search: VectorSearchContract, backend: SearchCacheBackend | None) -> None:
+        self._search = search
+        self._backend = backend
+
+    async def _generation(self) -> int | None:
+        if self._backend is None:
+            return None
+        try:
+            return await persistence_service.get_corpus_generation()
+        except Exception:
+            logger.warning("Corpus generation unavailable; searching uncached", exc_info=True)
+            return None
+
+    async def search_similar(
+        self,
+        query_embedding: list[float],
+        limit: int = 5,
+        published_after: date | None = None,
+        published_before: date | None = None,
+    ) -> list[SearchResult]:
+        generation = await self._generation()
+        if generation is None:
+            return await self._search.search_similar(
+                query_embedding, limit, published_after, published_before
+            )
+        key = cache_key(query_embedding, limit, published_after, published_before)
+        results = await self._backend.get(key, generation)
+        _lookups.inc(result="hit" if results is not None else "miss")
+        if results is None:
+            results = await self._search.search_similar(
+                query_embedding, limit, published_after, published_before
+            )
+            if not isinstance(results, PartialResults):
+                await self._backend.set(key, generation, results)
+        return results
+
+    async def search_similar_batch(
+        self,
+        query_embeddings: list[list[float]],
+        limit: int = 5,
+        published_after: date | None = None,
+        published_before: date | None = None,
+    ) -> list[list[SearchResult]]:
+        generation = await self._generation()
+        if generation is None:
+            return await self._search.search_similar_batch(
+                query_embeddings, limit, published_after, published_before
+            )
+        keys = [cache_key(e, limit, published_after, published_before) for e in query_embeddings]
+        results = await self._backend.get_many(keys, generation)
+        misses = [i for i, hit in enumerate(results) if hit is None]
+        _lookups.inc(len(keys) - len(misses), result="hit")
+        _lookups.inc(len(misses), result="miss")
+        if misses:
+            fresh = await self._search.search_similar_batch(
+                [query_embeddings[i] for i in misses], limit, published_after, published_before
+            )
+            for i, hits in zip(misses, fresh):
+                results[i] = hits
+                if not isinstance(hits, PartialResults):
+                    await self._backend.set(keys[i], generation, hits)
+        return results
+
+
+def _backend() -> SearchCacheBackend | None:
+    if settings.retrieval_cache_backend == "none":
+        return None
+    return BACKENDS[settings.retrieval_cache_backend](settings.retrieval_cache_size)
+
+
+vector_search = CachedVectorSearch(
+    vector_shards if vector_shards.enabled else persistence_service, _backend()
+)
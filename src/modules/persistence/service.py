@@ -1,23 +1,97 @@
 import logging
 import uuid
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import date, datetime
 
-from sqlalchemy import delete, select
+from sqlalchemy import Row, and_, delete, func, or_, select, text, true, tuple_
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config.database import async_session
+from src.config.database import async_session, bulk_engine, bulk_session, read_session
 from src.modules.persistence.contracts import (
     ConversationContract,
     DocumentContract,
     VectorSearchContract,
 )
-from src.modules.persistence.models import Chunk, Conversation, Document, Message
-from src.modules.persistence.schemas import SearchResult
-from src.modules.preprocessor.schemas import ProcessedChunk
+from src.modules.persistence.models import (
+    BUMP_CORPUS_GENERATION,
+    Chunk,
+    CorpusState,
+    Conversation,
+    Document,
+    Message,
+    MessageSource,
+    chunk_md5,
+)
+from src.modules.persistence.pagination import decode_cursor, encode_cursor
+from src.modules.persistence.partitions import ensure_partitions
+from src.modules.persistence.schemas import SearchResult, SourceChunk, SourceDocument
+from src.modules.persistence.sharding import vector_shards
+from src.modules.persistence.vectors import copy_chunks, search_chunks, search_chunks_batch
+from src.modules.persistence.writer import PendingMessage, message_writer
+from src.modules.preprocessor.schemas import ChunkBatch
 from src.modules.scraper.schemas import ScrapedArticle
 
 logger = logging.getLogger(__name__)
 
+INGEST_DOCUMENT_BATCH = 1000  # documents per upsert (7 params each, asyncpg caps at 32767)
+INGEST_CHUNK_BATCH = 5000  # chunks per COPY + commit
+
+LINK_DUPLICATES = text("""
+UPDATE documents d
+SET canonical_id = c.id
+FROM unnest(CAST(:urls AS text[]), CAST(:canonical_urls AS text[])) AS link(url, canonical_url)
+JOIN documents c ON c.url = link.canonical_url
+WHERE d.url = link.url AND d.id <> c.id
+""")
+
+
+def _published_on(article: ScrapedArticle) -> date:
+    # Partition key of the article's chunks; undated articles go to the ingest month
+    return (article.publication_date or datetime.now()).date()
+
+
+def _ingest_batches(articles: list[int], bounds: list[int]) -> Iterator[list[int]]:
+    """Group article indexes so each committed batch stays within the document
+    and chunk bounds; article i has chunk rows `bounds[i]:bounds[i + 1]`."""
+    batch: list[int] = []
+    batch_chunks = 0
+    for article in articles:
+        n_chunks = bounds[article + 1] - bounds[article]
+        if batch and (
+            len(batch) >= INGEST_DOCUMENT_BATCH or batch_chunks + n_chunks > INGEST_CHUNK_BATCH
+        ):
+            yield batch
+            batch, batch_chunks = [], 0
+        batch.append(article)
+        batch_chunks += n_chunks
+    if batch:
+        yield batch
+
+
+def _source_documents(results: list[SearchResult], include_content: bool) -> list[SourceDocument]:
+    documents: dict[uuid.UUID | None, SourceDocument] = {}
+    for result in results:
+        if result.document_id not in documents:
+            documents[result.document_id] = SourceDocument(
+                document_id=result.document_id,
+                document_title=result.document_title,
+                document_url=result.document_url,
+                document_category=result.document_category,
+                document_publication_date=result.document_publication_date,
+                document_content=result.document_content if include_content else None,
+                chunks=[],
+            )
+        documents[result.document_id].chunks.append(
+            SourceChunk(
+                chunk_index=result.chunk_index,
+                similarity=round(result.similarity, 4),
+                content=result.chunk_content if include_content else None,
+            )
+        )
+    return list(documents.values())
+
 
 class PersistenceService(ConversationContract, DocumentContract, VectorSearchContract):
 
@@ -31,21 +105,64 @@ class PersistenceService(ConversationContract, DocumentContract, VectorSearchCon
             await session.refresh(conversation)
             return conversation
 
-    async def list_conversations(self) -> list[Conversation]:
-        async with async_session() as session:
-            result = await session.execute(
-                select(Conversation).order_by(Conversation.updated_at.desc())
+    async def list_conversations(
+        self, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[Row], str | None]:
+        """Most recently updated first; served from the (updated_at, id) index."""
+        stmt = select(
+            Conversation.id, Conversation.title, Conversation.created_at, Conversation.updated_at
+        )
+        if cursor:
+            updated_at, conversation_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Conversation.updated_at, Conversation.id) < tuple_(updated_at, conversation_id)
             )
-            return list(result.scalars().all())
+        stmt = stmt.order_by(Conversation.updated_at.desc(), Conversation.id.desc()).limit(limit + 1)
 
-    async def get_conversation(self, conversation_id: uuid.UUID) -> Conversation | None:
-        async with async_session() as session:
-            result = await session.execute(
-                select(Conversation)
-                .where(Conversation.id == conversation_id)
-                .options(selectinload(Conversation.messages))
-            )
-            return result.scalar_one_or_none()
+        async with read_session() as session:
+            rows = list((await session.execute(stmt)).all())
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].updated_at, rows[-1].id)
+
+    async def get_conversation(
+        self, conversation_id: uuid.UUID, primary: bool = False
+    ) -> Conversation | None:
+        """Reads from the replica unless `primary` is set (read-your-writes)."""
+        async with (async_session if primary else read_session)() as session:
+            return await session.get(Conversation, conversation_id)
+
+    async def list_messages(
+        self,
+        conversation_id: uuid.UUID,
+        limit: int = 50,
+        cursor: str | None = None,
+        primary: bool = False,
+    ) -> tuple[list[Message | PendingMessage], str | None]:
+        """Newest page first, returned in chronological order.
+
+        The cursor continues towards older messages. The newest page also
+        includes messages still queued in the write-behind writer.
+        """
+        pending = message_writer.pending(conversation_id) if cursor is None else []
+        primary = primary or message_writer.needs_primary(conversation_id)
+        stmt = select(Message).where(Message.conversation_id == conversation_id)
+        if cursor:
+            created_at, message_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(Message.created_at, Message.id) < tuple_(created_at, message_id))
+        stmt = stmt.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
+
+        async with (async_session if primary else read_session)() as session:
+            messages = list((await session.execute(stmt)).scalars().all())
+        next_cursor = None
+        if len(messages) > limit:
+            messages = messages[:limit]
+            next_cursor = encode_cursor(messages[-1].created_at, messages[-1].id)
+        messages.reverse()
+        written = {m.id for m in messages}
+        messages.extend(m for m in pending if m.id not in written)
+        return messages, next_cursor
 
     async def delete_conversation(self, conversation_id: uuid.UUID) -> bool:
         async with async_session() as session:
@@ -62,7 +179,7 @@ class PersistenceService(ConversationContract, DocumentContract, VectorSearchCon
         role: str,
         content: str,
         model_id: str | None = None,
-        sources: list | None = None,
+        sources: list[SearchResult] | None = None,
     ) -> Message | None:
         async with async_session() as session:
             conversation = await session.get(Conversation, conversation_id)
@@ -73,77 +190,276 @@ class PersistenceService(ConversationContract, DocumentContract, VectorSearchCon
                 role=role,
                 content=content,
                 model_id=model_id,
-                sources=sources,
+                source_refs=[
+                    MessageSource(
+                        rank=rank,
+                        document_id=source.document_id,
+                        chunk_index=source.chunk_index,
+                        chunk_md5=chunk_md5(source.chunk_content),
+                        similarity=source.similarity,
+                    )
+                    for rank, source in enumerate(sources or [])
+                    if source.document_id is not None
+                ],
             )
             session.add(message)
             await session.commit()
             await session.refresh(message)
             return message
 
+    async def get_message_sources(
+        self,
+        message_ids: list[uuid.UUID],
+        include_content: bool = False,
+        conversation_id: uuid.UUID | None = None,
+    ) -> dict[uuid.UUID, list[SourceDocument]]:
+        """Resolve source references for many messages in one query.
+
+        Document and chunk bodies are only read when `include_content` is set.
+        A cited chunk is then matched by its text, so re-chunking that shifted
+        its index still resolves it; one whose text is gone is marked stale.
+        """
+        if not message_ids:
+            return {}
+        # Messages still in the write-behind queue carry their search results
+        pending = {
+            message.id: message
+            for message in map(message_writer.pending_message, message_ids)
+            if message is not None
+            and (conversation_id is None or message.conversation_id == conversation_id)
+        }
+        columns = [
+            MessageSource.message_id,
+            MessageSource.chunk_index,
+            MessageSource.similarity,
+            Document.id,
+            Document.title,
+            Document.url,
+            Document.category,
+            Document.publication_date,
+        ]
+        stmt = select(*columns).join(Document, Document.id == MessageSource.document_id)
+        if include_content:
+            same_index = Chunk.chunk_index == MessageSource.chunk_index
+            cited = (
+                select(Chunk.chunk_index, Chunk.content, Chunk.start_char, Chunk.end_char)
+                .where(
+                    Chunk.document_id == MessageSource.document_id,
+                    or_(
+                        func.md5(Chunk.content) == MessageSource.chunk_md5,
+                        and_(MessageSource.chunk_md5.is_(None), same_index),
+                    ),
+                )
+                .order_by(same_index.desc())
+                .limit(1)
+                .lateral("cited")
+            )
+            stmt = stmt.add_columns(
+                Document.content, cited.c.chunk_index, cited.c.content, cited.c.start_char, cited.c.end_char
+            ).outerjoin(cited, true())
+        if conversation_id is not None:
+            stmt = stmt.join(Message, Message.id == MessageSource.message_id).where(
+                Message.conversation_id == conversation_id
+            )
+        stmt = stmt.where(MessageSource.message_id.in_(message_ids)).order_by(
+            MessageSource.message_id, MessageSource.rank
+        )
+
+        async with read_session() as session:
+            rows = (await session.execute(stmt)).all()
+
+        grouped: dict[uuid.UUID, dict[uuid.UUID, SourceDocument]] = defaultdict(dict)
+        for row in rows:
+            message_id, chunk_index, similarity, doc_id, title, url, category, published = row[:8]
+            document_content, cited_index, chunk_content, start_char, end_char = (
+                row[8:] if include_content else (None, None, None, None, None)
+            )
+            documents = grouped[message_id]
+            if doc_id not in documents:
+                documents[doc_id] = SourceDocument(
+                    document_id=doc_id,
+                    document_title=title,
+                    document_url=url,
+                    document_category=category,
+                    document_publication_date=published,
+                    document_content=document_content,
+                    chunks=[],
+                )
+            documents[doc_id].chunks.append(
+                SourceChunk(
+                    chunk_index=chunk_index if cited_index is None else cited_index,
+                    similarity=round(similarity, 4),
+                    content=chunk_content,
+                    start_char=start_char,
+                    end_char=end_char,
+                    stale=include_content and chunk_content is None,
+                )
+            )
+        sources = {message_id: list(docs.values()) for message_id, docs in grouped.items()}
+        for message_id, message in pending.items():
+            if message_id not in sources and message.sources:
+                sources[message_id] = _source_documents(message.sources, include_content)
+        return sources
+
     # ── Documents ────────────────────────────────────────────────
 
     async def batch_store(
         self,
         articles: list[ScrapedArticle],
-        chunks: list[ProcessedChunk],
-        embeddings: list[list[float]],
+        chunks: ChunkBatch,
+        signatures: dict[str, list[int]] | None = None,
+        duplicates: dict[str, str] | None = None,
     ) -> int:
-        async with async_session() as session:
-            # 1. Upsert documents by URL
-            doc_map: dict[str, uuid.UUID] = {}
-            for article in articles:
-                stmt = (
-                    insert(Document)
-                    .values(
-                        url=article.url,
-                        title=article.title,
-                        category=article.category,
-                        publication_date=article.publication_date,
-                        content=article.content,
-                    )
-                    .on_conflict_do_update(
-                        index_elements=["url"],
-                        set_={
-                            "title": article.title,
-                            "category": article.category,
-                            "publication_date": article.publication_date,
-                            "content": article.content,
-                        },
-                    )
-                    .returning(Document.id)
+        """Upsert documents and replace their chunks with the embedded `chunks`.
+        `duplicates` maps a near-duplicate article's URL to its canonical
+        article's URL."""
+        signatures = signatures or {}
+        duplicates = duplicates or {}
+        # One upsert cannot touch the same row twice — the last copy of a URL wins
+        unique = list({article.url: i for i, article in enumerate(articles)}.values())
+        unique_articles = [articles[i] for i in unique]
+        bounds = chunks.article_bounds(len(articles)).tolist()
+        # Converted once for the whole batch: big-endian rows for the binary
+        # COPY, Python ints for asyncpg
+        vectors = chunks.embeddings.astype(">f4")
+        chunk_index = chunks.chunk_index.tolist()
+        start_char = chunks.start_char.tolist()
+        end_char = chunks.end_char.tolist()
+
+        # Partitions are created in their own short transaction — creating one
+        # locks the parent table, which must not be held across a data load
+        async with bulk_engine.begin() as conn:
+            await ensure_partitions(conn, {_published_on(a) for a in unique_articles})
+
+        stored_documents = stored_chunks = 0
+        for batch in _ingest_batches(unique, bounds):
+            batch_articles = [articles[i] for i in batch]
+            async with bulk_session() as session:
+                # 1. Upsert documents by URL — one multi-row statement per batch
+                doc_map = await self._upsert_documents(session, batch_articles, signatures)
+
+                # 2. Delete old chunks for these documents
+                await session.execute(
+                    delete(Chunk).where(Chunk.document_id.in_(list(doc_map.values())))
                 )
-                result = await session.execute(stmt)
-                doc_id = result.scalar_one()
-                doc_map[article.url] = doc_id
-
-            # 2. Delete old chunks for these documents
-            doc_ids = list(doc_map.values())
-            await session.execute(
-                delete(Chunk).where(Chunk.document_id.in_(doc_ids))
-            )
 
-            # 3. Insert new chunks with embeddings
-            chunk_rows = []
-            for chunk, embedding in zip(chunks, embeddings):
-                doc_id = doc_map.get(chunk.url)
-                if doc_id is None:
-                    continue
-                chunk_rows.append(
-                    Chunk(
-                        document_id=doc_id,
-                        chunk_index=chunk.chunk_index,
-                        content=chunk.content,
-                        embedding=embedding,
+                # 3. COPY new chunks with binary-encoded embeddings
+                records = [
+                    (
+                        uuid.uuid4(),
+                        _published_on(articles[i]),
+                        doc_map[articles[i].url],
+                        chunk_index[row],
+                        chunks.texts[row],
+                        start_char[row],
+                        end_char[row],
+                        vectors[row],
                     )
-                )
+                    for i in batch
+                    for row in range(bounds[i], bounds[i + 1])
+                ]
+                if vector_shards.enabled:
+                    # Embedded chunks go to the shards before the primary
+                    # commits, so the generation bump follows them
+                    await vector_shards.store(
+                        [
+                            {
+                                "id": doc_map[a.url],
+                                "url": a.url,
+                                "title": a.title,
+                                "category": a.category,
+                                "publication_date": a.publication_date,
+                                "content": a.content,
+                            }
+                            for a in batch_articles
+                        ],
+                        records,
+                    )
+                    records = [record[:-1] + (None,) for record in records]
+                await copy_chunks(session, records)
+                await session.execute(BUMP_CORPUS_GENERATION)
+                await session.commit()
 
-            session.add_all(chunk_rows)
-            await session.commit()
+            stored_documents += len(doc_map)
+            stored_chunks += len(records)
+
+        # 4. Link near-duplicates once every canonical copy is stored
+        if duplicates:
+            async with bulk_session() as session:
+                await session.execute(
+                    LINK_DUPLICATES,
+                    {"urls": list(duplicates), "canonical_urls": list(duplicates.values())},
+                )
+                await session.execute(BUMP_CORPUS_GENERATION)
+                await session.commit()
 
         logger.info(
-            "Stored %d documents, %d chunks", len(doc_map), len(chunk_rows)
+            "Stored %d documents (%d near-duplicates), %d chunks",
+            stored_documents,
+            len(duplicates),
+            stored_chunks,
         )
-        return len(doc_map)
+        return stored_documents
+
+    async def get_document_signatures(self) -> dict[str, list[int]]:
+        """MinHash signatures of stored canonical documents, by URL."""
+        async with read_session() as session:
+            result = await session.execute(
+                select(Document.url, Document.minhash).where(
+                    Document.canonical_id.is_(None), Document.minhash.is_not(None)
+                )
+            )
+            return {url: signature for url, signature in result.all()}
+
+    async def get_document_urls(self, urls: list[str]) -> set[str]:
+        """The subset of `urls` already stored."""
+        if not urls:
+            return set()
+        async with read_session() as session:
+            result = await session.execute(select(Document.url).where(Document.url.in_(urls)))
+            return set(result.scalars())
+
+    async def get_corpus_generation(self) -> int | None:
+        """Bumped by every commit that changes search results; None before migrations."""
+        async with read_session() as session:
+            return await session.scalar(select(CorpusState.generation).where(CorpusState.id == 1))
+
+    async def get_latest_publication_date(self) -> datetime | None:
+        async with read_session() as session:
+            return await session.scalar(select(func.max(Document.publication_date)))
+
+    @staticmethod
+    async def _upsert_documents(
+        session: AsyncSession,
+        articles: list[ScrapedArticle],
+        signatures: dict[str, list[int]],
+    ) -> dict[str, uuid.UUID]:
+        stmt = insert(Document).values([
+            {
+                "url": article.url,
+                "title": article.title,
+                "category": article.category,
+                "publication_date": article.publication_date,
+                "content": article.content,
+                "minhash": signatures.get(article.url),
+                "canonical_id": None,
+            }
+            for article in articles
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["url"],
+            set_={
+                "title": stmt.excluded.title,
+                "category": stmt.excluded.category,
+                "publication_date": stmt.excluded.publication_date,
+                "content": stmt.excluded.content,
+                "minhash": stmt.excluded.minhash,
+                "canonical_id": None,
+                "updated_at": func.now(),
+            },
+        ).returning(Document.url, Document.id)
+        result = await session.execute(stmt)
+        return {url: doc_id for url, doc_id in result.all()}
 
     # ── Vector Search ────────────────────────────────────────────
 
@@ -151,31 +467,25 @@ class PersistenceService(ConversationContract, DocumentContract, VectorSearchCon
         self,
         query_embedding: list[float],
         limit: int = 5,
+        published_after: date | None = None,
+        published_before: date | None = None,
     ) -> list[SearchResult]:
-        async with async_session() as session:
-            distance = Chunk.embedding.cosine_distance(query_embedding)
-            result = await session.execute(
-                select(Chunk, Document, distance.label("distance"))
-                .join(Document, Chunk.document_id == Document.id)
-                .order_by(distance)
-                .limit(limit)
+        async with read_session() as session:
+            return await search_chunks(
+                session, query_embedding, limit, published_after, published_before
             )
 
-            results = []
-            for chunk, document, dist in result.all():
-                results.append(
-                    SearchResult(
-                        chunk_content=chunk.content,
-                        chunk_index=chunk.chunk_index,
-                        similarity=1 - dist,
-                        document_title=document.title,
-                        document_url=document.url,
-                        document_content=document.content,
-                        document_category=document.category,
-                        document_publication_date=document.publication_date,
-                    )
-                )
-            return results
+    async def search_similar_batch(
+        self,
+        query_embeddings: list[list[float]],
+        limit: int = 5,
+        published_after: date | None = None,
+        published_before: date | None = None,
+    ) -> list[list[SearchResult]]:
+        async with read_session() as session:
+            return await search_chunks_batch(
+                session, query_embeddings, limit, published_after, published_before
+            )
 
 
 persistence_service = PersistenceService()
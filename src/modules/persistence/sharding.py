@@ -0,0 +1,217 @@
+"""Vector search spread over several Postgres databases (VECTOR_SHARD_URLS).
+
+Each shard holds complete documents with their embedded chunks, in the same
+schema as the primary. A document lives on one shard, chosen by a hash of its
+URL or, with the "time" strategy, by its publication date
+(VECTOR_SHARD_BOUNDARIES). A search queries every shard that can hold matching
+dates concurrently and merges the top k. A shard that fails, or does not
+answer within VECTOR_SHARD_TIMEOUT, is left out of the results rather than
+failing the request; such results come back as `PartialResults`, which
+callers must not cache.
+
+The primary stays the system of record: it keeps every document and chunk,
+but with shards configured its chunks carry no embedding, so it builds no
+vector index.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import heapq
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.config.database import shard_engines
+from src.config.settings import settings
+from src.modules.metrics.service import metrics_service
+from src.modules.persistence.contracts import VectorSearchContract
+from src.modules.persistence.models import Document
+from src.modules.persistence.partitions import ensure_partitions
+from src.modules.persistence.schemas import SearchResult
+from src.modules.persistence.vectors import copy_chunks, search_chunks, search_chunks_batch
+
+logger = logging.getLogger(__name__)
+
+_shard_seconds = metrics_service.histogram(
+    "vector_shard_search_seconds", "Time for one shard to answer a search, by shard"
+)
+_shard_failures = metrics_service.counter(
+    "vector_shard_failures_total", "Shard searches left out of the results, by shard and reason"
+)
+_partial = metrics_service.counter(
+    "vector_search_partial_total", "Searches answered without every shard"
+)
+
+
+class PartialResults(list):
+    """Search results merged without the answer of every shard."""
+
+
+def _merge(answers: list[list[SearchResult]], limit: int, partial: bool) -> list[SearchResult]:
+    merged = heapq.nlargest(limit, (r for results in answers for r in results), key=lambda r: r.similarity)
+    return PartialResults(merged) if partial else merged
+
+
+@dataclass
+class Shard:
+    name: str
+    engine: AsyncEngine
+    session: async_sessionmaker[AsyncSession]
+    start: date | None = None  # time strategy: holds publication dates in [start, end)
+    end: date | None = None
+
+    def covers(self, published_after: date | None, published_before: date | None) -> bool:
+        return (self.end is None or published_after is None or published_after < self.end) and (
+            self.start is None or published_before is None or published_before >= self.start
+        )
+
+
+class ShardedVectorSearch(VectorSearchContract):
+    def __init__(
+        self, engines: list[AsyncEngine], strategy: str, boundaries: list[date], timeout: float
+    ) -> None:
+        if engines and strategy == "time" and (
+            len(boundaries) != len(engines) - 1 or boundaries != sorted(boundaries)
+        ):
+            raise ValueError("VECTOR_SHARD_BOUNDARIES needs one ascending date fewer than there are shards")
+        self._strategy = strategy
+        self._boundaries = boundaries if strategy == "time" else []
+        self._timeout = timeout
+        self.shards = [
+            Shard(f"shard{i}", engine, async_sessionmaker(engine, expire_on_commit=False))
+            for i, engine in enumerate(engines)
+        ]
+        if strategy == "time":
+            for shard, start, end in zip(self.shards, [None, *boundaries], [*boundaries, None]):
+                shard.start, shard.end = start, end
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.shards)
+
+    def shard_for(self, url: str, published_on: date) -> Shard:
+        if self._strategy == "time":
+            return self.shards[bisect.bisect_right(self._boundaries, published_on)]
+        digest = hashlib.blake2b(url.encode(), digest_size=8).digest()
+        return self.shards[int.from_bytes(digest, "big") % len(self.shards)]
+
+    # ── Search ──────────────────────────────────────────────────
+
+    async def _scatter(
+        self,
+        query: Callable[[AsyncSession], Awaitable],
+        published_after: date | None,
+        published_before: date | None,
+    ) -> tuple[list, bool]:
+        """The answers of the shards that answered, and whether any did not."""
+        shards = [s for s in self.shards if s.covers(published_after, published_before)]
+
+        async def ask(shard: Shard):
+            async with shard.session() as session:
+                return await query(session)
+
+        async def ask_in_time(shard: Shard):
+            start = time.perf_counter()
+            try:
+                return await asyncio.wait_for(ask(shard), self._timeout)
+            except TimeoutError:
+                _shard_failures.inc(shard=shard.name, reason="timeout")
+                logger.warning("%s did not answer within %.1fs", shard.name, self._timeout)
+            except Exception:
+                _shard_failures.inc(shard=shard.name, reason="error")
+                logger.warning("%s search failed", shard.name, exc_info=True)
+            finally:
+                _shard_seconds.observe(time.perf_counter() - start, shard=shard.name)
+            return None
+
+        answers = await asyncio.gather(*(ask_in_time(shard) for shard in shards))
+        answered = [answer for answer in answers if answer is not None]
+        if shards and not answered:
+            raise RuntimeError("No vector search shard answered")
+        partial = len(answered) < len(shards)
+        if partial:
+            _partial.inc()
+        return answered, partial
+
+    async def search_similar(
+        self,
+        query_embedding: list[float],
+        limit: int = 5,
+        published_after: date | None = None,
+        published_before: date | None = None,
+    ) -> list[SearchResult]:
+        answers, partial = await self._scatter(
+            lambda session: search_chunks(
+                session, query_embedding, limit, published_after, published_before
+            ),
+            published_after,
+            published_before,
+        )
+        return _merge(answers, limit, partial)
+
+    async def search_similar_batch(
+        self,
+        query_embeddings: list[list[float]],
+        limit: int = 5,
+        published_after: date | None = None,
+        published_before: date | None = None,
+    ) -> list[list[SearchResult]]:
+        answers, partial = await self._scatter(
+            lambda session: search_chunks_batch(
+                session, query_embeddings, limit, published_after, published_before
+            ),
+            published_after,
+            published_before,
+        )
+        if not answers:  # no shard holds the filtered dates
+            return [[] for _ in query_embeddings]
+        return [_merge(per_shard, limit, partial) for per_shard in zip(*answers)]
+
+    # ── Writes ──────────────────────────────────────────────────
+
+    async def store(self, documents: list[dict], records: list[tuple]) -> None:
+        """Put `documents` (Document column values, primary ids) and their chunk
+        `records` (CHUNK_COPY_COLUMNS) on their shards, replacing earlier copies
+        on any shard — a re-dated document can move."""
+        published = {record[2]: record[1] for record in records}
+        placed: dict[str, list[dict]] = defaultdict(list)
+        for document in documents:
+            if document["id"] in published:  # near-duplicates and empty articles have no chunks
+                placed[self.shard_for(document["url"], published[document["id"]]).name].append(document)
+        shard_of = {document["id"]: name for name, docs in placed.items() for document in docs}
+        chunks: dict[str, list[tuple]] = defaultdict(list)
+        for record in records:
+            chunks[shard_of[record[2]]].append(record)
+        urls = [document["url"] for document in documents]
+
+        await asyncio.gather(*(
+            self._write(shard, urls, placed[shard.name], chunks[shard.name]) for shard in self.shards
+        ))
+
+    @staticmethod
+    async def _write(shard: Shard, urls: list[str], documents: list[dict], records: list[tuple]) -> None:
+        if records:
+            async with shard.engine.begin() as conn:
+                await ensure_partitions(conn, {record[1] for record in records})
+        async with shard.session() as session:
+            # Chunks go with their document (ON DELETE CASCADE)
+            await session.execute(delete(Document).where(Document.url.in_(urls)))
+            if documents:
+                await session.execute(insert(Document), documents)
+            await copy_chunks(session, records)
+            await session.commit()
+
+
+vector_shards = ShardedVectorSearch(
+    shard_engines,
+    settings.vector_shard_strategy,
+    settings.vector_shard_boundaries,
+    settings.vector_shard_timeout,
+)
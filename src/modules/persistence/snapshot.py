@@ -0,0 +1,358 @@
+"""Corpus snapshots: every document and chunk, embeddings included, in a
+compressed columnar format, so a new environment is searchable without
+re-running the pipeline:
+
+    python -m src.modules.persistence.snapshot export snapshots/2026-10
+    python -m src.modules.persistence.snapshot import snapshots/2026-10 [--replace]
+
+A snapshot is a directory with `manifest.json` and one table each for
+documents and chunks: Parquet (zstd) when `pyarrow` is installed, otherwise
+compressed NumPy archives. Import refuses a snapshot made with another
+embedding model: the manifest records the model, its dimension and the
+embedding of a probe text, which must match the local model's. Chunks are
+loaded with COPY into the monthly partitions, with their indexes dropped
+during the load and built once afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import text
+
+from src.config.database import bulk_engine, dispose_engines, engine, shard_engines
+from src.modules.embedder.service import EMBEDDING_DIM, EMBEDDING_MODEL, embedder_service
+from src.modules.persistence.migrations import setup_database
+from src.modules.persistence.models import BUMP_CORPUS_GENERATION, Chunk, Document
+from src.modules.persistence.partitions import ensure_partitions
+from src.modules.persistence.vectors import decode_vector, encode_vector
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional; NumPy archives need no extra dependency
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+MANIFEST = "manifest.json"
+PROBE_TEXT = "The Commission adopted a proposal on energy security."
+PROBE_MIN_SIMILARITY = 0.999  # same weights on other hardware still differ slightly
+INDEX_BUILD_MEMORY = "1GB"  # maintenance_work_mem while the indexes are rebuilt
+
+# Column kinds drive the NumPy encoding; Parquet infers types from the values
+DOCUMENT_COLUMNS = {
+    "id": "str",
+    "url": "str",
+    "title": "str",
+    "category": "str",
+    "publication_date": "datetime",
+    "content": "str",
+    "minhash": "int_list",
+    "canonical_id": "str",
+    "created_at": "datetime",
+    "updated_at": "datetime",
+}
+CHUNK_COLUMNS = {
+    "id": "str",
+    "published_on": "date",
+    "document_id": "str",
+    "chunk_index": "int",
+    "content": "str",
+    "start_char": "int",
+    "end_char": "int",
+    "created_at": "datetime",
+    "embedding": "vector",
+}
+UUID_COLUMNS = {"id", "document_id", "canonical_id"}
+
+Table = dict[str, list | np.ndarray]
+
+
+# ── Table files ─────────────────────────────────────────────────
+
+
+def _pack(kind: str, values: list | np.ndarray) -> dict[str, np.ndarray]:
+    if kind == "vector":
+        return {"": np.asarray(values, dtype=np.float32)}
+    null = np.array([v is None for v in values], dtype=bool)
+    if kind == "str":
+        encoded = [(v or "").encode() for v in values]
+        return {
+            "": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "offsets": np.cumsum([0] + [len(b) for b in encoded], dtype=np.int64),
+            "null": null,
+        }
+    if kind == "int_list":
+        return {
+            "": np.array([x for v in values for x in v or ()], dtype=np.int64),
+            "offsets": np.cumsum([0] + [len(v or ()) for v in values], dtype=np.int64),
+            "null": null,
+        }
+    if kind == "int":
+        return {"": np.array([v or 0 for v in values], dtype=np.int64), "null": null}
+    unit = "D" if kind == "date" else "us"
+    return {"": np.array([v or 0 for v in values], dtype=f"datetime64[{unit}]"), "null": null}
+
+
+def _unpack(kind: str, arrays: dict[str, np.ndarray]) -> list | np.ndarray:
+    data = arrays[""]
+    if kind == "vector":
+        return data
+    null = arrays["null"].tolist()
+    if kind == "str":
+        blob, offsets = data.tobytes(), arrays["offsets"].tolist()
+        values = [blob[offsets[i] : offsets[i + 1]].decode() for i in range(len(null))]
+    elif kind == "int_list":
+        flat, offsets = data.tolist(), arrays["offsets"].tolist()
+        values = [flat[offsets[i] : offsets[i + 1]] for i in range(len(null))]
+    else:
+        values = data.tolist()  # int, date and datetime as Python objects
+    return [None if missing else value for value, missing in zip(values, null)]
+
+
+def _write_table(path: Path, table: Table, columns: dict[str, str]) -> Path:
+    if pq is not None:
+        arrays = {}
+        for name, kind in columns.items():
+            if kind == "vector":
+                matrix = np.asarray(table[name], dtype=np.float32)
+                arrays[name] = pa.FixedSizeListArray.from_arrays(pa.array(matrix.ravel()), EMBEDDING_DIM)
+            else:
+                arrays[name] = pa.array(table[name])
+        target = path.with_suffix(".parquet")
+        pq.write_table(pa.table(arrays), target, compression="zstd")
+        return target
+    target = path.with_suffix(".npz")
+    np.savez_compressed(
+        target,
+        **{
+            f"{name}.{part}" if part else name: array
+            for name, kind in columns.items()
+            for part, array in _pack(kind, table[name]).items()
+        },
+    )
+    return target
+
+
+def _read_table(path: Path, columns: dict[str, str]) -> Table:
+    if path.suffix == ".parquet":
+        if pq is None:
+            raise SystemExit(f"{path} is Parquet; install pyarrow to import it")
+        parquet = pq.read_table(path)
+        table: Table = {}
+        for name, kind in columns.items():
+            column = parquet.column(name).combine_chunks()
+            if kind == "vector":
+                table[name] = column.values.to_numpy().reshape(-1, EMBEDDING_DIM)
+            else:
+                table[name] = column.to_pylist()
+        return table
+    with np.load(path, allow_pickle=False) as archive:
+        return {
+            name: _unpack(
+                kind,
+                {
+                    key.partition(".")[2]: archive[key]
+                    for key in archive.files
+                    if key.partition(".")[0] == name
+                },
+            )
+            for name, kind in columns.items()
+        }
+
+
+def _table_path(directory: Path, name: str) -> Path:
+    for suffix in (".parquet", ".npz"):
+        if (path := directory / f"{name}{suffix}").exists():
+            return path
+    raise SystemExit(f"{directory} has no {name} table")
+
+
+# ── Export ──────────────────────────────────────────────────────
+
+
+async def _probe() -> list[float]:
+    return await embedder_service.embed_query(PROBE_TEXT)
+
+
+async def _fetch(query: str, columns: dict[str, str]) -> Table:
+    async with bulk_engine.connect() as conn:
+        driver = (await conn.get_raw_connection()).driver_connection  # asyncpg.Connection
+        # Vectors straight into float32 rows: int16 dim, int16 unused, big-endian floats
+        await driver.set_type_codec(
+            "vector",
+            encoder=encode_vector,
+            decoder=lambda data: np.frombuffer(data, dtype=">f4", offset=4),
+            format="binary",
+        )
+        try:
+            rows = await driver.fetch(query)
+        finally:
+            await driver.reset_type_codec("vector")
+    table: Table = {}
+    for i, (name, kind) in enumerate(columns.items()):
+        values = [row[i] for row in rows]
+        if kind == "vector":
+            table[name] = np.array(values, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+        elif name in UUID_COLUMNS:
+            table[name] = [str(v) if v is not None else None for v in values]
+        else:
+            table[name] = values
+    return table
+
+
+async def export_snapshot(directory: Path) -> dict:
+    directory.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    documents = await _fetch(
+        f"SELECT {', '.join(DOCUMENT_COLUMNS)} FROM {Document.__tablename__} ORDER BY url",
+        DOCUMENT_COLUMNS,
+    )
+    chunks = await _fetch(
+        f"SELECT {', '.join(CHUNK_COLUMNS)} FROM {Chunk.__tablename__} ORDER BY document_id, chunk_index",
+        CHUNK_COLUMNS,
+    )
+    files = [
+        _write_table(directory / "documents", documents, DOCUMENT_COLUMNS).name,
+        _write_table(directory / "chunks", chunks, CHUNK_COLUMNS).name,
+    ]
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "embedding_model": EMBEDDING_MODEL,
+        "embedding_dim": EMBEDDING_DIM,
+        "probe": await _probe(),
+        "documents": len(documents["id"]),
+        "chunks": len(chunks["id"]),
+        "files": files,
+    }
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    logger.info(
+        "Exported %d documents and %d chunks to %s in %.1fs",
+        manifest["documents"], manifest["chunks"], directory, time.perf_counter() - start,
+    )
+    return manifest
+
+
+# ── Import ──────────────────────────────────────────────────────
+
+
+async def _verify_model(manifest: dict) -> None:
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise SystemExit(f"Unsupported snapshot version {manifest.get('version')}")
+    if (manifest["embedding_model"], manifest["embedding_dim"]) != (EMBEDDING_MODEL, EMBEDDING_DIM):
+        raise SystemExit(
+            f"Snapshot embeddings come from {manifest['embedding_model']} ({manifest['embedding_dim']} dims);"
+            f" this build uses {EMBEDDING_MODEL} ({EMBEDDING_DIM} dims)"
+        )
+    expected = np.asarray(manifest["probe"])
+    actual = np.asarray(await _probe())
+    similarity = float(expected @ actual / (np.linalg.norm(expected) * np.linalg.norm(actual)))
+    if similarity < PROBE_MIN_SIMILARITY:
+        raise SystemExit(
+            f"Local {EMBEDDING_MODEL} embeds the probe differently (cosine {similarity:.4f});"
+            " the snapshot was made with other model weights"
+        )
+
+
+def _records(table: Table, columns: dict[str, str]) -> list[tuple]:
+    converted = [
+        [uuid.UUID(v) if v is not None else None for v in table[name]] if name in UUID_COLUMNS else table[name]
+        for name in columns
+    ]
+    return list(zip(*converted))
+
+
+async def import_snapshot(directory: Path, replace: bool = False) -> dict:
+    manifest = json.loads((directory / MANIFEST).read_text())
+    await _verify_model(manifest)
+    documents = _read_table(_table_path(directory, "documents"), DOCUMENT_COLUMNS)
+    chunks = _read_table(_table_path(directory, "chunks"), CHUNK_COLUMNS)
+    start = time.perf_counter()
+
+    await setup_database(engine)
+    async with bulk_engine.begin() as conn:
+        existing = await conn.scalar(text(f"SELECT count(*) FROM {Document.__tablename__}"))
+        if existing and not replace:
+            raise SystemExit(f"The database already holds {existing} documents; use --replace")
+        await ensure_partitions(conn, set(chunks["published_on"]))
+
+    chunk_indexes = list(Chunk.__table__.indexes)
+    async with bulk_engine.begin() as conn:
+        if replace:
+            # Cascades to chunks and to message sources citing the old documents
+            await conn.execute(text(f"TRUNCATE {Document.__tablename__} CASCADE"))
+        # One index build after the load beats maintaining them row by row
+        for index in chunk_indexes:
+            await conn.run_sync(index.drop)
+
+        driver = (await conn.get_raw_connection()).driver_connection
+        await driver.copy_records_to_table(
+            Document.__tablename__, records=_records(documents, DOCUMENT_COLUMNS), columns=list(DOCUMENT_COLUMNS)
+        )
+        await driver.set_type_codec(
+            "vector", encoder=encode_vector, decoder=decode_vector, format="binary"
+        )
+        try:
+            await driver.copy_records_to_table(
+                Chunk.__tablename__, records=_records(chunks, CHUNK_COLUMNS), columns=list(CHUNK_COLUMNS)
+            )
+        finally:
+            await driver.reset_type_codec("vector")
+        loaded = time.perf_counter()
+
+        await conn.execute(text(f"SET LOCAL maintenance_work_mem = '{INDEX_BUILD_MEMORY}'"))
+        for index in chunk_indexes:
+            await conn.run_sync(index.create)
+        await conn.execute(BUMP_CORPUS_GENERATION)
+    async with bulk_engine.begin() as conn:
+        await conn.execute(text(f"ANALYZE {Document.__tablename__}, {Chunk.__tablename__}"))
+
+    logger.info(
+        "Imported %d documents and %d chunks in %.1fs (load %.1fs, indexes %.1fs)",
+        len(documents["id"]), len(chunks["id"]),
+        time.perf_counter() - start, loaded - start, time.perf_counter() - loaded,
+    )
+    return manifest
+
+
+async def _main(args: argparse.Namespace) -> None:
+    if shard_engines:
+        # The primary's chunks carry no embeddings once they live on the shards
+        raise SystemExit("Snapshots cover unsharded deployments; unset VECTOR_SHARD_URLS")
+    try:
+        if args.command == "export":
+            await export_snapshot(args.directory)
+        else:
+            await import_snapshot(args.directory, args.replace)
+    finally:
+        await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.modules.persistence.snapshot",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write the corpus to a snapshot directory")
+    export.add_argument("directory", type=Path)
+    load = commands.add_parser("import", help="load a snapshot into the database")
+    load.add_argument("directory", type=Path)
+    load.add_argument("--replace", action="store_true", help="delete the current corpus first")
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
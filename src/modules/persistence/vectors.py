@@ -0,0 +1,160 @@
+"""pgvector access shared by the primary database and the search shards:
+the binary vector codec, the chunk COPY, and the top-k queries."""
+
+import struct
+from datetime import date
+
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Text, cast, func, select, true
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.modules.persistence.models import Chunk, Document
+from src.modules.persistence.schemas import SearchResult
+
+SEARCH_BATCH_SIZE = 64  # queries per round trip in search_chunks_batch
+CHUNK_COPY_COLUMNS = [
+    "id", "published_on", "document_id", "chunk_index", "content", "start_char", "end_char", "embedding"
+]
+
+
+def vector_literal(embedding: list[float]) -> str:
+    return "[" + ",".join(map(str, embedding)) + "]"
+
+
+def encode_vector(embedding: np.ndarray) -> bytes:
+    # pgvector binary format: int16 dim, int16 unused, dim × float32 (big-endian)
+    return struct.pack(">HH", len(embedding), 0) + embedding.astype(">f4", copy=False).tobytes()
+
+
+def decode_vector(data: bytes) -> list[float]:
+    dim, _ = struct.unpack_from(">HH", data)
+    return list(struct.unpack_from(f">{dim}f", data, 4))
+
+
+def date_filters(published_after: date | None, published_before: date | None) -> list:
+    """Bounds on the partition key, so the planner prunes to the matching months."""
+    filters = []
+    if published_after is not None:
+        filters.append(Chunk.published_on >= published_after)
+    if published_before is not None:
+        filters.append(Chunk.published_on <= published_before)
+    return filters
+
+
+async def copy_chunks(session: AsyncSession, records: list[tuple]) -> None:
+    """COPY chunk rows (CHUNK_COPY_COLUMNS) with binary-encoded embeddings."""
+    if not records:
+        return
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    driver = raw.driver_connection  # asyncpg.Connection
+    # The binary vector codec is scoped to the COPY so ORM queries on this
+    # pooled connection keep using pgvector's text encoding.
+    await driver.set_type_codec(
+        "vector", encoder=encode_vector, decoder=decode_vector, format="binary"
+    )
+    try:
+        await driver.copy_records_to_table(
+            Chunk.__tablename__, records=records, columns=CHUNK_COPY_COLUMNS
+        )
+    finally:
+        await driver.reset_type_codec("vector")
+
+
+async def search_chunks(
+    session: AsyncSession,
+    query_embedding: list[float],
+    limit: int,
+    published_after: date | None = None,
+    published_before: date | None = None,
+) -> list[SearchResult]:
+    distance = Chunk.embedding.cosine_distance(query_embedding)
+    result = await session.execute(
+        select(Chunk, Document, distance.label("distance"))
+        .join(Document, Chunk.document_id == Document.id)
+        .where(*date_filters(published_after, published_before))
+        .order_by(distance)
+        .limit(limit)
+    )
+
+    results = []
+    for chunk, document, dist in result.all():
+        results.append(
+            SearchResult(
+                document_id=document.id,
+                chunk_content=chunk.content,
+                chunk_index=chunk.chunk_index,
+                similarity=1 - dist,
+                document_title=document.title,
+                document_url=document.url,
+                document_content=document.content,
+                document_category=document.category,
+                document_publication_date=document.publication_date,
+            )
+        )
+    return results
+
+
+async def search_chunks_batch(
+    session: AsyncSession,
+    query_embeddings: list[list[float]],
+    limit: int,
+    published_after: date | None = None,
+    published_before: date | None = None,
+) -> list[list[SearchResult]]:
+    filters = date_filters(published_after, published_before)
+    results: list[list[SearchResult]] = [[] for _ in query_embeddings]
+    for offset in range(0, len(query_embeddings), SEARCH_BATCH_SIZE):
+        batch = query_embeddings[offset : offset + SEARCH_BATCH_SIZE]
+        # One top-k scan per query via LATERAL, all queries in one statement
+        queries = (
+            func.unnest(cast([vector_literal(e) for e in batch], ARRAY(Text)))
+            .table_valued("embedding", with_ordinality="idx")
+            .render_derived(name="q")
+        )
+        distance = Chunk.embedding.cosine_distance(
+            cast(queries.c.embedding, Vector(384))
+        )
+        hits = (
+            select(
+                Chunk.content,
+                Chunk.chunk_index,
+                Chunk.document_id,
+                distance.label("distance"),
+            )
+            .where(*filters)
+            .order_by(distance)
+            .limit(limit)
+            .lateral("hit")
+        )
+        result = await session.execute(
+            select(
+                queries.c.idx,
+                hits.c.content,
+                hits.c.chunk_index,
+                hits.c.distance,
+                Document,
+            )
+            .select_from(queries)
+            .join(hits, true())
+            .join(Document, Document.id == hits.c.document_id)
+            .order_by(queries.c.idx, hits.c.distance)
+        )
+
+        for idx, chunk_content, chunk_index, dist, document in result.all():
+            results[offset + idx - 1].append(
+                SearchResult(
+                    document_id=document.id,
+                    chunk_content=chunk_content,
+                    chunk_index=chunk_index,
+                    similarity=1 - dist,
+                    document_title=document.title,
+                    document_url=document.url,
+                    document_content=document.content,
+                    document_category=document.category,
+                    document_publication_date=document.publication_date,
+                )
+            )
+    return results
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import exc, text
+
+from src.config.database import async_session
+from src.config.settings import settings
+from src.modules.metrics.service import metrics_service
+from src.modules.persistence.models import chunk_md5
+from src.modules.persistence.schemas import SearchResult
+
+logger = logging.getLogger(__name__)
+
+WRITE_ATTEMPTS = 3  # before a batch the database rejects is split into single messages
+RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+MAX_RETRY_BACKOFF = 10.0
+# Conversations written this recently are read from the primary, covering replica lag
+STICKY_PRIMARY_SECONDS = 5.0
+
+# One round trip per batch: messages, their source references and the
+# conversations' updated_at. Rows for deleted conversations or documents are
+# skipped instead of failing the whole batch. created_at keeps queue order.
+INSERT_MESSAGES = text("""
+WITH batch AS (
+    SELECT * FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:conversation_ids AS uuid[]),
+        CAST(:roles AS text[]),
+        CAST(:model_ids AS text[]),
+        CAST(:contents AS text[])
+    ) WITH ORDINALITY AS b(id, conversation_id, role, model_id, content, ord)
+),
+inserted AS (
+    INSERT INTO messages (id, conversation_id, role, model_id, content, created_at)
+    SELECT b.id, b.conversation_id, b.role, b.model_id, b.content,
+           now() + b.ord * interval '1 microsecond'
+    FROM batch b
+    JOIN conversations c ON c.id = b.conversation_id
+    RETURNING id, conversation_id
+),
+sources AS (
+    INSERT INTO message_sources (message_id, rank, document_id, chunk_index, chunk_md5, similarity)
+    SELECT s.message_id, s.rank, s.document_id, s.chunk_index, s.chunk_md5, s.similarity
+    FROM unnest(
+        CAST(:source_message_ids AS uuid[]),
+        CAST(:source_ranks AS integer[]),
+        CAST(:source_document_ids AS uuid[]),
+        CAST(:source_chunk_indexes AS integer[]),
+        CAST(:source_chunk_md5s AS text[]),
+        CAST(:source_similarities AS float8[])
+    ) AS s(message_id, rank, document_id, chunk_index, chunk_md5, similarity)
+    JOIN inserted i ON i.id = s.message_id
+    JOIN documents d ON d.id = s.document_id
+)
+UPDATE conversations c
+SET updated_at = now()
+FROM (SELECT DISTINCT conversation_id FROM inserted) AS touched
+WHERE c.id = touched.conversation_id
+""")
+
+_queue_depth = metrics_service.gauge(
+    "message_writer_queue_depth", "Messages waiting to be written"
+)
+_batch_size = metrics_service.histogram(
+    "message_writer_batch_size", "Messages per batched insert",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+_flush_seconds = metrics_service.histogram(
+    "message_writer_flush_seconds", "Duration of one batched insert"
+)
+_dropped = metrics_service.counter(
+    "message_writer_dropped_total", "Messages the database rejected, or still unwritten at the shutdown deadline"
+)
+
+
+@dataclass
+class PendingMessage:
+    """A message accepted for writing; quacks like `Message` for readers."""
+
+    conversation_id: uuid.UUID
+    role: str
+    content: str
+    model_id: str | None = None
+    sources: list[SearchResult] = field(default_factory=list)
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    created_at: datetime = field(default_factory=datetime.now)  # provisional, for display
+
+
+def _params(batch: list[PendingMessage]) -> dict:
+    params = {
+        "ids": [m.id for m in batch],
+        "conversation_ids": [m.conversation_id for m in batch],
+        "roles": [m.role for m in batch],
+        "model_ids": [m.model_id for m in batch],
+        "contents": [m.content for m in batch],
+        "source_message_ids": [],
+        "source_ranks": [],
+        "source_document_ids": [],
+        "source_chunk_indexes": [],
+        "source_chunk_md5s": [],
+        "source_similarities": [],
+    }
+    for message in batch:
+        for rank, source in enumerate(message.sources):
+            params["source_message_ids"].append(message.id)
+            params["source_ranks"].append(rank)
+            params["source_document_ids"].append(source.document_id)
+            params["source_chunk_indexes"].append(source.chunk_index)
+            params["source_chunk_md5s"].append(chunk_md5(source.chunk_content))
+            params["source_similarities"].append(source.similarity)
+    return params
+
+
+def _transient(error: Exception) -> bool:
+    """Connection-level failures, which the same statement can outlast."""
+    return isinstance(
+        error, (OSError, TimeoutError, exc.TimeoutError, exc.OperationalError, exc.InterfaceError)
+    ) or (isinstance(error, exc.DBAPIError) and error.connection_invalidated)
+
+
+class MessageWriter:
+    """Write-behind queue that batches message inserts from concurrent chats."""
+
+    def __init__(
+        self,
+        batch_size: int = settings.message_writer_batch_size,
+        flush_interval: float = settings.message_writer_flush_interval,
+        queue_size: int = settings.message_writer_queue_size,
+    ) -> None:
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: asyncio.Queue[PendingMessage | None] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self._deadline: float | None = None  # set by stop(): when retries give up
+        self._pending: dict[uuid.UUID, dict[uuid.UUID, PendingMessage]] = {}
+        self._written_at: OrderedDict[uuid.UUID, float] = OrderedDict()
+
+    def start(self) -> None:
+        self._closed, self._deadline = False, None
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = settings.message_writer_stop_timeout) -> None:
+        """Flush everything accepted so far, retrying failed writes for up to
+        `timeout` seconds, then stop. Messages enqueued afterwards are written
+        directly until `start` is called again."""
+        self._closed = True
+        self._deadline = time.monotonic() + timeout
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("Message writer stopped")
+
+    async def enqueue(
+        self,
+        conversation_id: uuid.UUID,
+        role: str,
+        content: str,
+        model_id: str | None = None,
+        sources: list[SearchResult] | None = None,
+    ) -> PendingMessage:
+        message = PendingMessage(
+            conversation_id=conversation_id,
+            role=role,
+            content=content,
+            model_id=model_id,
+            sources=[s for s in sources or [] if s.document_id is not None],
+        )
+        if self._closed:
+            # Shutting down: the queue may already be drained
+            logger.warning("Message writer stopped; writing message %s directly", message.id)
+            await self._write([message])
+            return message
+        self.start()
+        self._pending.setdefault(conversation_id, {})[message.id] = message
+        # Blocks only when the queue is full, pushing back on producers
+        await self._queue.put(message)
+        _queue_depth.set(self._queue.qsize())
+        return message
+
+    def pending(self, conversation_id: uuid.UUID) -> list[PendingMessage]:
+        return list(self._pending.get(conversation_id, {}).values())
+
+    def pending_message(self, message_id: uuid.UUID) -> PendingMessage | None:
+        for messages in self._pending.values():
+            if message_id in messages:
+                return messages[message_id]
+        return None
+
+    def needs_primary(self, conversation_id: uuid.UUID) -> bool:
+        """True while a replica may not yet have this conversation's latest messages."""
+        if conversation_id in self._pending:
+            return True
+        written_at = self._written_at.get(conversation_id)
+        return written_at is not None and time.monotonic() - written_at < STICKY_PRIMARY_SECONDS
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            # Give concurrent chats a moment to join the batch
+            if self._queue.qsize() < self._batch_size - 1 and self._flush_interval > 0:
+                await asyncio.sleep(self._flush_interval)
+            while len(batch) < self._batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            _queue_depth.set(self._queue.qsize())
+            await self._write(batch)
+
+    async def _write(self, batch: list[PendingMessage]) -> None:
+        try:
+            await self._insert(batch)
+        finally:
+            self._settle(batch)
+
+    async def _insert(self, batch: list[PendingMessage]) -> None:
+        """Retry while the database is unreachable; split a batch the statement
+        itself keeps rejecting, so only the offending message is dropped."""
+        params = _params(batch)
+        start = time.perf_counter()
+        delay = RETRY_BACKOFF
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with async_session() as session:
+                    await session.execute(INSERT_MESSAGES, params)
+                    await session.commit()
+                break
+            except Exception as error:
+                if not _transient(error) and attempt >= WRITE_ATTEMPTS:
+                    if len(batch) > 1:
+                        logger.warning(
+                            "Message batch failed %d times; writing its %d messages one by one",
+                            attempt, len(batch), exc_info=True,
+                        )
+                        for message in batch:
+                            await self._insert([message])
+                        return
+                    logger.exception("Dropping message %s after %d attempts", batch[0].id, attempt)
+                    _dropped.inc()
+                    return
+                remaining = None if self._deadline is None else self._deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.exception("Dropping %d messages: still failing at the shutdown deadline", len(batch))
+                    _dropped.inc(len(batch))
+                    return
+                logger.warning(
+                    "Message batch write failed (attempt %d), retrying in %.1fs", attempt, delay, exc_info=True
+                )
+                await asyncio.sleep(delay if remaining is None else min(delay, remaining))
+                delay = min(delay * 2, MAX_RETRY_BACKOFF)
+        _batch_size.observe(len(batch))
+        _flush_seconds.observe(time.perf_counter() - start)
+
+    def _settle(self, batch: list[PendingMessage]) -> None:
+        now = time.monotonic()
+        for message in batch:
+            pending = self._pending.get(message.conversation_id)
+            if pending is not None:
+                pending.pop(message.id, None)
+                if not pending:
+                    del self._pending[message.conversation_id]
+            self._written_at[message.conversation_id] = now
+            self._written_at.move_to_end(message.conversation_id)
+        while self._written_at:
+            conversation_id, written_at = next(iter(self._written_at.items()))
+            if now - written_at < STICKY_PRIMARY_SECONDS:
+                break
+            del self._written_at[conversation_id]
+
+
+message_writer = MessageWriter()
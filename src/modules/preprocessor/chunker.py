@@ -0,0 +1,96 @@
+"""Sentence-packing chunker sized with the embedding model's own tokenizer.
+
+Chunks are built from whole sentences until adding the next one would push
+the embedded text — title prefix and special tokens included — past the
+model's maximum sequence length, so nothing is silently truncated at
+embedding time. Sentences longer than that on their own are cut at token
+boundaries. Each chunk records its character span in the document content.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from huggingface_hub import hf_hub_download
+from tokenizers import Tokenizer
+
+from src.modules.embedder.service import EMBEDDING_MODEL
+
+TOKENIZER_REPO = f"sentence-transformers/{EMBEDDING_MODEL}"
+SPECIAL_TOKENS = 2  # [CLS] and [SEP]
+
+# A sentence ends at . ! ? (optionally closed by a quote or bracket) followed
+# by whitespace and something that can start a sentence
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]?\s+(?=[\"'(\[]?[A-Z0-9])")
+
+
+@dataclass
+class TextChunk:
+    text: str
+    start_char: int
+    end_char: int
+    tokens: int  # as embedded, including the prefix and special tokens
+    truncated: bool  # longer than the model's window; the tail is not embedded
+
+
+def sentence_spans(text: str) -> list[tuple[int, int]]:
+    spans, start = [], 0
+    for match in _SENTENCE_END.finditer(text):
+        spans.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+class TokenChunker:
+    def __init__(self, tokenizer: Tokenizer, max_tokens: int) -> None:
+        self._tokenizer = tokenizer
+        self._tokenizer.no_truncation()
+        self._tokenizer.no_padding()
+        self.max_tokens = max_tokens
+
+    @classmethod
+    def from_pretrained(cls, repo_id: str = TOKENIZER_REPO) -> "TokenChunker":
+        # Same files sentence-transformers loads, from the local HF cache
+        tokenizer = Tokenizer.from_file(hf_hub_download(repo_id, "tokenizer.json"))
+        config = json.loads(Path(hf_hub_download(repo_id, "sentence_bert_config.json")).read_text())
+        return cls(tokenizer, config["max_seq_length"])
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids) + SPECIAL_TOKENS
+
+    def split(self, text: str, prefix: str = "") -> list[TextChunk]:
+        overhead = self.count(prefix)  # prefix plus special tokens
+        # An extremely long title still leaves half the window for text; those
+        # chunks get truncated and show up in the truncation rate
+        budget = max(self.max_tokens - overhead, self.max_tokens // 2)
+        spans = sentence_spans(text)
+        encodings = self._tokenizer.encode_batch(
+            [text[start:end] for start, end in spans], add_special_tokens=False
+        )
+
+        chunks: list[TextChunk] = []
+        start = end = used = 0
+        for (s_start, s_end), encoding in zip(spans, encodings):
+            length = len(encoding.ids)
+            if used and used + length > budget:
+                chunks.append(self._chunk(text, start, end, used + overhead))
+                used = 0
+            if length > budget:
+                # Cut an over-long sentence at token boundaries
+                for i in range(0, length, budget):
+                    piece = encoding.offsets[i : i + budget]
+                    p_start, p_end = s_start + piece[0][0], s_start + piece[-1][1]
+                    chunks.append(self._chunk(text, p_start, p_end, len(piece) + overhead))
+                continue
+            if not used:
+                start = s_start
+            end, used = s_end, used + length
+        if used:
+            chunks.append(self._chunk(text, start, end, used + overhead))
+        return chunks
+
+    def _chunk(self, text: str, start: int, end: int, tokens: int) -> TextChunk:
+        return TextChunk(text[start:end], start, end, tokens, tokens > self.max_tokens)
@@ -0,0 +1,113 @@
+"""Near-duplicate detection: MinHash for whole articles, SimHash for chunks.
+
+Articles whose estimated word-shingle Jaccard similarity reaches
+`DUPLICATE_THRESHOLD` are linked to the first copy seen (already stored
+documents come first). Chunks within `SIMHASH_MAX_DISTANCE` bits of a chunk
+kept from another article are treated as boilerplate and dropped.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: candidates from roughly 0.5 similarity up
+DUPLICATE_THRESHOLD = 0.8
+ARTICLE_SHINGLE = 5  # words per shingle
+CHUNK_SHINGLE = 3
+SIMHASH_BANDS = 4  # 4 x 16 bits: any pair within 3 bits shares a band
+SIMHASH_MAX_DISTANCE = 3
+VECTOR_BYTES = 384 * 4  # one stored all-MiniLM-L6-v2 embedding
+
+_PRIME = (1 << 31) - 1  # signatures fit in Postgres integer[]
+_rng = np.random.default_rng(0x6575726F)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+_BITS = np.arange(64, dtype=np.uint64)
+_WORD = re.compile(r"\w+")
+
+
+def _shingles(text: str, size: int) -> list[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)]
+    return [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+
+
+def minhash(text: str) -> list[int]:
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode()) for s in set(_shingles(text, ARTICLE_SHINGLE))), dtype=np.uint64
+    )
+    # a < 2^31 and hash < 2^32, so a * hash + b stays within uint64
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1).tolist()
+
+
+def simhash(text: str) -> int:
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+            for s in _shingles(text, CHUNK_SHINGLE)
+        ),
+        dtype=np.uint64,
+    )
+    votes = ((hashes[:, None] >> _BITS) & np.uint64(1)).sum(axis=0) * 2 > len(hashes)
+    return sum(1 << int(bit) for bit in np.flatnonzero(votes))
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+class MinHashIndex:
+    """LSH over MinHash signatures; finds an indexed key similar to a signature."""
+
+    def __init__(self) -> None:
+        self._rows = NUM_PERM // LSH_BANDS
+        self._buckets: dict[tuple, list[str]] = {}
+        self._signatures: dict[str, list[int]] = {}
+
+    def _bands(self, signature: list[int]):
+        for band in range(LSH_BANDS):
+            yield (band, *signature[band * self._rows : (band + 1) * self._rows])
+
+    def add(self, key: str, signature: list[int]) -> None:
+        self._signatures[key] = signature
+        for band in self._bands(signature):
+            self._buckets.setdefault(band, []).append(key)
+
+    def find(self, signature: list[int], exclude: str | None = None) -> str | None:
+        seen: set[str] = set()
+        for band in self._bands(signature):
+            for key in self._buckets.get(band, ()):
+                if key in seen or key == exclude:
+                    continue
+                seen.add(key)
+                if similarity(signature, self._signatures[key]) >= DUPLICATE_THRESHOLD:
+                    return key
+        return None
+
+
+class SimHashIndex:
+    """Finds an indexed key whose SimHash is within SIMHASH_MAX_DISTANCE bits."""
+
+    def __init__(self) -> None:
+        self._buckets: dict[tuple[int, int], list[tuple[int, str]]] = {}
+
+    @staticmethod
+    def _bands(value: int):
+        width = 64 // SIMHASH_BANDS
+        for band in range(SIMHASH_BANDS):
+            yield band, (value >> (band * width)) & ((1 << width) - 1)
+
+    def add(self, key: str, value: int) -> None:
+        for band in self._bands(value):
+            self._buckets.setdefault(band, []).append((value, key))
+
+    def find(self, value: int, exclude: str | None = None) -> str | None:
+        for band in self._bands(value):
+            for other, key in self._buckets.get(band, ()):
+                if key != exclude and (value ^ other).bit_count() <= SIMHASH_MAX_DISTANCE:
+                    return key
+        return None
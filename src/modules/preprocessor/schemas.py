@@ -1,19 +1,64 @@
-from datetime import datetime
+from typing import Annotated
 
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, PlainSerializer
 
 from src.modules.scraper.schemas import ScrapedArticle
 
+# NumPy columns; plain lists in JSON (the pipeline's stage files)
+Int32Array = Annotated[
+    np.ndarray,
+    BeforeValidator(lambda value: np.asarray(value, dtype=np.int32)),
+    PlainSerializer(lambda array: array.tolist(), return_type=list[int], when_used="json"),
+]
+Float32Matrix = Annotated[
+    np.ndarray,
+    BeforeValidator(lambda value: np.asarray(value, dtype=np.float32)),
+    PlainSerializer(lambda array: array.tolist(), return_type=list[list[float]], when_used="json"),
+]
 
-class ProcessedChunk(BaseModel):
-    content: str
-    title: str
-    url: str
-    category: str | None = None
-    publication_date: datetime | None = None
-    chunk_index: int
+
+def _empty() -> np.ndarray:
+    return np.empty(0, dtype=np.int32)
+
+
+class ChunkBatch(BaseModel):
+    """The chunks of `PreprocessResult.articles`, column by column.
+
+    Row i is chunk `chunk_index[i]` of `articles[article[i]]`. Each article's
+    rows are contiguous and follow article order. `embeddings` is one
+    (rows × dim) float32 array, filled in by the embedder.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    texts: list[str] = []  # as embedded, with the "Title: " prefix
+    article: Int32Array = Field(default_factory=_empty)
+    chunk_index: Int32Array = Field(default_factory=_empty)
+    # Span of the chunk text (without the title prefix) in the cleaned document content
+    start_char: Int32Array = Field(default_factory=_empty)
+    end_char: Int32Array = Field(default_factory=_empty)
+    embeddings: Float32Matrix | None = None
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def article_bounds(self, n_articles: int) -> np.ndarray:
+        """Rows of article i are `bounds[i]:bounds[i + 1]`."""
+        return np.searchsorted(self.article, np.arange(n_articles + 1))
+
+
+class DedupStats(BaseModel):
+    duplicate_articles: int = 0
+    boilerplate_chunks: int = 0
+    skipped_chunks: int = 0  # chunks neither embedded nor stored
+    skipped_bytes: int = 0  # chunk text plus vector storage avoided
 
 
 class PreprocessResult(BaseModel):
     articles: list[ScrapedArticle]
-    chunks: list[ProcessedChunk]
+    chunks: ChunkBatch
+    truncated_chunks: int = 0  # chunks longer than the embedding model's window
+    signatures: dict[str, list[int]] = {}  # article URL → MinHash signature
+    duplicates: dict[str, str] = {}  # duplicate article URL → canonical article URL
+    dedup: DedupStats = DedupStats()
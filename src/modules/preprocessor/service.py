@@ -1,94 +1,253 @@
+import asyncio
 import html
 import logging
+import multiprocessing
 import re
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langdetect import detect
+from langdetect import DetectorFactory, detect
 from langdetect.lang_detect_exception import LangDetectException
 
-from src.modules.preprocessor.composer import PreprocessorComposer
-from src.modules.preprocessor.schemas import PreprocessResult, ProcessedChunk
+from src.config.settings import settings
+from src.modules.metrics.service import metrics_service
+from src.modules.preprocessor.chunker import TextChunk, TokenChunker
+from src.modules.preprocessor.dedup import (
+    VECTOR_BYTES,
+    MinHashIndex,
+    SimHashIndex,
+    minhash,
+    simhash,
+)
+from src.modules.preprocessor.schemas import ChunkBatch, DedupStats, PreprocessResult
+from src.modules.profiling.service import profiler_service, start_worker_sampler
 from src.modules.scraper.schemas import ScrapedArticle
 
 logger = logging.getLogger(__name__)
 
-CHUNK_SIZE = 1000
-CHUNK_OVERLAP = 150
 MIN_CONTENT_LENGTH = 50
+BATCH_SIZE = 32  # articles per process-pool task
+
+# Language check: decide from English stopwords when clear-cut, fall back to a
+# seeded langdetect; both only look at a bounded sample of the text
+LANG_SAMPLE_CHARS = 2000
+MIN_SAMPLE_WORDS = 30  # fewer words than this: too few for the stopword ratio
+EN_STOPWORD_RATIO = 0.25  # at or above: English
+NON_EN_STOPWORD_RATIO = 0.05  # at or below: not English
+EN_STOPWORDS = frozenset(
+    "the of and to in a is that for it on with as was by be are this at from "
+    "has have an or its not which will their been were more also".split()
+)
+
+_PUNCTUATION = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"', "\u2013": "-", "\u2014": "-",
+})
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"[a-z]+")
+
+DetectorFactory.seed = 0  # langdetect is randomized; seed it for stable results
+_chunker: TokenChunker | None = None  # loaded once per process
+
+_chunk_tokens = metrics_service.histogram(
+    "preprocess_chunk_tokens", "Tokens per chunk as embedded, prefix and special tokens included",
+    buckets=(32, 64, 128, 192, 256, 384, 512),
+)
+_truncated = metrics_service.counter(
+    "preprocess_truncated_chunks_total", "Chunks longer than the embedding model's window"
+)
+_dedup_skipped = metrics_service.counter(
+    "preprocess_dedup_skipped_chunks_total", "Chunks not embedded because they were near-duplicates"
+)
+
+# (title, content) in; (title, content, chunks, MinHash, chunk SimHashes) out,
+# or a skip reason. Signatures are empty when dedup is off.
+ArticleText = tuple[str, str]
+ProcessedText = tuple[str, str, list[TextChunk], list[int], list[int]] | str
+
+
+def _get_chunker() -> TokenChunker:
+    global _chunker
+    if _chunker is None:
+        _chunker = TokenChunker.from_pretrained()
+    return _chunker
+
+
+def _clean_text(text: str) -> str:
+    text = _WHITESPACE.sub(" ", html.unescape(text)).strip()
+    return unicodedata.normalize("NFKD", text).translate(_PUNCTUATION)
+
+
+def _language(content: str) -> str:
+    sample = content[:LANG_SAMPLE_CHARS]
+    words = _WORD.findall(sample.lower())
+    if len(words) >= MIN_SAMPLE_WORDS:
+        ratio = sum(word in EN_STOPWORDS for word in words) / len(words)
+        if ratio >= EN_STOPWORD_RATIO:
+            return "en"
+        if ratio <= NON_EN_STOPWORD_RATIO:
+            return "other"
+    return detect(sample)
+
+
+def _process(title: str, content: str, dedup: bool) -> ProcessedText:
+    """Clean, normalize, filter, split and sign one article in a single pass."""
+    content = _clean_text(content)
+    if len(content) < MIN_CONTENT_LENGTH:
+        return "too short"
+    try:
+        lang = _language(content)
+    except LangDetectException:
+        return "language detection failed"
+    if lang != "en":
+        return f"lang={lang}"
+    title = unicodedata.normalize("NFKD", html.unescape(title).strip())
+    splits = _get_chunker().split(content, prefix=f"{title}: ")
+    if not dedup:
+        return title, content, splits, [], []
+    return title, content, splits, minhash(content), [simhash(chunk.text) for chunk in splits]
+
+
+def _process_batch(batch: list[ArticleText], dedup: bool) -> list[ProcessedText]:
+    return [_process(title, content, dedup) for title, content in batch]
 
 
 class PreprocessorService:
-    def __init__(self) -> None:
-        self._composer = PreprocessorComposer()
-        self._composer.add_step("clean", self._clean)
-        self._composer.add_step("normalize", self._normalize)
-        self._composer.add_step("filter_language", self._filter_language)
-        self._splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP,
+    def __init__(
+        self,
+        workers: int | None = settings.preprocess_workers,
+        dedup: bool = settings.preprocess_dedup,
+    ) -> None:
+        self._workers = workers
+        self._dedup = dedup
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the parent may hold torch threads and DB connections
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=start_worker_sampler,
+                initargs=profiler_service.worker_initargs(),
+            )
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    async def _run(self, texts: list[ArticleText]) -> list[ProcessedText]:
+        batches = [texts[i : i + BATCH_SIZE] for i in range(0, len(texts), BATCH_SIZE)]
+        if len(batches) <= 1 or self._workers == 1:
+            # Not worth the pool's start-up cost; keep it off the event loop anyway
+            return await asyncio.to_thread(_process_batch, texts, self._dedup)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(pool, _process_batch, batch, self._dedup) for batch in batches)
         )
+        return [item for batch in results for item in batch]
 
-    async def _clean(self, articles: list[ScrapedArticle]) -> list[ScrapedArticle]:
-        cleaned: list[ScrapedArticle] = []
-        for article in articles:
-            content = html.unescape(article.content)
-            content = re.sub(r"\s+", " ", content).strip()
-            title = html.unescape(article.title).strip()
-            cleaned.append(article.model_copy(update={"content": content, "title": title}))
-        return cleaned
-
-    async def _normalize(self, articles: list[ScrapedArticle]) -> list[ScrapedArticle]:
-        normalized: list[ScrapedArticle] = []
-        for article in articles:
-            content = unicodedata.normalize("NFKD", article.content)
-            content = content.replace("\u2018", "'").replace("\u2019", "'")
-            content = content.replace("\u201c", '"').replace("\u201d", '"')
-            content = content.replace("\u2013", "-").replace("\u2014", "-")
-            title = unicodedata.normalize("NFKD", article.title)
-            normalized.append(article.model_copy(update={"content": content, "title": title}))
-        return normalized
-
-    async def _filter_language(self, articles: list[ScrapedArticle]) -> list[ScrapedArticle]:
-        filtered: list[ScrapedArticle] = []
-        for article in articles:
-            if len(article.content) < MIN_CONTENT_LENGTH:
-                logger.info("Skipped (too short): %s", article.title)
-                continue
-            try:
-                lang = detect(article.content)
-            except LangDetectException:
-                logger.warning("Language detection failed: %s", article.title)
-                continue
-            if lang != "en":
-                logger.info("Skipped (lang=%s): %s", lang, article.title)
+    async def preprocess(
+        self,
+        articles: list[ScrapedArticle],
+        known_signatures: dict[str, list[int]] | None = None,
+    ) -> PreprocessResult:
+        """Preprocess `articles`, linking near-duplicates of each other or of
+        `known_signatures` (URL → MinHash of stored canonical documents)."""
+        results = await self._run([(article.title, article.content) for article in articles])
+
+        documents = MinHashIndex()
+        for url, signature in (known_signatures or {}).items():
+            documents.add(url, signature)
+        paragraphs = SimHashIndex()
+
+        kept: list[ScrapedArticle] = []
+        # Chunk columns, see ChunkBatch
+        texts: list[str] = []
+        article_rows: list[int] = []
+        chunk_indexes: list[int] = []
+        starts: list[int] = []
+        ends: list[int] = []
+        signatures: dict[str, list[int]] = {}
+        duplicates: dict[str, str] = {}
+        stats = DedupStats()
+        truncated = 0
+        for article, result in zip(articles, results):
+            if isinstance(result, str):
+                logger.info("Skipped (%s): %s", result, article.title)
                 continue
-            filtered.append(article)
-        return filtered
-
-    def _chunk(self, articles: list[ScrapedArticle]) -> list[ProcessedChunk]:
-        chunks: list[ProcessedChunk] = []
-        for article in articles:
-            prefix = f"{article.title}: "
-            splits = self._splitter.split_text(article.content)
-            for i, text in enumerate(splits):
-                chunks.append(
-                    ProcessedChunk(
-                        content=prefix + text,
-                        title=article.title,
-                        url=article.url,
-                        category=article.category,
-                        publication_date=article.publication_date,
-                        chunk_index=i,
-                    )
-                )
-        return chunks
-
-    async def preprocess(self, articles: list[ScrapedArticle]) -> PreprocessResult:
-        cleaned = await self._composer.run(articles)
-        chunks = self._chunk(cleaned)
-        logger.info("Preprocessing complete: %d chunks from %d articles", len(chunks), len(cleaned))
-        return PreprocessResult(articles=cleaned, chunks=chunks)
+            title, content, splits, signature, chunk_hashes = result
+            article = article.model_copy(update={"title": title, "content": content})
+            kept.append(article)
+            if not self._dedup:
+                chunk_hashes = [None] * len(splits)
+            else:
+                signatures[article.url] = signature
+                canonical = documents.find(signature, exclude=article.url)
+                if canonical is not None:
+                    # Stored for reference, but its chunks are never embedded
+                    duplicates[article.url] = canonical
+                    stats.duplicate_articles += 1
+                    stats.skipped_chunks += len(splits)
+                    stats.skipped_bytes += sum(len(c.text) for c in splits) + VECTOR_BYTES * len(splits)
+                    logger.info("Near-duplicate of %s: %s", canonical, article.url)
+                    continue
+                documents.add(article.url, signature)
+
+            prefix = f"{title}: "
+            for i, (chunk, value) in enumerate(zip(splits, chunk_hashes)):
+                if value is not None:
+                    if paragraphs.find(value, exclude=article.url) is not None:
+                        stats.boilerplate_chunks += 1
+                        stats.skipped_chunks += 1
+                        stats.skipped_bytes += len(chunk.text) + VECTOR_BYTES
+                        continue
+                    paragraphs.add(article.url, value)
+                _chunk_tokens.observe(chunk.tokens)
+                truncated += chunk.truncated
+                texts.append(prefix + chunk.text)
+                article_rows.append(len(kept) - 1)
+                chunk_indexes.append(i)
+                starts.append(chunk.start_char)
+                ends.append(chunk.end_char)
+
+        if self._dedup:
+            _dedup_skipped.inc(stats.skipped_chunks - stats.boilerplate_chunks, reason="duplicate_article")
+            _dedup_skipped.inc(stats.boilerplate_chunks, reason="boilerplate")
+            total = len(texts) + stats.skipped_chunks
+            logger.info(
+                "Dedup: %d near-duplicate articles, %d boilerplate chunks — skipped %d of %d "
+                "chunk embeddings (%.1f%%), ~%.1f MB of storage",
+                stats.duplicate_articles,
+                stats.boilerplate_chunks,
+                stats.skipped_chunks,
+                total,
+                100 * stats.skipped_chunks / total if total else 0.0,
+                stats.skipped_bytes / 1e6,
+            )
+        _truncated.inc(truncated)
+        logger.info(
+            "Preprocessing complete: %d chunks from %d articles, truncation rate %.2f%%",
+            len(texts),
+            len(kept),
+            100 * truncated / len(texts) if texts else 0.0,
+        )
+        return PreprocessResult(
+            articles=kept,
+            chunks=ChunkBatch(
+                texts=texts,
+                article=article_rows,
+                chunk_index=chunk_indexes,
+                start_char=starts,
+                end_char=ends,
+            ),
+            truncated_chunks=truncated,
+            signatures=signatures,
+            duplicates=duplicates,
+            dedup=stats,
+        )
 
 
 preprocessor_service = PreprocessorService()
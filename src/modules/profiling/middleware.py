@@ -0,0 +1,53 @@
+import random
+import secrets
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config.settings import settings
+from src.modules.profiling.service import profile_id, profiler_service
+
+# Request paths that can be profiled, and the kind their profiles are stored under
+PROFILED_PATHS = {"/api/inference/chat": "chat"}
+
+
+class ProfilingMiddleware:
+    """Profiles a request when it carries the profiling token or is sampled.
+
+    Pure ASGI, so the profile covers the whole streamed response. The profile
+    id is returned in the `X-Profile-Id` response header.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        kind = PROFILED_PATHS.get(scope["path"]) if scope["type"] == "http" else None
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if not self._requested(headers):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1") or None
+        if request_id is not None:
+            # Client-chosen ids must neither name files nor collide
+            request_id = f"{request_id}-{uuid.uuid4().hex[:8]}"
+        pid = profile_id(kind, request_id)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", pid.encode())]
+            await send(message)
+
+        async with profiler_service.profile(kind, pid):
+            await self.app(scope, receive, send_with_id)
+
+    @staticmethod
+    def _requested(headers: dict[bytes, bytes]) -> bool:
+        token = headers.get(b"x-profile-token")
+        if token is not None and settings.profiling_token:
+            return secrets.compare_digest(token, settings.profiling_token.encode())
+        return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
@@ -0,0 +1,31 @@
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from src.config.settings import settings
+from src.modules.profiling.schemas import ProfileInfo
+from src.modules.profiling.service import profiler_service
+
+router = APIRouter()
+
+
+def _authorize(token: str | None) -> None:
+    # Profiles expose code paths and timings; only the profiling token may read them
+    if not (settings.profiling_token and token and secrets.compare_digest(token, settings.profiling_token)):
+        raise HTTPException(status_code=403, detail="A valid X-Profile-Token is required")
+
+
+@router.get("", response_model=list[ProfileInfo])
+async def list_profiles(x_profile_token: str | None = Header(None)) -> list[ProfileInfo]:
+    _authorize(x_profile_token)
+    return profiler_service.list_profiles()
+
+
+@router.get("/{profile_id}")
+async def download_profile(profile_id: str, x_profile_token: str | None = Header(None)) -> FileResponse:
+    _authorize(x_profile_token)
+    path = profiler_service.get_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=path.name)
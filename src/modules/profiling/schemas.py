@@ -0,0 +1,10 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ProfileInfo(BaseModel):
+    id: str  # <kind>-<request id>, also the file name without .folded
+    kind: str  # "chat" or "pipeline"
+    created_at: datetime
+    size_bytes: int
@@ -0,0 +1,267 @@
+"""Opt-in sampling profiler that writes flame-graph folded stacks.
+
+While at least one profile is active, a daemon thread samples the Python
+stack of every thread in the process at a fixed interval. Each profile
+aggregates the samples taken during its lifetime and is written to
+`<profile id>.folded` in the format flamegraph.pl, speedscope and inferno
+read. Threads blocked waiting for work are skipped, so the graph shows where
+time is spent rather than where threads sleep. No thread runs and nothing is
+sampled while no profile is active.
+
+Process pools that start their workers with `start_worker_sampler` are
+sampled too: each worker samples itself while the parent has a profile active
+and sends its folded stacks back, rooted at the worker's process name.
+
+Profiles are process-wide, not per request: every active profile receives
+every sample, so a chat profile also shows the requests and pipeline work
+that ran alongside it.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from types import CodeType, FrameType
+
+from src.config.settings import settings
+from src.modules.metrics.service import metrics_service
+from src.modules.profiling.schemas import ProfileInfo
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".folded"
+MAX_DEPTH = 128
+WORKER_FLUSH_SECONDS = 0.25  # how often pool workers send their samples to the parent
+_ROOT = str(Path(__file__).resolve().parents[3]) + "/"
+_VALID_ID = re.compile(r"[A-Za-z0-9_.-]{1,96}")
+_LIB_PREFIX = re.compile(r"^.*/(?:site-packages|lib/python3\.\d+)/")
+
+# Leaf frames of threads parked waiting for work (executor workers, the event
+# loop's selector, queue and condition waits)
+_IDLE = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("queues.py", "get"),  # process pool workers waiting for a task
+    ("connection.py", "_recv"),
+}
+
+_captured = metrics_service.counter(
+    "profiles_captured_total", "Sampling profiles written, by kind"
+)
+
+
+def profile_id(kind: str, request_id: str | None = None) -> str:
+    """`<kind>-<request id>`, with a fresh id when the given one is unusable."""
+    if request_id is None or not _VALID_ID.fullmatch(request_id):
+        request_id = uuid.uuid4().hex
+    return f"{kind}-{request_id}"
+
+
+class Profile:
+    def __init__(self, profile_id: str, kind: str) -> None:
+        self.id = profile_id
+        self.kind = kind
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.duration = 0.0
+
+
+class ProfilerService:
+    def __init__(self, directory: str, interval: float, keep: int) -> None:
+        self._directory = Path(directory)
+        self._interval = interval
+        self._keep = keep
+        self._lock = threading.Lock()
+        self._active: set[Profile] = set()
+        self._thread: threading.Thread | None = None
+        self._labels: dict[CodeType, str] = {}
+        # Set up once a process pool asks for them (see worker_initargs)
+        self._worker_switch = None
+        self._worker_stacks = None
+
+    # ── Sampling ────────────────────────────────────────────────
+
+    def start(self, kind: str, profile_id: str) -> Profile:
+        profile = Profile(profile_id, kind)
+        with self._lock:
+            self._active.add(profile)
+            if self._worker_switch is not None:
+                self._worker_switch.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def stop(self, profile: Profile) -> None:
+        profile.duration = time.perf_counter() - profile.started
+        with self._lock:
+            self._active.discard(profile)
+            if not self._active and self._worker_switch is not None:
+                self._worker_switch.clear()
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while True:
+            time.sleep(self._interval)
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = [
+                f"{names.get(ident, ident)};{stack}"
+                for ident, frame in sys._current_frames().items()
+                if ident != own and (stack := self._fold(frame))
+            ]
+            self._collect_workers()
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                for profile in self._active:
+                    profile.samples += 1
+                    profile.stacks.update(stacks)
+
+    def _fold(self, frame: FrameType) -> str | None:
+        if (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in _IDLE:
+            return None
+        labels = []
+        while frame is not None and len(labels) < MAX_DEPTH:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = _LIB_PREFIX.sub("", code.co_filename.removeprefix(_ROOT))
+            label = f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ",")
+            self._labels[code] = label
+        return label
+
+    # ── Worker processes ────────────────────────────────────────
+
+    def worker_initargs(self) -> tuple:
+        """Arguments for `start_worker_sampler` in a spawned pool's initializer."""
+        with self._lock:
+            if self._worker_switch is None:
+                context = multiprocessing.get_context("spawn")
+                self._worker_switch = context.Event()
+                self._worker_stacks = context.Queue()
+                if self._active:
+                    self._worker_switch.set()
+            return self._worker_switch, self._worker_stacks
+
+    def _collect_workers(self, ended: Profile | None = None) -> None:
+        """Add the stacks sent by pool workers to the active profiles, and to
+        `ended`, a profile just stopped whose last worker samples are due."""
+        if self._worker_stacks is None:
+            return
+        while True:
+            try:
+                stacks = self._worker_stacks.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                for profile in self._active | ({ended} if ended else set()):
+                    profile.stacks.update(stacks)
+
+    def _sample_worker(self, switch, stacks) -> None:
+        """Runs in a pool worker: sample it while the parent profiles."""
+        own = threading.get_ident()
+        process = multiprocessing.current_process().name
+        while True:
+            switch.wait()
+            samples: Counter[str] = Counter()
+            flushed = time.monotonic()
+            while switch.is_set():
+                time.sleep(self._interval)
+                for ident, frame in sys._current_frames().items():
+                    if ident != own and (stack := self._fold(frame)):
+                        samples[f"{process};{stack}"] += 1
+                if samples and time.monotonic() - flushed >= WORKER_FLUSH_SECONDS:
+                    stacks.put(samples)
+                    samples, flushed = Counter(), time.monotonic()
+            if samples:
+                stacks.put(samples)
+
+    @asynccontextmanager
+    async def profile(self, kind: str, profile_id: str):
+        """Sample for the duration of the block and write the profile afterwards."""
+        profile = self.start(kind, profile_id)
+        try:
+            yield profile
+        finally:
+            self.stop(profile)
+            await asyncio.to_thread(self._save, profile)
+
+    # ── Storage ─────────────────────────────────────────────────
+
+    def _save(self, profile: Profile) -> None:
+        if self._worker_stacks is not None:
+            # Workers send what they sampled at most WORKER_FLUSH_SECONDS later
+            time.sleep(WORKER_FLUSH_SECONDS)
+            self._collect_workers(ended=profile)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._directory / f"{profile.id}{PROFILE_SUFFIX}"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in sorted(profile.stacks.items())))
+        _captured.inc(kind=profile.kind)
+        logger.info(
+            "Profile %s: %.2fs, %d samples → %s", profile.id, profile.duration, profile.samples, path
+        )
+        for old in self._files()[self._keep :]:
+            old.unlink(missing_ok=True)
+
+    def _files(self) -> list[Path]:
+        """Stored profiles, newest first."""
+        if not self._directory.is_dir():
+            return []
+        files = []
+        for path in self._directory.glob(f"*{PROFILE_SUFFIX}"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:  # pruned by another worker meanwhile
+                continue
+        return [path for _, path in sorted(files, reverse=True)]
+
+    def list_profiles(self) -> list[ProfileInfo]:
+        profiles = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            profiles.append(ProfileInfo(
+                id=path.stem,
+                kind=path.stem.split("-", 1)[0],
+                created_at=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+                size_bytes=stat.st_size,
+            ))
+        return profiles
+
+    def get_path(self, profile_id: str) -> Path | None:
+        if not _VALID_ID.fullmatch(profile_id):
+            return None
+        path = self._directory / f"{profile_id}{PROFILE_SUFFIX}"
+        return path if path.is_file() else None
+
+
+profiler_service = ProfilerService(
+    settings.profiling_dir, settings.profiling_interval, settings.profiling_keep
+)
+
+
+def start_worker_sampler(switch, stacks) -> None:
+    """Process pool initializer (or part of one) that lets the parent's
+    profiles sample this worker; pass `profiler_service.worker_initargs()`."""
+    threading.Thread(
+        target=profiler_service._sample_worker, args=(switch, stacks), name="profiler", daemon=True
+    ).start()
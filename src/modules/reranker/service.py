@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from src.config.settings import settings
+from src.modules.metrics.service import metrics_service
+from src.modules.persistence.schemas import SearchResult
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder
+
+logger = logging.getLogger(__name__)
+
+MAX_LENGTH = 512  # tokens per (query, chunk) pair
+PREDICT_BATCH_SIZE = 32  # pairs per forward pass, bounds memory for large batch requests
+LOAD_RETRY_SECONDS = 300.0  # after a failed model load, requests skip reranking this long
+WARM_UP_PAIRS = [("warm-up", "warm-up")] * 8
+
+_seconds = metrics_service.histogram(
+    "rerank_seconds", "Time to rerank the candidates of one request, including cache lookups"
+)
+_pairs = metrics_service.counter(
+    "rerank_pairs_total", "Query-chunk pairs reranked, by result (cached, scored)"
+)
+_failures = metrics_service.counter(
+    "rerank_failures_total", "Rerank calls that fell back to vector order"
+)
+
+
+def _pair_key(query: str, chunk: str) -> bytes:
+    digest = hashlib.blake2b(query.encode(), digest_size=16)
+    digest.update(b"\0")
+    digest.update(chunk.encode())
+    return digest.digest()
+
+
+class RerankerService:
+    """Reorders search candidates by a CPU cross-encoder's relevance score.
+
+    Scores are cached per (query text, chunk text), so a repeated question or
+    a chunk already scored for it skips the model. When the model cannot be
+    loaded or fails, candidates keep their vector-search order.
+    """
+
+    def __init__(self, model_name: str, cache_size: int) -> None:
+        self._model_name = model_name
+        self._model: "CrossEncoder | None" = None
+        self._load_lock = threading.Lock()
+        self._load_failed_at: float | None = None
+        self._cache_size = cache_size
+        self._scores: OrderedDict[bytes, float] = OrderedDict()
+
+    @property
+    def model(self) -> "CrossEncoder":
+        # Imported and loaded on first use, like the embedder
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    failed_at = self._load_failed_at
+                    if failed_at is not None and time.monotonic() - failed_at < LOAD_RETRY_SECONDS:
+                        raise RuntimeError(f"Rerank model {self._model_name} failed to load recently")
+                    from sentence_transformers import CrossEncoder
+
+                    start = time.perf_counter()
+                    try:
+                        self._model = CrossEncoder(self._model_name, device="cpu", max_length=MAX_LENGTH)
+                    except Exception:
+                        self._load_failed_at = time.monotonic()
+                        raise
+                    logger.info(
+                        "Loaded rerank model %s in %.1fs",
+                        self._model_name,
+                        time.perf_counter() - start,
+                    )
+        return self._model
+
+    async def warm_up(self) -> None:
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._predict, WARM_UP_PAIRS)
+        except Exception:
+            logger.exception("Reranker warm-up failed")
+            return
+        logger.info("Reranker warm-up finished in %.1fs", time.perf_counter() - start)
+
+    def _predict(self, pairs: list[tuple[str, str]]) -> list[float]:
+        return self.model.predict(pairs, batch_size=PREDICT_BATCH_SIZE, show_progress_bar=False).tolist()
+
+    async def rerank(self, query: str, candidates: list[SearchResult], limit: int) -> list[SearchResult]:
+        return (await self.rerank_batch([query], [candidates], limit))[0]
+
+    async def rerank_batch(
+        self, queries: list[str], candidates: list[list[SearchResult]], limit: int
+    ) -> list[list[SearchResult]]:
+        """The `limit` best candidates per query, best first. Every uncached
+        pair of the batch is scored in one model call, PREDICT_BATCH_SIZE
+        pairs per forward pass."""
+        start = time.perf_counter()
+        keys = [[_pair_key(q, c.chunk_content) for c in cands] for q, cands in zip(queries, candidates)]
+        # Taken out of the cache before the model call, which other requests
+        # may use to evict them
+        scores: dict[bytes, float] = {}
+        missing: dict[bytes, tuple[str, str]] = {}
+        for query, cands, cand_keys in zip(queries, candidates, keys):
+            for candidate, key in zip(cands, cand_keys):
+                if key in self._scores:
+                    scores[key] = self._scores[key]
+                else:
+                    missing[key] = (query, candidate.chunk_content)
+        cached = len(scores)
+        if missing:
+            try:
+                predicted = await asyncio.to_thread(self._predict, list(missing.values()))
+            except Exception:
+                logger.exception("Reranking failed; keeping vector search order")
+                _failures.inc()
+                return [cands[:limit] for cands in candidates]
+            scores.update(zip(missing, predicted))
+
+        for key, score in scores.items():
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+        while len(self._scores) > self._cache_size:
+            self._scores.popitem(last=False)
+
+        ranked = []
+        for cands, cand_keys in zip(candidates, keys):
+            order = sorted(range(len(cands)), key=lambda i: scores[cand_keys[i]], reverse=True)
+            ranked.append([cands[i] for i in order[:limit]])
+
+        _pairs.inc(cached, result="cached")
+        _pairs.inc(len(missing), result="scored")
+        _seconds.observe(time.perf_counter() - start)
+        return ranked
+
+
+reranker_service = RerankerService(settings.rerank_model, settings.rerank_cache_size)
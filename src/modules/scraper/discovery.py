@@ -0,0 +1,310 @@
+"""Article discovery: which articles exist in a date window.
+
+Sources are tried in order and the first one that can cover the whole window
+wins:
+
+- `FeedSource`: RSS 2.0 / Atom feeds, one request each. A feed only holds
+  recent items, so it cannot serve a window starting before its oldest item.
+- `SitemapSource`: the XML sitemap. `lastmod` only selects what to fetch:
+  child sitemaps and pages unchanged since the window start are skipped. An
+  edit also bumps `lastmod`, so items are undated; the article page provides
+  the publication date (see ScraperService.scrape).
+- `ListingSource`: the paginated news listing, one HTML page per
+  `ITEMS_PER_PAGE` items. It always works and is the fallback.
+"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from src.config.settings import settings
+from src.modules.metrics.service import metrics_service
+from src.modules.scraper.schemas import ArticleListItem
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://commission.europa.eu"
+NEWS_PATH = "/news-and-media/news_en"
+ITEMS_PER_PAGE = 10
+LISTING_DATE_FORMAT = "%d %B %Y"  # as on listing cards, see ScraperService._parse_date
+
+Fetch = Callable[[str], Awaitable[str]]
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+_discovered = metrics_service.counter(
+    "scraper_discovered_items_total", "Articles found by discovery, by source"
+)
+_requests = metrics_service.counter(
+    "scraper_discovery_requests_total", "Requests made to discover articles, by source"
+)
+
+
+class DiscoveryUnavailable(Exception):
+    """The source cannot cover the requested window; try the next one."""
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Windows and listing dates are naive; feeds and sitemaps carry offsets
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _parse_iso(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return _naive_utc(datetime.fromisoformat(value.strip().replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def _item(title: str, url: str, summary: str, published: datetime | None) -> ArticleListItem:
+    return ArticleListItem(
+        title=title,
+        url=url,
+        summary=summary,
+        publication_date=published.strftime(LISTING_DATE_FORMAT) if published else "",
+    )
+
+
+def _parse_xml(text: str) -> etree._Element:
+    try:
+        return etree.fromstring(text.encode(), parser=etree.XMLParser(resolve_entities=False, no_network=True))
+    except etree.XMLSyntaxError as exc:
+        raise DiscoveryUnavailable(f"invalid XML: {exc}") from None
+
+
+class DiscoverySource(ABC):
+    name: str
+
+    @abstractmethod
+    async def discover(
+        self, fetch: Fetch, date_from: datetime, date_to: datetime | None
+    ) -> list[ArticleListItem]:
+        """Articles published in (date_from, date_to]; raises DiscoveryUnavailable."""
+
+
+class FeedSource(DiscoverySource):
+    name = "feed"
+
+    def __init__(self, urls: list[str]) -> None:
+        self._urls = urls
+
+    async def discover(self, fetch, date_from, date_to):
+        if not self._urls:
+            raise DiscoveryUnavailable("no feeds configured")
+        items: list[tuple[ArticleListItem, datetime | None]] = []
+        for url in self._urls:
+            feed = await fetch(url)
+            entries = self._parse(_parse_xml(feed))
+            dates = [published for _, published in entries if published is not None]
+            # A feed whose oldest item is inside the window may have dropped older ones
+            if not dates or min(dates) > date_from:
+                raise DiscoveryUnavailable(f"{url} does not reach back to {date_from.date()}")
+            items.extend(entries)
+        return [
+            item for item, published in items
+            if published is None or (published > date_from and (date_to is None or published <= date_to))
+        ]
+
+    @staticmethod
+    def _parse(root: etree._Element) -> list[tuple[ArticleListItem, datetime | None]]:
+        entries = []
+        for node in root.iter("item"):  # RSS 2.0
+            published = node.findtext("pubDate")
+            try:
+                date = _naive_utc(parsedate_to_datetime(published)) if published else None
+            except (TypeError, ValueError):
+                date = None
+            link = (node.findtext("link") or "").strip()
+            if link:
+                summary = node.findtext("category") or ""
+                entries.append((_item((node.findtext("title") or "").strip(), link, summary, date), date))
+        for node in root.iter(f"{_ATOM}entry"):
+            link = node.find(f"{_ATOM}link[@rel='alternate']")
+            if link is None:
+                link = node.find(f"{_ATOM}link")
+            if link is None or not link.get("href"):
+                continue
+            date = _parse_iso(node.findtext(f"{_ATOM}published") or node.findtext(f"{_ATOM}updated"))
+            category = node.find(f"{_ATOM}category")
+            summary = category.get("term", "") if category is not None else ""
+            title = (node.findtext(f"{_ATOM}title") or "").strip()
+            entries.append((_item(title, link.get("href"), summary, date), date))
+        return entries
+
+
+class SitemapSource(DiscoverySource):
+    name = "sitemap"
+
+    def __init__(self, url: str | None, pattern: str) -> None:
+        self._url = url
+        self._pattern = re.compile(pattern)
+
+    async def discover(self, fetch, date_from, date_to):
+        if not self._url:
+            raise DiscoveryUnavailable("no sitemap configured")
+        items: list[ArticleListItem] = []
+        pending = [self._url]
+        while pending:
+            root = _parse_xml(await fetch(pending.pop(0)))
+            if root.tag == f"{_SITEMAP}sitemapindex":
+                for sitemap in root.iter(f"{_SITEMAP}sitemap"):
+                    lastmod = _parse_iso(sitemap.findtext(f"{_SITEMAP}lastmod"))
+                    # Nothing in a child sitemap unchanged since before the window is new
+                    if lastmod is None or lastmod > date_from:
+                        pending.append(sitemap.findtext(f"{_SITEMAP}loc").strip())
+                continue
+            for node in root.iter(f"{_SITEMAP}url"):
+                url = (node.findtext(f"{_SITEMAP}loc") or "").strip()
+                lastmod = _parse_iso(node.findtext(f"{_SITEMAP}lastmod"))
+                if lastmod is None:
+                    raise DiscoveryUnavailable("sitemap entries carry no lastmod")
+                # Not filtered on date_to: a page edited since may have been
+                # published inside the window
+                if not self._pattern.search(url) or lastmod <= date_from:
+                    continue
+                # The article page provides the real title, type and date
+                slug = url.rstrip("/").rsplit("/", 1)[-1].removesuffix("_en")
+                items.append(_item(slug.replace("-", " "), url, "", None))
+        return items
+
+
+class ListingSource(DiscoverySource):
+    name = "listing"
+
+    async def discover(self, fetch, date_from, date_to):
+        first_html = await fetch(self._build_listing_url(date_from, page=0))
+        total_pages = self._detect_total_pages(first_html)
+        logger.info("Detected %d listing pages", total_pages)
+
+        items = self._parse_listing_page(first_html)
+        for page in range(1, total_pages):
+            try:
+                items.extend(self._parse_listing_page(await fetch(self._build_listing_url(date_from, page))))
+            except Exception:
+                logger.exception("Failed listing page %d", page)
+
+        # The listing only filters on the lower bound; apply the upper one here
+        if date_to is not None:
+            items = [item for item in items if not self._after(item.publication_date, date_to)]
+        return items
+
+    @staticmethod
+    def _after(date_raw: str, date_to: datetime) -> bool:
+        try:
+            return datetime.strptime(date_raw, LISTING_DATE_FORMAT) > date_to
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _build_listing_url(date_from: datetime, page: int) -> str:
+        date_str = date_from.strftime("%Y-%m-%dT%H:%M:%S+01:00")
+        filter_value = f"oe_news_publication_date:gt|{date_str}"
+        return f"{BASE_URL}{NEWS_PATH}?f[0]={quote(filter_value)}&page={page}"
+
+    @staticmethod
+    def _parse_listing_page(html: str) -> list[ArticleListItem]:
+        soup = BeautifulSoup(html, "lxml")
+        articles: list[ArticleListItem] = []
+
+        for block in soup.select(".ecl-content-block"):
+            title_el = block.select_one(".ecl-content-block__title")
+            if not title_el:
+                continue
+            link_el = title_el.select_one("a")
+            if not link_el:
+                continue
+
+            # Skip non-article blocks (no metadata = navigation element)
+            meta_items = block.select(".ecl-content-block__primary-meta-item")
+            if len(meta_items) < 2:
+                continue
+
+            href = link_el.get("href", "")
+            if href and not href.startswith("http"):
+                href = f"{BASE_URL}{href}"
+
+            category = meta_items[0].get_text(strip=True)
+            date_raw = meta_items[1].get_text(strip=True)
+
+            articles.append(
+                ArticleListItem(
+                    title=link_el.get_text(strip=True),
+                    url=str(href),
+                    summary=category,
+                    publication_date=date_raw,
+                )
+            )
+        return articles
+
+    @staticmethod
+    def _detect_total_pages(html: str) -> int:
+        soup = BeautifulSoup(html, "lxml")
+        max_page = 0
+        for link in soup.select(".ecl-pagination__item a"):
+            href = link.get("href", "")
+            match = re.search(r"page=(\d+)", href)
+            if match:
+                max_page = max(max_page, int(match.group(1)))
+        if max_page > 0:
+            return max_page + 1  # zero-based → count
+        # Fallback: count items on first page and assume single page
+        items = soup.select(".ecl-content-block")
+        return 1 if items else 0
+
+
+SOURCES: dict[str, Callable[[], DiscoverySource]] = {
+    "feed": lambda: FeedSource(settings.scraper_feed_urls),
+    "sitemap": lambda: SitemapSource(settings.scraper_sitemap_url, settings.scraper_sitemap_pattern),
+    "listing": ListingSource,
+}
+
+
+class ArticleDiscovery:
+    """Runs the configured sources in order until one covers the window."""
+
+    def __init__(self, sources: list[DiscoverySource] | None = None) -> None:
+        self._sources = sources or [SOURCES[name]() for name in settings.scraper_discovery_sources]
+
+    async def discover(
+        self, fetch: Fetch, date_from: datetime, date_to: datetime | None = None
+    ) -> list[ArticleListItem]:
+        for source in self._sources:
+            requests = 0
+
+            async def counted(url: str) -> str:
+                nonlocal requests
+                requests += 1
+                return await fetch(url)
+
+            try:
+                items = await source.discover(counted, date_from, date_to)
+            except DiscoveryUnavailable as exc:
+                logger.info("Discovery via %s unavailable: %s", source.name, exc)
+                continue
+            except Exception:
+                logger.exception("Discovery via %s failed", source.name)
+                continue
+            finally:
+                _requests.inc(requests, source=source.name)
+
+            # Deduplicate by URL (highlighted cards and multiple feeds repeat items)
+            unique = list({item.url: item for item in reversed(items)}.values())[::-1]
+            _discovered.inc(len(unique), source=source.name)
+            logger.info(
+                "Discovered %d articles via %s in %d requests", len(unique), source.name, requests
+            )
+            return unique
+        raise RuntimeError("No discovery source could cover the window")
+
+
+article_discovery = ArticleDiscovery()
@@ -0,0 +1,131 @@
+"""Per-URL-pattern routing of article fetches.
+
+Some article URLs only yield full content from a fallback: suffix-less
+commission pages from the `_en` page, presscorner pages from the presscorner
+JSON API. Trying the page first costs an extra rate-limited request each time.
+The router learns, per route (host plus the first two path segments, and
+whether the URL has a language suffix), which source yields full content and
+puts it first. The table is saved between runs, and every
+`SCRAPER_ROUTE_VERIFY_EVERY`-th fetch on a route takes the full fallback
+chain again so the table follows changes on the site.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from src.config.settings import settings
+from src.modules.metrics.service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+PAGE = "page"
+PAGE_EN = "page_en"
+PRESSCORNER_API = "presscorner_api"
+
+MIN_CONTENT_CHARS = 300  # shorter content means the source did not have the article
+MIN_SAMPLES = 5  # before a source can be routed to directly
+MIN_SUCCESS_RATE = 0.8
+SMOOTHING = 0.2  # weight of the newest outcome in a source's success rate
+
+_fetches = metrics_service.counter(
+    "scraper_route_fetches_total", "Article fetch attempts by route, source and outcome"
+)
+_saved = metrics_service.counter(
+    "scraper_route_requests_saved_total", "Requests saved by fetching from the learned source first"
+)
+_success_rate = metrics_service.gauge(
+    "scraper_route_success_rate", "Smoothed share of fetches yielding full content, by route and source"
+)
+
+
+def has_language_suffix(url: str) -> bool:
+    return re.search(r"_[a-z]{2}$", url) is not None
+
+
+def fallback_chain(url: str) -> list[str]:
+    """Sources in the order they are tried without any routing knowledge."""
+    if "presscorner" in url:
+        return [PAGE, PRESSCORNER_API]
+    if not has_language_suffix(url):
+        # Pages without _en redirect to a language picker with no content
+        return [PAGE, PAGE_EN]
+    return [PAGE]
+
+
+def route_key(url: str) -> str:
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split("/") if s][:2]
+    suffix = "" if has_language_suffix(url) else " (no suffix)"
+    return f"{parts.netloc}/{'/'.join(segments)}{suffix}"
+
+
+class SourceRouter:
+    def __init__(self, path: str, verify_every: int) -> None:
+        self._path = Path(path)
+        self._verify_every = verify_every
+        # route → {"fetches": int, "sources": {source: {"rate": float, "samples": int}}}
+        self._routes: dict[str, dict] | None = None
+
+    @property
+    def routes(self) -> dict[str, dict]:
+        if self._routes is None:
+            try:
+                self._routes = json.loads(self._path.read_text())
+                logger.info("Loaded %d fetch routes from %s", len(self._routes), self._path)
+            except FileNotFoundError:
+                self._routes = {}
+            except (OSError, ValueError):
+                logger.warning("Ignoring unreadable fetch routes in %s", self._path)
+                self._routes = {}
+        return self._routes
+
+    def plan(self, url: str) -> list[str]:
+        """Sources to try for `url`, the learned one first."""
+        chain = fallback_chain(url)
+        route = self.routes.setdefault(route_key(url), {"fetches": 0, "sources": {}})
+        route["fetches"] += 1
+        if route["fetches"] % self._verify_every == 0:
+            return chain  # re-verify
+        learned = self._learned(route, chain)
+        if learned is None:
+            return chain
+        return [learned] + [source for source in chain if source != learned]
+
+    @staticmethod
+    def _learned(route: dict, chain: list[str]) -> str | None:
+        # The earliest reliable source in the chain, so a fixed page wins back over its fallback
+        for source in chain:
+            stats = route["sources"].get(source)
+            if stats and stats["samples"] >= MIN_SAMPLES and stats["rate"] >= MIN_SUCCESS_RATE:
+                return source
+        return None
+
+    def record(self, url: str, source: str, outcome: str) -> None:
+        """Record one attempt; `outcome` is "full", "short" or "error"."""
+        route = route_key(url)
+        stats = self.routes[route]["sources"].setdefault(source, {"rate": 0.0, "samples": 0})
+        success = 1.0 if outcome == "full" else 0.0
+        stats["rate"] = success if not stats["samples"] else stats["rate"] + SMOOTHING * (success - stats["rate"])
+        stats["samples"] += 1
+        _fetches.inc(route=route, source=source, outcome=outcome)
+        _success_rate.set(stats["rate"], route=route, source=source)
+
+    def record_success(self, url: str, source: str, attempts: int) -> None:
+        """Count the requests the fallback chain would have spent beyond `attempts`."""
+        saved = fallback_chain(url).index(source) + 1 - attempts
+        if saved > 0:
+            _saved.inc(saved, route=route_key(url))
+
+    def save(self) -> None:
+        if self._routes is None:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._routes, indent=2, sort_keys=True))
+        tmp.replace(self._path)
+
+
+source_router = SourceRouter(settings.scraper_routes_path, settings.scraper_route_verify_every)
@@ -2,11 +2,17 @@ import asyncio
 import logging
 import re
 from datetime import datetime
-from urllib.parse import quote
 
 import httpx
 from bs4 import BeautifulSoup
 
+from src.modules.scraper.discovery import LISTING_DATE_FORMAT, article_discovery
+from src.modules.scraper.routing import (
+    MIN_CONTENT_CHARS,
+    PAGE_EN,
+    PRESSCORNER_API,
+    source_router,
+)
 from src.modules.scraper.schemas import (
     ArticleListItem,
     ScrapedArticle,
@@ -15,9 +21,6 @@ from src.modules.scraper.schemas import (
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://commission.europa.eu"
-NEWS_PATH = "/news-and-media/news_en"
-ITEMS_PER_PAGE = 10
 MAX_CONCURRENCY = 5
 REQUEST_DELAY = 1.0
 REQUEST_TIMEOUT = 30.0
@@ -64,66 +67,8 @@ class ScraperService:
                 await asyncio.sleep(wait)
         raise last_exc  # type: ignore[misc]
 
-    # ── URL building ────────────────────────────────────────────
-
-    @staticmethod
-    def _build_listing_url(date_from: datetime, page: int) -> str:
-        date_str = date_from.strftime("%Y-%m-%dT%H:%M:%S+01:00")
-        filter_value = f"oe_news_publication_date:gt|{date_str}"
-        return f"{BASE_URL}{NEWS_PATH}?f[0]={quote(filter_value)}&page={page}"
-
     # ── Parsing layer ───────────────────────────────────────────
 
-    @staticmethod
-    def _parse_listing_page(html: str) -> list[ArticleListItem]:
-        soup = BeautifulSoup(html, "lxml")
-        articles: list[ArticleListItem] = []
-
-        for block in soup.select(".ecl-content-block"):
-            title_el = block.select_one(".ecl-content-block__title")
-            if not title_el:
-                continue
-            link_el = title_el.select_one("a")
-            if not link_el:
-                continue
-
-            # Skip non-article blocks (no metadata = navigation element)
-            meta_items = block.select(".ecl-content-block__primary-meta-item")
-            if len(meta_items) < 2:
-                continue
-
-            href = link_el.get("href", "")
-            if href and not href.startswith("http"):
-                href = f"{BASE_URL}{href}"
-
-            category = meta_items[0].get_text(strip=True)
-            date_raw = meta_items[1].get_text(strip=True)
-
-            articles.append(
-                ArticleListItem(
-                    title=link_el.get_text(strip=True),
-                    url=str(href),
-                    summary=category,
-                    publication_date=date_raw,
-                )
-            )
-        return articles
-
-    @staticmethod
-    def _detect_total_pages(html: str) -> int:
-        soup = BeautifulSoup(html, "lxml")
-        max_page = 0
-        for link in soup.select(".ecl-pagination__item a"):
-            href = link.get("href", "")
-            match = re.search(r"page=(\d+)", href)
-            if match:
-                max_page = max(max_page, int(match.group(1)))
-        if max_page > 0:
-            return max_page + 1  # zero-based → count
-        # Fallback: count items on first page and assume single page
-        items = soup.select(".ecl-content-block")
-        return 1 if items else 0
-
     @staticmethod
     def _extract_presscorner_ref(url: str) -> str | None:
         """Extract reference like 'IP/26/184' from a presscorner URL."""
@@ -164,6 +109,37 @@ class ScraperService:
             logger.warning("Presscorner API fallback failed for %s", url)
         return None
 
+    @staticmethod
+    def _parse_date(list_item: ArticleListItem) -> datetime | None:
+        if not list_item.publication_date:
+            return None
+        try:
+            return datetime.strptime(list_item.publication_date, LISTING_DATE_FORMAT)
+        except ValueError:
+            logger.warning(
+                "Could not parse date '%s' for %s",
+                list_item.publication_date, list_item.url,
+            )
+            return None
+
+    @staticmethod
+    def _page_date(soup: BeautifulSoup) -> datetime | None:
+        """Publication date from the article page's metadata or header."""
+        for attrs in ({"property": "article:published_time"}, {"name": "date"}):
+            meta = soup.find("meta", attrs=attrs)
+            if meta and meta.get("content"):
+                try:
+                    # Local wall-clock time, like the listing's dates
+                    return datetime.fromisoformat(meta["content"].strip()).replace(tzinfo=None)
+                except ValueError:
+                    pass
+        for el in soup.select(".ecl-page-header__meta-item, time"):
+            try:
+                return datetime.strptime(el.get_text(strip=True), LISTING_DATE_FORMAT)
+            except ValueError:
+                continue
+        return None
+
     @staticmethod
     def _parse_article_page(html: str, list_item: ArticleListItem) -> ScrapedArticle:
         soup = BeautifulSoup(html, "lxml")
@@ -181,18 +157,9 @@ class ScraperService:
         )
         category = breadcrumbs[-2].get_text(strip=True) if len(breadcrumbs) >= 2 else None
 
-        # Date
-        publication_date: datetime | None = None
-        if list_item.publication_date:
-            try:
-                publication_date = datetime.strptime(
-                    list_item.publication_date, "%d %B %Y"
-                )
-            except ValueError:
-                logger.warning(
-                    "Could not parse date '%s' for %s",
-                    list_item.publication_date, list_item.url,
-                )
+        # Date: the page's own, else the listing card's
+        publication_date = ScraperService._page_date(soup) or ScraperService._parse_date(list_item)
+        header_meta = [el.get_text(strip=True) for el in soup.select(".ecl-page-header__meta-item")]
 
         # Content — gather paragraphs from the main content area
         content_area = (
@@ -219,7 +186,8 @@ class ScraperService:
         return ScrapedArticle(
             title=title,
             url=list_item.url,
-            summary=list_item.summary,
+            # The content type ("News article", ...) as on listing cards
+            summary=list_item.summary or (header_meta[0] if header_meta else ""),
             category=category,
             publication_date=publication_date,
             content=content,
@@ -227,85 +195,68 @@ class ScraperService:
 
     # ── Orchestration ───────────────────────────────────────────
 
-    async def scrape(self, date_from: datetime) -> ScrapeResult:
-        all_list_items: list[ArticleListItem] = []
+    async def _fetch_from(
+        self, client: httpx.AsyncClient, source: str, item: ArticleListItem
+    ) -> ScrapedArticle:
+        """One attempt at an article from one source (see scraper.routing)."""
+        if source == PRESSCORNER_API:
+            result = await self._fetch_presscorner_content(client, item.url)
+            if result is None:
+                raise LookupError(f"presscorner API has no document for {item.url}")
+            title, content = result
+            logger.info("Presscorner API returned %s (%d chars)", item.url, len(content))
+            return ScrapedArticle(
+                title=title or item.title,
+                url=item.url,
+                summary=item.summary,
+                publication_date=self._parse_date(item),
+                content=content,
+            )
+        url = f"{item.url}_en" if source == PAGE_EN else item.url
+        html = await self._fetch(client, url)
+        return self._parse_article_page(html, item)
+
+    async def discover(
+        self, date_from: datetime, date_to: datetime | None = None
+    ) -> list[ArticleListItem]:
+        """List articles published after `date_from` and, if given, up to `date_to`."""
+        logger.info("Phase 1: discovering articles (date_from=%s)", date_from.isoformat())
+        async with httpx.AsyncClient() as client:
+            return await article_discovery.discover(
+                lambda url: self._fetch(client, url), date_from, date_to
+            )
+
+    async def fetch_articles(self, items: list[ArticleListItem]) -> ScrapeResult:
+        """Fetch and parse the article page of every discovered item."""
         articles: list[ScrapedArticle] = []
         failed = 0
         semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
 
         async with httpx.AsyncClient() as client:
-
-            # ── Phase 1: listing pages ──
-            logger.info("Phase 1: scraping listing pages (date_from=%s)", date_from.isoformat())
-
-            first_url = self._build_listing_url(date_from, page=0)
-            first_html = await self._fetch(client, first_url)
-            total_pages = self._detect_total_pages(first_html)
-            logger.info("Detected %d listing pages", total_pages)
-
-            all_list_items.extend(self._parse_listing_page(first_html))
-
-            for page in range(1, total_pages):
-                url = self._build_listing_url(date_from, page)
-                try:
-                    html = await self._fetch(client, url)
-                    all_list_items.extend(self._parse_listing_page(html))
-                except Exception:
-                    logger.exception("Failed listing page %d", page)
-
-            # Deduplicate by URL (highlighted cards appear twice)
-            seen_urls: set[str] = set()
-            unique_items: list[ArticleListItem] = []
-            for item in all_list_items:
-                if item.url not in seen_urls:
-                    seen_urls.add(item.url)
-                    unique_items.append(item)
-            logger.info(
-                "Phase 1 complete: %d raw, %d after dedup",
-                len(all_list_items), len(unique_items),
-            )
-            all_list_items = unique_items
-
-            # ── Phase 2: individual articles ──
-            logger.info("Phase 2: scraping %d individual articles", len(all_list_items))
+            logger.info("Phase 2: scraping %d individual articles", len(items))
 
             async def fetch_article(item: ArticleListItem) -> ScrapedArticle | None:
                 async with semaphore:
-                    try:
-                        html = await self._fetch(client, item.url)
-                        article = self._parse_article_page(html, item)
-
-                        # Fallback 1: language suffix — pages without _en
-                        # redirect to a language-picker with no content
-                        if (
-                            len(article.content) < 300
-                            and "presscorner" not in item.url
-                            and not re.search(r"_[a-z]{2}$", item.url)
-                        ):
-                            en_url = f"{item.url}_en"
-                            logger.info("Retrying with language suffix: %s", en_url)
-                            html = await self._fetch(client, en_url)
-                            article = self._parse_article_page(html, item)
-
-                        # Fallback 2: presscorner JSON API for SPA press pages
-                        if len(article.content) < 300 and "presscorner" in item.url:
-                            result = await self._fetch_presscorner_content(client, item.url)
-                            if result:
-                                title, content = result
-                                article.content = content
-                                if title:
-                                    article.title = title
-                                logger.info(
-                                    "Presscorner API enriched %s (%d chars)",
-                                    item.url, len(content),
-                                )
-
-                        return article
-                    except Exception:
-                        logger.exception("Failed article %s", item.url)
-                        return None
-
-            article_tasks = [fetch_article(item) for item in all_list_items]
+                    best: ScrapedArticle | None = None
+                    for attempt, source in enumerate(source_router.plan(item.url), 1):
+                        try:
+                            article = await self._fetch_from(client, source, item)
+                        except Exception:
+                            logger.warning("Fetching %s from %s failed", item.url, source, exc_info=True)
+                            source_router.record(item.url, source, "error")
+                            continue
+                        full = len(article.content) >= MIN_CONTENT_CHARS
+                        source_router.record(item.url, source, "full" if full else "short")
+                        if full:
+                            source_router.record_success(item.url, source, attempt)
+                            return article
+                        if best is None or len(article.content) > len(best.content):
+                            best = article
+                    if best is None:
+                        logger.error("Failed article %s", item.url)
+                    return best
+
+            article_tasks = [fetch_article(item) for item in items]
             article_results = await asyncio.gather(*article_tasks)
 
             for result in article_results:
@@ -319,6 +270,7 @@ class ScraperService:
                     )
                 else:
                     failed += 1
+        source_router.save()
 
         logger.info(
             "Scraping complete: %d articles scraped, %d failed",
@@ -327,5 +279,30 @@ class ScraperService:
 
         return ScrapeResult(articles=articles, total=len(articles), failed=failed)
 
+    async def scrape(self, date_from: datetime, date_to: datetime | None = None) -> ScrapeResult:
+        """Scrape articles published after `date_from` and, if given, up to `date_to`."""
+        items = await self.discover(date_from, date_to)
+        result = await self.fetch_articles(items)
+
+        # Sitemap items are picked by lastmod, so an edited older article turns
+        # up too; only its page tells when it was published. Listing and feed
+        # items were already filtered on their own dates.
+        undated = {item.url for item in items if not item.publication_date}
+        articles = [
+            article for article in result.articles
+            if article.url not in undated
+            or (
+                article.publication_date is not None
+                and article.publication_date > date_from
+                and (date_to is None or article.publication_date <= date_to)
+            )
+        ]
+        if len(articles) < len(result.articles):
+            logger.info(
+                "Dropped %d sitemap articles published outside the window or undated",
+                len(result.articles) - len(articles),
+            )
+        return ScrapeResult(articles=articles, total=len(articles), failed=result.failed)
+
 
 scraper_service = ScraperService()
@@ -99,6 +99,9 @@ messageInput.addEventListener("blur", () => {
 
 let currentConversationId = null;
 let conversations = [];
+let conversationsCursor = null;  // next page of the sidebar list
+let loadedMessages = [];  // history of the open conversation, oldest first
+let olderMessagesCursor = null;
 let sidebarOpen = false;
 let models = {};  // id -> {id, name, provider}
 let currentAbortController = null;  // for cancelling in-flight streams
@@ -247,6 +250,13 @@ function renderMarkdown(el, rawText, { streaming = false } = {}) {
 
 // ── Render sources ──
 
+function utf16Offsets(text) {
+    // Stored offsets count code points (Python); JS strings index UTF-16 units
+    const offsets = [0];
+    for (const ch of text) offsets.push(offsets[offsets.length - 1] + ch.length);
+    return offsets;
+}
+
 function highlightChunks(docContent, chunks) {
     // Strip contextual title prefix (e.g. "Title: ") that was added for embedding
     const stripped = chunks.map(c => {
@@ -255,9 +265,13 @@ function highlightChunks(docContent, chunks) {
         return { ...c, content: raw };
     });
 
-    // Sort chunks by position in document (earliest first)
+    // Sort chunks by position in document (earliest first). Stored offsets
+    // locate a chunk exactly; older chunks fall back to a text search
+    const offsets = utf16Offsets(docContent);
     const sorted = stripped
-        .map(c => ({ ...c, idx: docContent.indexOf(c.content) }))
+        .map(c => c.start_char != null && offsets[c.end_char] != null
+            ? { ...c, idx: offsets[c.start_char], content: docContent.slice(offsets[c.start_char], offsets[c.end_char]) }
+            : { ...c, idx: docContent.indexOf(c.content) })
         .filter(c => c.idx !== -1)
         .sort((a, b) => a.idx - b.idx);
 
@@ -282,7 +296,7 @@ function wrapParagraphs(html) {
         .join("");
 }
 
-function renderSources(wrapper, sources) {
+function renderSources(wrapper, sources, loadContent) {
     const outer = document.createElement("details");
     outer.className = "sources-block mt-3 mb-1 border border-border rounded-lg overflow-hidden";
 
@@ -298,7 +312,28 @@ function renderSources(wrapper, sources) {
 
     const list = document.createElement("div");
     list.className = "divide-y divide-border";
+    renderSourceList(list, sources);
+
+    // History loads carry source references only; fetch the bodies on first open
+    if (loadContent) {
+        outer.addEventListener("toggle", async function onToggle() {
+            if (!outer.open) return;
+            outer.removeEventListener("toggle", onToggle);
+            try {
+                const full = await loadContent();
+                list.innerHTML = "";
+                renderSourceList(list, full);
+            } catch {
+                // keep the reference-only view
+            }
+        });
+    }
+
+    outer.appendChild(list);
+    wrapper.appendChild(outer);
+}
 
+function renderSourceList(list, sources) {
     for (const doc of sources) {
         const item = document.createElement("div");
         item.className = "px-3 py-2.5 text-xs";
@@ -320,16 +355,18 @@ function renderSources(wrapper, sources) {
         item.appendChild(header);
 
         // Document content with highlighted chunks
-        const contentEl = document.createElement("div");
-        contentEl.className = "mt-2 text-xs leading-relaxed text-muted-foreground max-h-48 overflow-y-auto";
-        contentEl.innerHTML = highlightChunks(doc.document_content, doc.chunks);
-        item.appendChild(contentEl);
+        if (doc.document_content) {
+            const contentEl = document.createElement("div");
+            contentEl.className = "mt-2 text-xs leading-relaxed text-muted-foreground max-h-48 overflow-y-auto";
+            contentEl.innerHTML = highlightChunks(
+                doc.document_content,
+                doc.chunks.filter(c => c.content),
+            );
+            item.appendChild(contentEl);
+        }
 
         list.appendChild(item);
     }
-
-    outer.appendChild(list);
-    wrapper.appendChild(outer);
 }
 
 // ── Send / Stop button state ──
@@ -465,14 +502,28 @@ function getModelLabel(modelId) {
 async function fetchConversations() {
     try {
         const res = await fetch("/api/conversation");
-        conversations = await res.json();
+        const page = await res.json();
+        conversations = page.items;
+        conversationsCursor = page.next_cursor;
         renderConversationList();
     } catch {
         conversations = [];
+        conversationsCursor = null;
         renderConversationList();
     }
 }
 
+async function loadMoreConversations() {
+    if (!conversationsCursor) return;
+    const res = await fetch(`/api/conversation?cursor=${encodeURIComponent(conversationsCursor)}`);
+    if (!res.ok) return;
+    const page = await res.json();
+    const known = new Set(conversations.map((c) => c.id));
+    conversations = conversations.concat(page.items.filter((c) => !known.has(c.id)));
+    conversationsCursor = page.next_cursor;
+    renderConversationList();
+}
+
 async function createConversation(title) {
     const res = await fetch("/api/conversation", {
         method: "POST",
@@ -489,26 +540,65 @@ async function loadConversation(id) {
     const data = await res.json();
 
     currentConversationId = id;
+    loadedMessages = data.messages || [];
+    olderMessagesCursor = data.next_cursor;
     setRoute(id);
-    clearMessages();
     renderConversationList();
+    renderHistory(id);
+    scrollToBottom();
 
-    // Render existing messages
-    for (const msg of data.messages || []) {
+    // Close sidebar on mobile
+    if (!isDesktop()) setSidebar(false);
+}
+
+async function loadEarlierMessages(id) {
+    if (!olderMessagesCursor) return;
+    const res = await fetch(`/api/conversation/${id}?cursor=${encodeURIComponent(olderMessagesCursor)}`);
+    if (!res.ok || currentConversationId !== id) return;
+    const data = await res.json();
+
+    loadedMessages = data.messages.concat(loadedMessages);
+    olderMessagesCursor = data.next_cursor;
+
+    // Keep the viewport anchored on the message that was at the top
+    const fromBottom = chatMessages.scrollHeight - chatMessages.scrollTop;
+    renderHistory(id);
+    requestAnimationFrame(() => {
+        chatMessages.scrollTop = chatMessages.scrollHeight - fromBottom;
+    });
+}
+
+function renderHistory(id) {
+    clearMessages();
+
+    if (olderMessagesCursor) {
+        const more = document.createElement("button");
+        more.type = "button";
+        more.className =
+            "block mx-auto mb-4 px-3 py-1.5 text-xs font-medium rounded-md text-muted-foreground hover:bg-muted/30 cursor-pointer";
+        more.textContent = "Load earlier messages";
+        more.addEventListener("click", () => loadEarlierMessages(id));
+        messagesContainer.appendChild(more);
+    }
+
+    for (const msg of loadedMessages) {
         if (msg.role === "user") {
             appendMessage("user", msg.content);
         } else {
             const contentDiv = appendMessage("assistant", "", msg.model_id);
             renderMarkdown(contentDiv, msg.content);
             if (msg.sources && msg.sources.length > 0) {
-                renderSources(contentDiv.parentElement, msg.sources);
+                const loadContent = msg.id ? () => fetchMessageSources(id, msg.id) : null;
+                renderSources(contentDiv.parentElement, msg.sources, loadContent);
             }
         }
     }
-    scrollToBottom();
+}
 
-    // Close sidebar on mobile
-    if (!isDesktop()) setSidebar(false);
+async function fetchMessageSources(conversationId, messageId) {
+    const res = await fetch(`/api/conversation/${conversationId}/messages/${messageId}/sources`);
+    if (!res.ok) throw new Error("Failed to load sources");
+    return await res.json();
 }
 
 async function deleteConversation(id) {
@@ -573,6 +663,16 @@ function renderConversationList() {
 
         conversationListEl.appendChild(item);
     }
+
+    if (conversationsCursor) {
+        const more = document.createElement("button");
+        more.type = "button";
+        more.className =
+            "w-full mt-1 px-2.5 py-2 text-xs font-medium rounded-lg text-muted-foreground hover:bg-muted/20 cursor-pointer";
+        more.textContent = "Load more";
+        more.addEventListener("click", loadMoreConversations);
+        conversationListEl.appendChild(more);
+    }
 }
 
 // ── Scroll helper ──
@@ -719,6 +819,8 @@ async function sendMessage(text) {
             const title = text.length > 50 ? text.slice(0, 50) + "..." : text;
             const conv = await createConversation(title);
             currentConversationId = conv.id;
+            loadedMessages = [];
+            olderMessagesCursor = null;
             setRoute(conv.id);
             conversations.unshift(conv);
             renderConversationList();
@@ -729,6 +831,7 @@ async function sendMessage(text) {
     }
 
     appendMessage("user", text);
+    loadedMessages.push({ role: "user", content: text });
     messageInput.value = "";
     messageInput.style.height = "auto";
 
@@ -740,6 +843,7 @@ async function sendMessage(text) {
     contentDiv.innerHTML = TYPING_INDICATOR;
     let fullResponse = "";
     let sources = null;
+    let answeredModelId = null;
 
     try {
         const response = await fetch("/api/inference/chat", {
@@ -800,6 +904,7 @@ async function sendMessage(text) {
                     }
                     if (parsed.sources) {
                         sources = parsed.sources;
+                        if (parsed.model_id) answeredModelId = parsed.model_id;
                         continue;
                     }
                     fullResponse += parsed.token;
@@ -817,10 +922,22 @@ async function sendMessage(text) {
             contentDiv.textContent = "No response received from the model.";
         }
 
+        // A hedged request may have been answered by a fallback model
+        if (answeredModelId && answeredModelId !== modelSelect.value) {
+            const badge = contentDiv.parentElement.querySelector("span");
+            if (badge) badge.textContent = getModelLabel(answeredModelId);
+        }
+
         // Render sources below the response
         if (sources && sources.length > 0) {
             renderSources(contentDiv.parentElement, sources);
         }
+        loadedMessages.push({
+            role: "assistant",
+            content: fullResponse,
+            model_id: answeredModelId || modelSelect.value,
+            sources,
+        });
 
         scrollToBottom();
 
@@ -874,8 +991,13 @@ async function init() {
 
     // Restore conversation from URL hash
     const routeId = getRouteConversationId();
-    if (routeId && conversations.some((c) => c.id === routeId)) {
-        await loadConversation(routeId);
+    // The routed conversation may sit beyond the first page of the sidebar
+    if (routeId) {
+        try {
+            await loadConversation(routeId);
+        } catch {
+            setRoute(null);
+        }
     }
 
     // Open sidebar by default on desktop